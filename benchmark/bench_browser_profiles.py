@@ -0,0 +1,95 @@
+# file: benchmark/bench_browser_profiles.py
+"""
+浏览器配置预设对比基准
+
+对每个预设启动一个浏览器, 按与正式运行相同的方式为每个模拟用户创建 context, 在本地替身平台上打开课程页面并播放视频,
+稳定后统计浏览器进程树每个并发用户平均增加的常驻内存和CPU占用
+
+用法: python -m benchmark.bench_browser_profiles [--profiles default balanced minimal] [--users 10] [--window-s 30]
+仅支持 Linux(通过 /proc 读取资源占用)
+"""
+import argparse
+import asyncio
+import json
+import os
+
+from playwright.async_api import async_playwright
+
+from utils.browser_profiles import PROFILES, BrowserProfile
+from utils.proc_stats import cpu_seconds, process_tree, rss_bytes
+from utils.stand_in_lms import StandInLMS, open_user
+
+
+def browser_tree() -> list[int]:
+    """本进程的所有子孙进程(Playwright 驱动和浏览器), 不含本进程"""
+    return process_tree(os.getpid())[1:]
+
+
+async def bench_profile(profile: BrowserProfile, users: int, settle_s: float, window_s: float,
+                        lms: StandInLMS) -> dict:
+    async with async_playwright() as p:
+        browser = await getattr(p, profile.browser_type).launch(**profile.launch_options())
+        await asyncio.sleep(settle_s)
+        base_rss = sum(rss_bytes(pid) for pid in browser_tree())
+
+        contexts = [await open_user(browser, profile, lms.base_url, i) for i in range(users)]
+        await asyncio.sleep(settle_s)
+
+        pids = browser_tree()
+        cpu_start = sum(cpu_seconds(pid) for pid in pids)
+        await asyncio.sleep(window_s)
+        pids = browser_tree()
+        cpu_end = sum(cpu_seconds(pid) for pid in pids)
+        loaded_rss = sum(rss_bytes(pid) for pid in pids)
+
+        for context in contexts:
+            await context.close()
+        await browser.close()
+
+    return {
+        "profile": profile.name,
+        "browser_type": profile.browser_type,
+        "users": users,
+        "processes": len(pids),
+        "base_rss_mb": base_rss / 1024 / 1024,
+        "rss_mb_per_user": (loaded_rss - base_rss) / users / 1024 / 1024,
+        # 观察窗口内每个用户平均占用的CPU核数百分比
+        "cpu_percent_per_user": max(cpu_end - cpu_start, 0.0) / window_s / users * 100,
+    }
+
+
+async def run_benchmark(profile_names: list[str], users: int, settle_s: float, window_s: float) -> list[dict]:
+    # 视频足够长, 观察窗口内一直在播放
+    lms = StandInLMS(course_count=1, videos_per_course=1, video_s=3600, speed=1.0)
+    await lms.start()
+    try:
+        return [await bench_profile(PROFILES[name], users, settle_s, window_s, lms) for name in profile_names]
+    finally:
+        await lms.stop()
+
+
+def print_results(results: list[dict]):
+    print(f"{'预设':<18}{'浏览器':<10}{'用户数':>6}{'进程数':>6}{'基础内存(MB)':>14}{'每用户内存(MB)':>16}{'每用户CPU(%)':>14}")
+    for r in results:
+        print(f"{r['profile']:<18}{r['browser_type']:<10}{r['users']:>6}{r['processes']:>6}"
+              f"{r['base_rss_mb']:>14.1f}{r['rss_mb_per_user']:>16.1f}{r['cpu_percent_per_user']:>14.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="浏览器配置预设对比基准")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES), help="要对比的预设")
+    parser.add_argument("--users", type=int, default=10, help="每个预设的并发用户数")
+    parser.add_argument("--settle-s", type=float, default=5.0, help="启动和打开页面后的等待时间(秒)")
+    parser.add_argument("--window-s", type=float, default=30.0, help="CPU统计窗口(秒)")
+    parser.add_argument("--output", help="结果保存为json文件")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.profiles, args.users, args.settle_s, args.window_s))
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# file: benchmark/bench_course_structure.py
+"""
+课程目录解析微基准
+
+在本地无头浏览器中加载生成的学习空间页面, 分别测量 parse_course_structure、
+命中目录缓存时的 load_course_structure 和 show_course_structure 的耗时以及每次调用产生的 Playwright 协议消息数
+
+用法: python -m benchmark.bench_course_structure [--sizes 10 100 1000] [--repeat 3] [--output 结果.json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from playwright._impl._connection import Connection
+from playwright.async_api import async_playwright
+
+from benchmark.fixtures import build_learnspace_html
+from config.config_loader import UserData
+from user.course_manager import CourseManager
+
+
+class ProtocolCounter:
+    """统计发往 Playwright 驱动的协议消息数量"""
+
+    def __init__(self):
+        self.count = 0
+        self._method_name = next(
+            name for name in ("_send_message_to_server", "send_message_to_server") if hasattr(Connection, name)
+        )
+        self._original = getattr(Connection, self._method_name)
+
+    def install(self):
+        original = self._original
+        counter = self
+
+        def counting_send(connection, *args, **kwargs):
+            counter.count += 1
+            return original(connection, *args, **kwargs)
+
+        setattr(Connection, self._method_name, counting_send)
+
+    def uninstall(self):
+        setattr(Connection, self._method_name, self._original)
+
+
+async def measure(counter: ProtocolCounter, coro_factory) -> tuple[float, int]:
+    """执行一次被测调用, 返回 (耗时秒数, 协议消息数)"""
+    start_count = counter.count
+    start = time.perf_counter()
+    await coro_factory()
+    return time.perf_counter() - start, counter.count - start_count
+
+
+async def run_benchmark(sizes: list[int], repeat: int) -> list[dict]:
+    course_manager = CourseManager(UserData(
+        class_id="None", user_name="bench", need_credit=0, username="bench", userpwd="", must_learn_course=[]
+    ))
+    counter = ProtocolCounter()
+    counter.install()
+    results = []
+    try:
+        async with async_playwright() as p:
+            browser = await p.firefox.launch(headless=True)
+            page = await browser.new_page()
+            for size in sizes:
+                html = build_learnspace_html(size)
+                parse_samples, cached_samples, show_samples = [], [], []
+                course = {"id": f"bench{size}", "name": f"bench{size}"}
+                for _ in range(repeat):
+                    await page.set_content(html)
+                    await page.frame_locator("#mainCont").locator("#learnMenu").wait_for(state="attached")
+                    parse_samples.append(await measure(counter, lambda: course_manager.parse_course_structure(page)))
+                    # 首次调用填充缓存, 之后的调用只读取完成状态
+                    await course_manager.load_course_structure(course, page)
+                    cached_samples.append(
+                        await measure(counter, lambda: course_manager.load_course_structure(course, page))
+                    )
+                    show_samples.append(await measure(counter, lambda: course_manager.show_course_structure(page)))
+
+                for name, samples in (("parse_course_structure", parse_samples),
+                                      ("load_course_structure(cached)", cached_samples),
+                                      ("show_course_structure", show_samples)):
+                    results.append({
+                        "function": name,
+                        "content_items": size,
+                        "wall_seconds_median": statistics.median(s[0] for s in samples),
+                        "wall_seconds_min": min(s[0] for s in samples),
+                        "protocol_messages": statistics.median(s[1] for s in samples),
+                    })
+            await browser.close()
+    finally:
+        counter.uninstall()
+    return results
+
+
+def print_results(results: list[dict]):
+    print(f"{'函数':<30}{'内容项':>8}{'耗时中位数(秒)':>16}{'最小耗时(秒)':>14}{'协议消息数':>12}")
+    for r in results:
+        print(f"{r['function']:<30}{r['content_items']:>8}{r['wall_seconds_median']:>16.3f}"
+              f"{r['wall_seconds_min']:>14.3f}{r['protocol_messages']:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="课程目录解析微基准")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="内容项数量")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模的重复次数")
+    parser.add_argument("--output", help="结果保存为json文件")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.sizes, args.repeat))
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# file: benchmark/fixtures.py
+from html import escape
+
+
+def build_learn_menu(content_count: int, contents_per_section: int = 10, sections_per_chapter: int = 5,
+                     completed_ratio: float = 0.5) -> str:
+    """
+    生成与学习空间一致的 #learnMenu 目录结构:
+    章节节点(div.s_chapter) 后紧跟小节列表容器, 小节节点(div.s_section) 后紧跟内容项容器
+
+    :param content_count: 内容项总数
+    :param contents_per_section: 每个小节的内容项数量
+    :param sections_per_chapter: 每个章节的小节数量
+    :param completed_ratio: 已完成内容项的比例
+    """
+    completed_count = int(content_count * completed_ratio)
+    parts = ['<div id="learnMenu">']
+    index = 0
+    chapter_no = 0
+    while index < content_count:
+        chapter_no += 1
+        parts.append(f'<div class="s_chapter" title="第{chapter_no}章"></div>')
+        parts.append('<div style="display:none">')
+        for section_no in range(1, sections_per_chapter + 1):
+            if index >= content_count:
+                break
+            parts.append(f'<div class="s_section" title="第{chapter_no}.{section_no}节"></div>')
+            parts.append('<div style="display:none">')
+            for _ in range(contents_per_section):
+                if index >= content_count:
+                    break
+                completed = index < completed_count
+                item_type = "video" if index % 5 else "doc"
+                parts.append(
+                    f'<div title="内容{index + 1}" itemtype="{item_type}" completestate="{1 if completed else 0}">'
+                    f'<a href="javascript:void(0)">内容{index + 1}</a>'
+                    f'{"<span class=flagover-icon></span>" if completed else ""}</div>'
+                )
+                index += 1
+            parts.append('</div>')
+        parts.append('</div>')
+    parts.append('</div>')
+    return "".join(parts)
+
+
+def build_learnspace_html(content_count: int, **kwargs) -> str:
+    """
+    生成学习空间页面: 外层页面通过 #mainCont 框架加载目录, 目录页内包含 #mainFrame 播放框架
+    """
+    main_cont = (
+        "<html><body>"
+        f"{build_learn_menu(content_count, **kwargs)}"
+        '<iframe id="mainFrame" srcdoc="&lt;html&gt;&lt;body&gt;&lt;/body&gt;&lt;/html&gt;"></iframe>'
+        "</body></html>"
+    )
+    return (
+        "<html><head><title>学习空间</title></head><body>"
+        f'<iframe id="mainCont" srcdoc="{escape(main_cont, quote=True)}"></iframe>'
+        "</body></html>"
+    )
@@ -0,0 +1,282 @@
+# file: benchmark/simulate_schedule.py
+"""
+虚拟时间调度模拟
+
+在虚拟时钟上运行 MainAsync 的分批调度(登录并发、错峰启动、批间等待)和 VideoPlayer 的播放监控/卡顿检测,
+浏览器页面由按虚拟时间推进的模拟播放器代替. 数千用户、数小时的视频在几秒到几十秒内完成,
+用于离线比较不同批大小等调度参数下的总耗时和卡顿恢复情况
+
+用法: python -m benchmark.simulate_schedule [--users 1000] [--batch-sizes 20 50 100] [--courses 8]
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmark.soak_test import build_soak_config
+from config import config_loader
+from config.config_loader import UserData
+from utils.clock import VirtualClock, get_clock, set_clock
+from utils.time_utils import seconds_to_time_str
+
+
+class SimulatedPlayer:
+    """模拟视频播放器: 播放位置随虚拟时间推进, 播放到随机位置时卡住, 点击播放或刷新页面后恢复"""
+
+    def __init__(self, total_s: int, stall_rate_per_hour: float, rng: random.Random):
+        self.total_s = total_s
+        self.stall_rate_per_hour = stall_rate_per_hour
+        self.rng = rng
+        self.position_s = 0.0
+        self.playing = False
+        self.updated_at = get_clock().time()
+        self.stall_at = self._next_stall()
+
+    def _next_stall(self) -> float | None:
+        if self.stall_rate_per_hour <= 0:
+            return None
+        return self.position_s + self.rng.expovariate(self.stall_rate_per_hour / 3600)
+
+    def update(self):
+        now = get_clock().time()
+        if self.playing:
+            self.position_s = min(self.position_s + now - self.updated_at, self.total_s)
+            if self.stall_at is not None and self.position_s >= self.stall_at:
+                self.position_s = self.stall_at
+                self.playing = False
+        self.updated_at = now
+
+    def play(self):
+        self.update()
+        if not self.playing and self.position_s < self.total_s:
+            self.playing = True
+            self.stall_at = self._next_stall()
+
+    @property
+    def finished(self) -> bool:
+        self.update()
+        return self.position_s >= self.total_s
+
+
+class SimulatedLocator:
+    """只实现 VideoPlayer 用到的定位器方法"""
+
+    def __init__(self, player: SimulatedPlayer, selector: str):
+        self.player = player
+        self.selector = selector
+
+    def locator(self, selector: str) -> "SimulatedLocator":
+        return SimulatedLocator(self.player, selector)
+
+    async def get_attribute(self, name: str):
+        # 静音按钮已处于静音状态
+        return "jwmute jwtoggle" if self.selector == "span.jwmute" else None
+
+    async def evaluate(self, expression: str):
+        return None
+
+    async def wait_for(self, **kwargs):
+        return None
+
+    async def click(self):
+        if self.selector == "#container_display_button":
+            self.player.play()
+
+    async def count(self) -> int:
+        if self.selector == ".jwtoggle":
+            self.player.update()
+            return 1 if self.player.playing else 0
+        if self.selector == "span.flagover-icon":
+            return 1 if self.player.finished else 0
+        return 0
+
+    async def text_content(self) -> str:
+        if self.selector == "#container_controlbar_duration":
+            return seconds_to_time_str(self.player.total_s)
+        self.player.update()
+        return seconds_to_time_str(int(self.player.position_s))
+
+
+class SimulatedPage:
+
+    def __init__(self, player: SimulatedPlayer):
+        self.player = player
+        self.frame = SimulatedFrame(player, self)
+
+    async def reload(self):
+        # 刷新后播放器停在原位置, 需要重新点击播放
+        self.player.update()
+        self.player.playing = False
+
+    def frame_locator(self, selector: str):
+        return self if selector == "#mainCont" else self.frame
+
+
+class SimulatedFrame(SimulatedLocator):
+
+    def __init__(self, player: SimulatedPlayer, page: SimulatedPage):
+        super().__init__(player, "#mainFrame")
+        self.page = page
+
+
+class SimulatedUser:
+    """代替 UserAsync, 只保存调度和统计需要的数据"""
+
+    def __init__(self, user_data: UserData, videos: list[int]):
+        from utils.run_ledger import UserRunStats
+        self.user_data = user_data
+        self.videos = videos
+        self.run_stats = UserRunStats(username=user_data.username, user_name=user_data.user_name)
+
+    async def close(self):
+        pass
+
+
+class SimulatedBrowserPool:
+
+    async def start(self):
+        pass
+
+    async def get_browser(self):
+        return None
+
+    async def close(self):
+        pass
+
+
+def build_courses(count: int, videos_per_course: int, video_s: tuple[int, int], rng: random.Random) -> dict:
+    """课程名称 -> 各视频时长(秒)"""
+    return {
+        f"模拟课程{i}": [rng.randint(*video_s) for _ in range(videos_per_course)]
+        for i in range(count)
+    }
+
+
+def build_users(count: int, courses: dict, courses_per_user: int, rng: random.Random) -> list[UserData]:
+    names = list(courses)
+    return [
+        UserData(class_id="None", user_name=f"sim{i}", need_credit=0, username=f"sim_user_{i}", userpwd="sim",
+                 must_learn_course=rng.sample(names, min(courses_per_user, len(names))))
+        for i in range(count)
+    ]
+
+
+def simulate(batch_size: int, users: list[UserData], courses: dict, args) -> dict:
+    """在新的虚拟时钟上按给定批大小运行一次完整调度"""
+    from main_async import MainAsync
+    from user.video_player import VideoPlayer
+    from utils.course_catalog import get_course_catalog
+    from utils.logger_manager import release_user_loggers
+    from utils.session_vault import SessionVault
+    from utils.trace_recorder import release_trace_recorder
+
+    config_loader.config.project.user_batch_size = batch_size
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    # 运行计划按课程目录估算用户耗时, 预先写入模拟课程的视频时长
+    catalog = get_course_catalog()
+    for name, videos in courses.items():
+        catalog.record_structure(name, len(videos))
+        for index, video_s in enumerate(videos):
+            catalog.record_video(name, f"视频{index + 1}", video_s)
+
+    class SimulatedMainAsync(MainAsync):
+
+        async def initialize_user(self, user_data: UserData, browser):
+            user = SimulatedUser(user_data, [s for name in user_data.must_learn_course for s in courses[name]])
+            login_s = rng.uniform(*args.login_s)
+            await self.clock.sleep(login_s)
+            user.run_stats.login_seconds = login_s
+            user.run_stats.login_attempts = 1
+            return user
+
+        async def run_user_task(self, user: SimulatedUser):
+            player = VideoPlayer(user.user_data, user.run_stats)
+            try:
+                for video_s in user.videos:
+                    user.run_stats.contents_studied += 1
+                    page = SimulatedPage(SimulatedPlayer(video_s, args.stall_rate, rng))
+                    await player.play_video_content(page.frame, SimulatedLocator(page.player, "content"))
+                    await self.clock.sleep(rng.random() * 3 + 1)
+                user.run_stats.courses_studied = len(user.user_data.must_learn_course)
+                user.run_stats.finish(success=True)
+                return True
+            except Exception as e:
+                self.module_logger.error(f"模拟用户 {user.user_data.username} 出错: {e}")
+                user.run_stats.finish(success=False)
+                return False
+            finally:
+                await self.run_ledger.record(user.run_stats)
+                await release_trace_recorder(user.user_data.username)
+                release_user_loggers(f"{user.user_data.user_name}_{user.user_data.username}")
+
+    clock = VirtualClock()
+    set_clock(clock)
+
+    async def run() -> dict:
+        main_async = SimulatedMainAsync(SimulatedBrowserPool(), SessionVault(f"{args.work_dir}/sessions.db"))
+        results = await main_async.run_users(users)
+        summary = await main_async.run_ledger.write_summary()
+        return {
+            "batch_size": batch_size,
+            "users": len(results),
+            "succeeded": sum(results.values()),
+            "makespan_s": get_clock().time(),
+            "video_efficiency": summary["video_efficiency"],
+            "stuck_events": summary["totals"]["stuck_events"],
+            "recoveries": summary["totals"]["recoveries"],
+            "reloads": summary["totals"]["reloads"],
+            "wall_p90_s": summary["wall_seconds"][90],
+        }
+
+    real_start = time.monotonic()
+    result = clock.run(run())
+    result["real_s"] = time.monotonic() - real_start
+    return result
+
+
+def print_results(results: list[dict]):
+    print(f"{'批大小':>6}{'成功/用户':>12}{'总耗时':>12}{'P90耗时':>12}{'视频效率':>10}{'卡顿':>8}{'恢复':>8}{'实际秒数':>10}")
+    for r in results:
+        print(f"{r['batch_size']:>6}{r['succeeded']:>6}/{r['users']:<5}"
+              f"{seconds_to_time_str(int(r['makespan_s'])):>12}{seconds_to_time_str(int(r['wall_p90_s'])):>12}"
+              f"{r['video_efficiency']:>10.2%}{r['stuck_events']:>8}{r['recoveries']:>8}{r['real_s']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="虚拟时间调度模拟")
+    parser.add_argument("--users", type=int, default=1000, help="模拟用户数")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[20, 50, 100], help="要比较的批大小")
+    parser.add_argument("--courses", type=int, default=8, help="课程数")
+    parser.add_argument("--courses-per-user", type=int, default=3, help="每个用户的必修课程数")
+    parser.add_argument("--videos-per-course", type=int, default=4, help="每门课程的视频数")
+    parser.add_argument("--video-s", type=int, nargs=2, default=[600, 2400], help="视频时长范围(秒)")
+    parser.add_argument("--login-s", type=float, nargs=2, default=[3.0, 15.0], help="登录耗时范围(秒)")
+    parser.add_argument("--stall-rate", type=float, default=1.0, help="每小时播放中卡住的平均次数")
+    parser.add_argument("--check-freq-s", type=int, default=30, help="视频进度检查间隔(秒)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--work-dir", default="save_data/simulate", help="会话存储/账本等输出目录")
+    parser.add_argument("--output", help="结果保存为json文件")
+    args = parser.parse_args()
+
+    # 必须在导入业务模块前替换全局配置, 部分模块在导入时读取配置
+    config = build_soak_config("http://simulated.invalid", args.batch_sizes[0], args.work_dir)
+    config.video_play.check_freq_s = args.check_freq_s
+    config.video_play.report_freq_s = 3600
+    config.resource.enabled = False
+    config_loader.config = config
+
+    rng = random.Random(args.seed)
+    courses = build_courses(args.courses, args.videos_per_course, tuple(args.video_s), rng)
+    users = build_users(args.users, courses, args.courses_per_user, rng)
+
+    results = [simulate(batch_size, users, courses, args) for batch_size in args.batch_sizes]
+    print_results(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# file: benchmark/soak_test.py
+"""
+长时间压力测试
+
+启动本地替身学习平台, 用大量模拟用户反复跑完整学习流程(视频加速播放), 定期采样
+进程树内存、文件描述符、Playwright context/页面数量、asyncio 任务数、aiohttp 会话数、
+日志处理器数量和事件循环延迟. 预热结束后任一指标持续增长即判定为泄漏, 以非零状态码退出
+
+--no-browser 时每轮改为无浏览器状态巡检(HTTP 登录、学分和课程进度查询), 不需要安装浏览器,
+只覆盖 HTTP 登录会话、日志处理器和任务等不涉及 Playwright 的部分
+
+用法: python -m benchmark.soak_test [--users 200] [--hours 2] [--no-browser] [--output 结果.json]
+仅支持 Linux(通过 /proc 读取资源占用)
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import statistics
+import sys
+import time
+
+from aiohttp import ClientSession
+
+from config import config_loader
+from config.config_loader import (AppConfig, CookieConfig, HarConfig, ProjectConfig, QrCodeConfig, SweepConfig,
+                                  UserConfig, UserData, VideoPlayConfig, WebConfig)
+from utils.proc_stats import open_fds, tree_rss_bytes
+from utils.stand_in_lms import StandInLMS
+
+# 指标名 -> (相对增长阈值, 绝对增长下限), 预热后后段中位数同时超过两者才视为持续增长
+GROWTH_LIMITS = {
+    "rss_mb": (0.15, 50),
+    "fds": (0.15, 20),
+    "contexts": (0.5, 3),
+    "pages": (0.5, 3),
+    "tasks": (0.25, 20),
+    "client_sessions": (0.5, 3),
+    "log_handlers": (0.25, 20),
+    "loop_lag_p99_ms": (1.0, 50),
+}
+
+
+def build_soak_config(base_url: str, batch_size: int, work_dir: str) -> AppConfig:
+    """生成指向替身平台的配置, 不读取 config/config.yaml"""
+    return AppConfig(
+        web=WebConfig(
+            base_domain=base_url,
+            sso_login_url=f"{base_url}/sso/login",
+            client_id="soak",
+            site_code="soak",
+            qr_code_url=f"{base_url}/captcha",
+            check_login_status_url=f"{base_url}/check_login",
+            check_is_need_setting=f"{base_url}/need_setting",
+            course_status_url=f"{base_url}/course_status",
+            select_elective_url=f"{base_url}/select_elective",
+            project_class_id_url=f"{base_url}/project",
+            login_page_url=f"{base_url}/login",
+            redirect_url=f"{base_url}/sso/redirect?to=",
+        ),
+        project=ProjectConfig(
+            user_batch_size=batch_size,
+            ledger_dir=f"{work_dir}/ledger",
+            catalog_path=f"{work_dir}/course_catalog.json",
+        ),
+        qr_code=QrCodeConfig(api_url=f"{base_url}/captcha-api", token="soak"),
+        video_play=VideoPlayConfig(class_id="soak-project", each_batch=50, check_freq_s=1, report_freq_s=60),
+        cookie=CookieConfig(save_path=f"{work_dir}/cookies", vault_path=f"{work_dir}/sessions.db"),
+        account=UserConfig(file_path=""),
+        har=HarConfig(mode="off"),
+        sweep=SweepConfig(report_path=f"{work_dir}/sweep_report.json"),
+    )
+
+
+def build_users(count: int, course_names: list[str]) -> list[UserData]:
+    return [
+        UserData(class_id="None", user_name=f"soak{i}", need_credit=0, username=f"soak_user_{i}",
+                 userpwd="soak", must_learn_course=course_names)
+        for i in range(count)
+    ]
+
+
+def count_log_handlers() -> int:
+    return sum(
+        len(logger.handlers)
+        for logger in logging.Logger.manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)
+    )
+
+
+def detect_growth(values: list[float], warmup_fraction: float, relative: float, absolute: float) -> bool:
+    """预热后的样本分为三段, 后段中位数比前段中位数高出阈值且中段也在两者之间时视为持续增长"""
+    values = values[int(len(values) * warmup_fraction):]
+    if len(values) < 6:
+        return False
+    third = len(values) // 3
+    first = statistics.median(values[:third])
+    middle = statistics.median(values[third:2 * third])
+    last = statistics.median(values[2 * third:])
+    return last - first > max(first * relative, absolute) and first <= middle <= last
+
+
+class SoakHarness:
+
+    def __init__(self, users: int, hours: float, batch_size: int, sample_s: float, warmup_fraction: float,
+                 work_dir: str, lms: StandInLMS, browser: bool = True):
+        self.user_count = users
+        self.duration_s = hours * 3600
+        self.batch_size = batch_size
+        self.sample_s = sample_s
+        self.warmup_fraction = warmup_fraction
+        self.work_dir = work_dir
+        self.lms = lms
+        self.browser = browser
+        self.samples: list[dict] = []
+        self.rounds = 0
+
+    async def run(self) -> dict:
+        base_url = await self.lms.start()
+        # 必须在导入业务模块前替换全局配置, 部分模块在导入时读取配置
+        config_loader.config = build_soak_config(base_url, self.batch_size, self.work_dir)
+
+        from main_async import MainAsync
+        from user.status_sweep import StatusSweep
+        from utils.browser_pool import BrowserPool
+        from utils.loop_monitor import LoopLagMonitor
+        from utils.session_vault import SessionVault
+
+        browser_pool = BrowserPool(config_loader.config.project.browser_count) if self.browser else None
+        session_vault = SessionVault(config_loader.config.cookie.vault_path)
+        await session_vault.load(legacy_prefix=config_loader.config.cookie.save_path)
+        if browser_pool:
+            await browser_pool.start()
+        users = build_users(self.user_count, self.lms.course_names())
+
+        loop_monitor = LoopLagMonitor()
+        loop_monitor.start()
+        sampler = asyncio.create_task(self.sample_loop(browser_pool, loop_monitor))
+        deadline = time.monotonic() + self.duration_s
+        try:
+            while time.monotonic() < deadline:
+                # 与服务模式的任务一样, 每轮使用新的 MainAsync 共享浏览器池和会话存储
+                self.rounds += 1
+                self.lms.reset()
+                if browser_pool:
+                    results = await MainAsync(browser_pool, session_vault).run_users(users)
+                    succeeded = sum(results.values())
+                else:
+                    # 巡检自带会话存储并在每轮结束时关闭
+                    reports = await StatusSweep().run(users)
+                    succeeded = sum(1 for r in reports if r["status"] == "ok")
+                print(f"第 {self.rounds} 轮完成: 成功 {succeeded}/{len(users)}")
+        finally:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+            await loop_monitor.stop()
+            if browser_pool:
+                await browser_pool.close()
+            session_vault.close()
+            await self.lms.stop()
+        return self.build_report()
+
+    async def sample_loop(self, browser_pool, loop_monitor):
+        start = time.monotonic()
+        while True:
+            await asyncio.sleep(self.sample_s)
+            browsers = browser_pool.browsers if browser_pool else []
+            contexts = [c for b in browsers if b and b.is_connected() for c in b.contexts]
+            lag = list(loop_monitor.samples)[-int(self.sample_s / loop_monitor.config.interval_s):]
+            self.samples.append({
+                "elapsed_s": time.monotonic() - start,
+                "rss_mb": tree_rss_bytes() / 1024 / 1024,
+                "fds": open_fds(),
+                "contexts": len(contexts),
+                "pages": sum(len(c.pages) for c in contexts),
+                "tasks": len(asyncio.all_tasks()),
+                "client_sessions": sum(1 for o in gc.get_objects()
+                                       if isinstance(o, ClientSession) and not o.closed),
+                "log_handlers": count_log_handlers(),
+                "loop_lag_p99_ms": (sorted(lag)[int(len(lag) * 0.99)] * 1000) if lag else 0.0,
+                "lms_requests": self.lms.request_count,
+            })
+
+    def build_report(self) -> dict:
+        growing = [
+            name for name, (relative, absolute) in GROWTH_LIMITS.items()
+            if detect_growth([s[name] for s in self.samples], self.warmup_fraction, relative, absolute)
+        ]
+        return {
+            "users": self.user_count,
+            "browser": self.browser,
+            "rounds": self.rounds,
+            "samples": self.samples,
+            "growing_metrics": growing,
+            "passed": not growing,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长时间压力测试(泄漏检查)")
+    parser.add_argument("--users", type=int, default=200, help="模拟用户数")
+    parser.add_argument("--hours", type=float, default=2.0, help="运行时长(小时)")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批用户数")
+    parser.add_argument("--sample-s", type=float, default=30.0, help="采样间隔(秒)")
+    parser.add_argument("--warmup", type=float, default=0.2, help="预热阶段占总样本的比例")
+    parser.add_argument("--video-s", type=int, default=60, help="替身视频时长(秒)")
+    parser.add_argument("--speed", type=float, default=10.0, help="视频播放加速倍数")
+    parser.add_argument("--no-browser", action="store_true", help="每轮只做无浏览器状态巡检")
+    parser.add_argument("--work-dir", default="save_data/soak", help="会话存储/账本等输出目录")
+    parser.add_argument("--output", help="结果保存为json文件")
+    args = parser.parse_args()
+
+    harness = SoakHarness(args.users, args.hours, args.batch_size, args.sample_s, args.warmup, args.work_dir,
+                          StandInLMS(video_s=args.video_s, speed=args.speed), browser=not args.no_browser)
+    report = asyncio.run(harness.run())
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if report["passed"]:
+        print(f"压力测试通过: {report['rounds']} 轮, {len(report['samples'])} 个采样点")
+    else:
+        print(f"压力测试失败, 持续增长的指标: {', '.join(report['growing_metrics'])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+from datetime import date, datetime
 from openpyxl import load_workbook
 from yaml import load, FullLoader
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
 
@@ -22,7 +23,11 @@ class WebConfig:
 
 @dataclass
 class ProjectConfig:
-    user_batch_size: int
+    user_batch_size: int = 0              # 每批用户数, 0 表示使用主机校准(--mode calibrate)得到的推荐并发数
+    ledger_dir: str = "logs/ledger"
+    catalog_path: str = "save_data/course_catalog.json"
+    default_course_video_s: int = 3600    # 课程目录中没有时长数据时的默认课程视频时长(秒)
+    browser_count: int = 1                # 浏览器池中的浏览器数量
 
 
 @dataclass
@@ -38,12 +43,16 @@ class VideoPlayConfig:
     check_freq_s: int = 5
     report_freq_s: int = 300
     max_stuck_checks: int = 3
+    prefetch_lead_s: int = 180
+    progress_stale_s: int = 90      # 超过该时长没有学习时间上报确认时, 改为读取页面上的播放进度
 
 
 
 @dataclass
 class CookieConfig:
-    save_path: str = "save_data/cookies"
+    save_path: str = "save_data/cookies"       # 旧版每用户json文件前缀, 仅用于导入
+    vault_path: str = "save_data/sessions.db"
+    min_ttl_s: int = 300                        # cookie剩余有效期低于该值时直接重新登录
 
 
 @dataclass
@@ -51,6 +60,120 @@ class UserConfig:
     file_path: str = "config/账户信息.xlsx"
 
 
+@dataclass
+class BrowserConfig:
+    profile: str = "default"        # 浏览器配置预设: default / balanced / minimal / chromium-minimal
+    browser_type: str = ""          # 不为空时覆盖预设的浏览器类型: firefox / chromium
+
+
+@dataclass
+class LoginConfig:
+    concurrency: int = 5            # 每批同时登录的用户数
+    sso_concurrency: int = 5        # 对SSO/学习站点每个主机的并发请求上限
+    captcha_concurrency: int = 2    # 对验证码识别接口的并发请求上限
+    jitter_s: float = 3.0           # 每个用户登录前的随机等待上限(秒)
+
+
+@dataclass
+class RetryConfig:
+    breaker_failure_threshold: int = 5  # 同一接口连续失败该次数后断开, 所有用户暂停请求该接口
+    breaker_reset_s: int = 60           # 断开后等待该时长再放行一个探测请求
+    max_delay_s: int = 60               # 重试退避的最长等待(秒)
+
+
+@dataclass
+class SupervisorConfig:
+    max_restarts: int = 5               # 每个用户的最大重启次数
+    server_error_backoff_s: int = 30    # 服务端错误时的退避基数(秒), 按重启次数线性增长
+
+
+@dataclass
+class DeadlineConfig:
+    enabled: bool = True
+    step_s: int = 60                # 单步操作(页面跳转/刷新/点击/读取/接口请求)的最长时间(秒)
+    video_factor: float = 1.5       # 用户/课程/内容的预算 = 预计视频时长 × 系数 + 余量
+    slack_s: int = 600              # 每个阶段在视频时长之外的余量(秒)
+
+
+@dataclass
+class HarConfig:
+    mode: str = "off"               # off: 关闭, record: 录制真实会话, replay: 离线回放
+    dir: str = "save_data/har"      # 每个用户一个 .har(页面流量) 和 .http.json(接口请求) 文件
+
+
+@dataclass
+class ContextPoolConfig:
+    enabled: bool = True            # 复用 BrowserContext, 录制/回放模式下自动关闭
+    size: int = 4                   # 每个浏览器保留的空闲 context 数
+    max_uses: int = 20              # 每个 context 最多分配给多少个用户, 超过后关闭重建
+
+
+@dataclass
+class TraceConfig:
+    enabled: bool = False           # 是否开启滚动trace, 出错时保存最近几个分片
+    chunk_s: int = 60               # 每个trace分片的时长(秒)
+    keep_chunks: int = 3            # 保留的最近分片数量
+    screenshots: bool = True        # trace中是否包含截图
+    dir: str = "logs/traces"
+
+
+@dataclass
+class LoopMonitorConfig:
+    enabled: bool = True
+    interval_s: float = 0.1         # 事件循环延迟采样间隔(秒)
+    threshold_s: float = 0.25       # 阻塞超过该时长时抓取调用栈(秒)
+    max_stalls: int = 50            # 保留的阻塞记录数量
+
+
+@dataclass
+class ResourceConfig:
+    enabled: bool = True
+    sample_s: float = 15            # 浏览器进程树资源采样间隔(秒)
+    top_courses: int = 10           # 汇总中列出的资源消耗最高的课程数
+
+
+@dataclass
+class CalibrationConfig:
+    path: str = "save_data/host_calibration.json"
+    max_users: int = 40             # 校准时最多打开的模拟用户数
+    step_users: int = 5             # 每轮增加的模拟用户数
+    settle_s: float = 10            # 每轮打开页面后等待稳定的时间(秒)
+    window_s: float = 20            # 每轮的统计窗口(秒)
+    cpu_target: float = 0.7         # 推荐并发数下允许使用的CPU比例
+    memory_target: float = 0.7      # 推荐并发数下允许使用的可用内存比例
+    max_loop_lag_s: float = 0.1     # 事件循环延迟P99超过该值时停止增加用户
+    default_batch_size: int = 10    # 未配置批大小且没有校准结果时使用的批大小
+
+
+@dataclass
+class ProfilerConfig:
+    interval_s: float = 0.005       # 事件循环线程调用栈(CPU)的采样间隔(秒)
+    wall_interval_s: float = 0.1    # 所有任务等待链(墙上时间)的采样间隔(秒)
+    dir: str = "logs/profiles"      # 折叠栈输出目录, 可直接用 flamegraph.pl / speedscope 打开
+
+
+@dataclass
+class EventBusConfig:
+    queue_size: int = 1000          # 每个接收端队列的上限, 满时合并或丢弃事件
+    journal_path: str = ""          # 设置后把进度事件逐行写入该 JSON Lines 文件
+    drain_timeout_s: float = 5      # 结束时等待接收端处理剩余事件的最长时间(秒)
+
+
+@dataclass
+class SweepConfig:
+    concurrency: int = 50                           # 同时巡检的用户数
+    report_path: str = "save_data/sweep_report.json"
+
+
+@dataclass
+class ServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8765
+    unix_socket: str = ""           # 设置后改为监听 Unix socket
+    max_concurrent_jobs: int = 2    # 同时执行的任务数
+    drain_timeout_s: int = 0        # 停止时等待已有任务的最长时间, 0 表示一直等待
+
+
 @dataclass
 class AppConfig:
     web: WebConfig
@@ -59,6 +182,21 @@ class AppConfig:
     video_play: VideoPlayConfig
     cookie: CookieConfig
     account: UserConfig
+    browser: BrowserConfig = field(default_factory=BrowserConfig)
+    login: LoginConfig = field(default_factory=LoginConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
+    supervisor: SupervisorConfig = field(default_factory=SupervisorConfig)
+    deadline: DeadlineConfig = field(default_factory=DeadlineConfig)
+    har: HarConfig = field(default_factory=HarConfig)
+    context_pool: ContextPoolConfig = field(default_factory=ContextPoolConfig)
+    trace: TraceConfig = field(default_factory=TraceConfig)
+    loop_monitor: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
+    resource: ResourceConfig = field(default_factory=ResourceConfig)
+    calibration: CalibrationConfig = field(default_factory=CalibrationConfig)
+    profiler: ProfilerConfig = field(default_factory=ProfilerConfig)
+    event_bus: EventBusConfig = field(default_factory=EventBusConfig)
+    sweep: SweepConfig = field(default_factory=SweepConfig)
+    service: ServiceConfig = field(default_factory=ServiceConfig)
 
 @dataclass
 class UserData:
@@ -68,6 +206,25 @@ class UserData:
     username: str
     userpwd: str
     must_learn_course: list
+    deadline: Optional[datetime] = None     # 截止时间, 为空表示无截止要求
+    priority: int = 1                       # 优先级权重, 越大分到的浏览器槽位份额越多
+    cohort: str = "default"                 # 所属分组, 分组之间按权重公平分配
+
+
+def parse_deadline(value) -> Optional[datetime]:
+    """解析表格中的截止时间单元格, 支持日期/时间对象和 YYYY-MM-DD[ HH:MM] 字符串"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        # 只有日期时视为当天结束
+        return datetime(value.year, value.month, value.day, 23, 59, 59)
+    text = str(value).strip().replace("/", "-")
+    deadline = datetime.fromisoformat(text)
+    if len(text) <= 10:
+        deadline = deadline.replace(hour=23, minute=59, second=59)
+    return deadline
 
 
 class ConfigLoader:
@@ -82,13 +239,29 @@ class ConfigLoader:
             qr_code=QrCodeConfig(**config_data["qr_code"]),
             video_play=VideoPlayConfig(**config_data["video_play"]),
             cookie=CookieConfig(**config_data["cookie"]),
-            account=UserConfig(**config_data["account"])
+            account=UserConfig(**config_data["account"]),
+            browser=BrowserConfig(**config_data.get("browser", {})),
+            login=LoginConfig(**config_data.get("login", {})),
+            retry=RetryConfig(**config_data.get("retry", {})),
+            supervisor=SupervisorConfig(**config_data.get("supervisor", {})),
+            deadline=DeadlineConfig(**config_data.get("deadline", {})),
+            har=HarConfig(**config_data.get("har", {})),
+            context_pool=ContextPoolConfig(**config_data.get("context_pool", {})),
+            trace=TraceConfig(**config_data.get("trace", {})),
+            loop_monitor=LoopMonitorConfig(**config_data.get("loop_monitor", {})),
+            resource=ResourceConfig(**config_data.get("resource", {})),
+            calibration=CalibrationConfig(**config_data.get("calibration", {})),
+            profiler=ProfilerConfig(**config_data.get("profiler", {})),
+            event_bus=EventBusConfig(**config_data.get("event_bus", {})),
+            sweep=SweepConfig(**config_data.get("sweep", {})),
+            service=ServiceConfig(**config_data.get("service", {}))
         )
 
 
 def read_user_info(user_config: UserConfig) -> list[UserData]:
     """
     新版本excel读取,数据都被存储在一个sheet里,依次为序号/姓名/账号/密码/指定学习项目
+    可选列依次为截止时间/优先级/分组, 分组为空时按截止时间分组
     :param user_config:
     :return:
     """
@@ -140,6 +313,9 @@ def read_user_info(user_config: UserConfig) -> list[UserData]:
                 continue
 
             try:
+                deadline = parse_deadline(row[5]) if len(row) > 5 else None
+                priority = int(row[6]) if len(row) > 6 and row[6] not in (None, "") else 1
+                cohort = str(row[7]) if len(row) > 7 and row[7] not in (None, "") else "default"
                 user = UserData(
                     class_id="None",
                     user_name=str(row[1]) if row[1] is not None else "",
@@ -147,7 +323,10 @@ def read_user_info(user_config: UserConfig) -> list[UserData]:
                     userpwd=str(row[3]) if row[3] is not None else "",
                     need_credit=0,
                     must_learn_course=str(row[4]).replace("，", ",").replace("\n", "").split(",")
-                    if row[4] is not None else []
+                    if row[4] is not None else [],
+                    deadline=deadline,
+                    priority=max(priority, 1),
+                    cohort=cohort
                 )
                 users_data.append(user)
             except Exception as e:
@@ -1,100 +1,143 @@
+import argparse
 import asyncio
 import random
+import sys
 
-from playwright.async_api import Browser, async_playwright
+from playwright.async_api import Browser
 
 from config.config_loader import UserData, get_config, read_user_info
 from user.user_async import UserAsync
+from user.user_supervisor import UserSupervisor
+from utils.browser_pool import BrowserPool
+from utils.clock import get_clock
+from utils.course_catalog import get_course_catalog
+from utils.event_bus import get_event_bus
 from utils.logger_manager import get_module_logger
+from utils.host_calibration import resolve_batch_size
+from utils.loop_monitor import LoopLagMonitor
+from utils.resource_accountant import ResourceUsage, get_resource_accountant
+from utils.run_ledger import RunLedger
+from utils.run_planner import RunPlanner
+from utils.session_vault import SessionVault
 
 class MainAsync:
 
-    def __init__(self):
+    def __init__(self, browser_pool: BrowserPool = None, session_vault: SessionVault = None, run_id: str = None):
+        """
+        :param browser_pool: 共享的浏览器池(服务模式), 为空时在 run() 中自行创建
+        :param session_vault: 共享的会话存储(服务模式), 为空时自行创建并在 run() 中加载
+        :param run_id: 运行账本的文件名标识(服务模式下为任务id), 为空时使用当前时间
+        """
         self.config = get_config()
+        self.clock = get_clock()
         self.module_logger = get_module_logger("Main")
         self.users = []
-        self.browser = None
+        self.browser_pool = browser_pool or BrowserPool(self.config.project.browser_count)
+        self.session_vault = session_vault or SessionVault(self.config.cookie.vault_path)
+        self.run_ledger = RunLedger(self.config.project.ledger_dir, run_id)
+        self.loop_monitor = LoopLagMonitor()
+        # 服务模式下多个任务共用一个浏览器池, 资源核算也共用, 才能在所有在线用户之间分摊
+        self.resource_accountant = get_resource_accountant()
+        self.course_usage: dict[str, ResourceUsage] = {}    # 本次运行各课程分摊到的资源, 每个运行/任务单独累计
+        self.event_bus = get_event_bus()
 
         self.initialized_users = []
 
     async def run(self):
-        batch_size = self.config.project.user_batch_size
-        users_data = read_user_info(self.config.account)
+        success = False
 
         try:
-            async with async_playwright() as p:
-                browser = await p.firefox.launch(
-                    headless=True,
-                    args=[
-                        "--disable-css-animation",  # 禁用CSS动画
-                        "--disable-animations",  # 禁用所有动画
-                    ],
-                    firefox_user_prefs={
-                        "permissions.default.image": 2,
-                        "ui.prefersReducedMotion": 1,
-                        "toolkit.cosmeticAnimations.enabled": False,  # 禁用工具箱动画
-                        "browser.tabs.animate": False,  # 禁用标签页动画
-                        "browser.download.animateNotifications": False,  # 禁用下载通知动画
-                    }
-                )
-
-                # 分批处理用户
-                total_users = len(users_data)
-                self.module_logger.info(f"总共 {total_users} 个用户，每批处理 {batch_size} 个用户")
-
-                for i in range(0, total_users, batch_size):
-                    # 获取当前批次的用户
-                    current_batch = users_data[i:i + batch_size]
-                    batch_number = (i // batch_size) + 1
-                    self.module_logger.info(f"处理第 {batch_number} 批用户 ({len(current_batch)} 个用户)")
-
-                    # 处理当前批次
-                    initialized_users, results = await self.process_user_batch(
-                        current_batch, browser, self.config.cookie.save_path
-                    )
-
-                    print(f"第 {batch_number} 批用户处理完成")
-
-                    # 确保当前批次的所有用户会话都被关闭
-                    await self.close_all_users(initialized_users)
-
-                    # 如果不是最后一批，添加延迟
-                    if i + batch_size < total_users:
-                        print("等待一段时间后继续下一批用户...")
-                        await asyncio.sleep(5)  # 可根据需要调整延迟时间
-
-                success = True
+            self.loop_monitor.start()
+            await self.event_bus.start()
+            users_data = await asyncio.to_thread(read_user_info, self.config.account)
+            await self.session_vault.load(legacy_prefix=self.config.cookie.save_path)
+            await self.browser_pool.start()
+            await self.browser_pool.prewarm_contexts()
+            await self.run_users(users_data)
+            success = True
 
         except Exception as e:
             print(f"程序执行过程中发生异常: {e}")
         finally:
             # 确保资源被正确释放
             try:
+                # 输出本次运行汇总(含事件循环延迟和资源消耗)并保存课程目录
+                await self.loop_monitor.stop()
+                # 先等事件接收端处理完剩余事件, 统计才包含最后的事件
+                events_summary = await self.event_bus.close()
+                await self.run_ledger.write_summary({
+                    "loop_lag": self.loop_monitor.build_summary(),
+                    "resources": self.resource_accountant.build_summary(self.course_usage),
+                    "events": events_summary,
+                })
+                get_course_catalog().save()
                 # 关闭浏览器
-                if browser:
-                    await browser.close()
+                await self.browser_pool.close()
+                self.session_vault.close()
                 print("所有资源已释放")
             except Exception as cleanup_error:
                 print(f"资源清理过程中发生错误: {cleanup_error}")
 
-            # 程序执行完毕后等待用户回车
+            # 程序执行完毕后等待用户回车(非交互环境下直接退出)
             if success:
                 print("\n程序执行完成，按回车键退出...")
             else:
                 print("\n程序执行出现错误，按回车键退出...")
-            input()
+            if sys.stdin and sys.stdin.isatty():
+                input()
+
+    async def run_users(self, users_data: list[UserData]) -> dict[str, bool]:
+        """
+        按运行计划分批处理用户
+        :param users_data: 用户列表
+        :return: 用户账号 -> 学习任务是否完成
+        """
+        batch_size = resolve_batch_size()
+
+        # 按预计工作量从大到小排序, 避免长任务拖到最后
+        planner = RunPlanner()
+        run_plan = planner.plan(users_data, batch_size)
+        planner.report(run_plan)
+        users_data = run_plan.ordered_users
+
+        # 分批处理用户
+        total_users = len(users_data)
+        self.module_logger.info(f"总共 {total_users} 个用户，每批处理 {batch_size} 个用户")
+        user_results = {user_data.username: False for user_data in users_data}
+
+        for i in range(0, total_users, batch_size):
+            # 获取当前批次的用户
+            current_batch = users_data[i:i + batch_size]
+            batch_number = (i // batch_size) + 1
+            self.module_logger.info(f"处理第 {batch_number} 批用户 ({len(current_batch)} 个用户)")
+
+            # 处理当前批次
+            initialized_users, results = await self.process_user_batch(
+                current_batch, await self.browser_pool.get_browser()
+            )
+            for user, result in zip(initialized_users, results):
+                user_results[user.user_data.username] = result is True
+
+            print(f"第 {batch_number} 批用户处理完成")
 
+            # 确保当前批次的所有用户会话都被关闭
+            await self.close_all_users(initialized_users)
 
-    async def initialize_user(self, user_data: UserData, browser: Browser, cookie_path: str = None):
+            # 如果不是最后一批，添加延迟
+            if i + batch_size < total_users:
+                print("等待一段时间后继续下一批用户...")
+                await self.clock.sleep(5)  # 可根据需要调整延迟时间
+
+        return user_results
+
+    async def initialize_user(self, user_data: UserData, browser: Browser):
         """
             初始化用户
             :param user_data: 用户数据
             :param browser: 浏览器对象
-            :param cookie_path: cookie所在文件夹
             :return:
             """
-        login_file = f"{cookie_path}_{user_data.username}.json"
-        user_async = UserAsync(user_data, browser, login_file)
+        user_async = UserAsync(user_data, browser, self.session_vault)
 
         try:
             # 只进行初始化（登录）
@@ -104,26 +147,36 @@ class MainAsync:
                 return user_async
             else:
                 self.module_logger.info(f"用户 {user_data.user_name}_{user_data.username} 登录失败")
-                await user_async.close()
-                return None
         except Exception as e:
             self.module_logger.error(f"用户 {user_data.user_name}_{user_data.username} 登录出错: {e}")
-            await user_async.close()
-            return None
+
+        # 登录失败的用户同样记入运行账本
+        user_async.run_stats.finish(success=False)
+        await self.run_ledger.record(user_async.run_stats)
+        await user_async.close()
+        return None
 
     async def run_user_task(self, user_async: UserAsync):
         """
-        运行已登录用户的学习任务（可并行执行）
+        运行已登录用户的学习任务（可并行执行）, 出错时由监督器恢复并续跑
         """
+        self.resource_accountant.register(user_async, self.course_usage)
         try:
             self.module_logger.info(f"用户 {user_async.user_data.user_name}_{user_async.user_data.username} 开始执行学习任务")
-            await user_async.run()
-            self.module_logger.info(f"用户 {user_async.user_data.user_name}_{user_async.user_data.username} 学习任务完成")
-            return True
+            success = await UserSupervisor(user_async, self.browser_pool.get_browser).run()
+            if success:
+                self.module_logger.info(f"用户 {user_async.user_data.user_name}_{user_async.user_data.username} 学习任务完成")
+            else:
+                self.module_logger.error(f"用户 {user_async.user_data.user_name}_{user_async.user_data.username} 学习任务未完成")
+            user_async.run_stats.finish(success=success)
+            return success
         except Exception as e:
             self.module_logger.error(f"用户 {user_async.user_data.user_name}_{user_async.user_data.username} 执行学习任务出错")
+            user_async.run_stats.finish(success=False)
             return False
         finally:
+            self.resource_accountant.unregister(user_async)
+            await self.run_ledger.record(user_async.run_stats)
             # 确保用户会话被正确关闭
             try:
                 await user_async.close()
@@ -143,20 +196,22 @@ class MainAsync:
                 except Exception as e:
                     self.module_logger.error(f"用户 {user.user_data.user_name}_{user.user_data.username} 关闭会话出错")
 
-    async def process_user_batch(self, user_batch, browser, cookie_path):
+    async def process_user_batch(self, user_batch, browser):
         """
             处理一批用户：登录并执行学习任务
             """
-        # 第一阶段：串行登录所有用户
-        self.module_logger.info("开始串行登录用户批次...")
-        initialized_users = []
+        # 第一阶段：并发登录所有用户, 同时登录数和每个主机的请求数均有上限
+        self.module_logger.info(f"开始并发登录用户批次, 并发数 {self.config.login.concurrency}...")
+        login_slots = asyncio.Semaphore(self.config.login.concurrency)
 
-        for user_data in user_batch:
-            user = await self.initialize_user(user_data, browser, cookie_path)
-            if user:
-                initialized_users.append(user)
-            # 登录间隔延迟
-            await asyncio.sleep(random.random() * 3 + 1)
+        async def login_user(user_data: UserData):
+            async with login_slots:
+                # 登录前随机等待, 错开请求
+                await self.clock.sleep(random.random() * self.config.login.jitter_s)
+                return await self.initialize_user(user_data, browser)
+
+        users = await asyncio.gather(*(login_user(user_data) for user_data in user_batch))
+        initialized_users = [user for user in users if user]
 
         # 第二阶段：并行执行学习任务
         results = []
@@ -167,7 +222,7 @@ class MainAsync:
                 task = asyncio.create_task(self.run_user_task(user))
                 tasks.append(task)
                 # 任务启动间隔延迟
-                await asyncio.sleep(random.random() * 5 + 2)
+                await self.clock.sleep(random.random() * 5 + 2)
 
             # 等待所有学习任务完成
             results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -175,5 +230,27 @@ class MainAsync:
         return initialized_users, results
 
 if __name__ == "__main__":
-    main_async = MainAsync()
-    asyncio.run(main_async.run())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="继续教育自动学习脚本")
+    parser.add_argument("--mode", choices=["run", "sweep", "serve", "calibrate"], default="run",
+                        help="run: 完整学习流程; sweep: 无浏览器巡检所有账户的学分进度; serve: 常驻服务模式; "
+                             "calibrate: 测量本机资源并保存推荐并发数")
+    parser.add_argument("--profile", action="store_true",
+                        help="开启感知asyncio的采样分析, 结束时(或收到SIGUSR2时)输出折叠栈到 logs/profiles")
+    args = parser.parse_args()
+
+    if args.mode == "sweep":
+        from user.status_sweep import StatusSweep
+        main_coro = StatusSweep().run()
+    elif args.mode == "calibrate":
+        from utils.host_calibration import HostCalibrator
+        main_coro = HostCalibrator().calibrate()
+    elif args.mode == "serve":
+        from service_async import ServiceAsync
+        main_coro = ServiceAsync().serve()
+    else:
+        main_coro = MainAsync().run()
+
+    if args.profile:
+        from utils.async_profiler import run_profiled
+        main_coro = run_profiled(main_coro)
+    asyncio.run(main_coro)
@@ -0,0 +1,227 @@
+import asyncio
+import signal
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+from config.config_loader import UserConfig, UserData, get_config, parse_deadline, read_user_info
+from utils.browser_pool import BrowserPool
+from utils.course_catalog import get_course_catalog
+from utils.event_bus import get_event_bus
+from utils.logger_manager import get_module_logger
+from utils.loop_monitor import LoopLagMonitor
+from utils.session_vault import SessionVault
+
+
+@dataclass
+class Job:
+    """一次提交的学习任务(一批账户)"""
+    job_id: str
+    users: list[UserData]
+    status: str = "queued"      # queued / running / done / failed / cancelled
+    created_at: float = field(default_factory=time.time)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    results: dict[str, bool] = field(default_factory=dict)
+    error: str = ""
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "users": len(self.users),
+            "succeeded": sum(1 for ok in self.results.values() if ok),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "results": self.results,
+            "error": self.error,
+        }
+
+
+class ServiceAsync:
+    """
+    常驻服务模式: 保持浏览器池预热, 通过本地 HTTP/Unix socket 接口接收新的账户任务,
+    收到 SIGTERM 时停止接收新任务并等待已有任务完成后退出
+
+    接口:
+        POST /jobs          提交任务, 内容为 {"users": [...]} 或 {"file_path": "账户信息.xlsx"}
+        GET  /jobs          所有任务状态
+        GET  /jobs/{job_id} 单个任务状态
+        GET  /health        服务状态
+    """
+
+    MAX_FINISHED_JOBS = 100     # 保留的已结束任务数量, 避免长时间运行时任务记录无限增长
+
+    def __init__(self):
+        self.config = get_config()
+        self.module_logger = get_module_logger("Service")
+        self.browser_pool = BrowserPool(self.config.project.browser_count)
+        self.session_vault = SessionVault(self.config.cookie.vault_path)
+        self.jobs: dict[str, Job] = {}
+        self.job_tasks: set[asyncio.Task] = set()
+        self.job_slots = asyncio.Semaphore(self.config.service.max_concurrent_jobs)
+        self.draining = False
+        self.stop_event = asyncio.Event()
+        self.loop_monitor = LoopLagMonitor()
+
+    async def serve(self):
+        runner: web.AppRunner | None = None
+        try:
+            self.loop_monitor.start()
+            await self.session_vault.load(legacy_prefix=self.config.cookie.save_path)
+            await get_event_bus().start()
+            await self.browser_pool.start()
+            await self.browser_pool.prewarm_contexts()
+
+            app = web.Application()
+            app.add_routes([
+                web.post("/jobs", self.handle_submit),
+                web.get("/jobs", self.handle_list),
+                web.get("/jobs/{job_id}", self.handle_get),
+                web.get("/health", self.handle_health),
+            ])
+            runner = web.AppRunner(app)
+            await runner.setup()
+            if self.config.service.unix_socket:
+                site = web.UnixSite(runner, self.config.service.unix_socket)
+            else:
+                site = web.TCPSite(runner, self.config.service.host, self.config.service.port)
+            await site.start()
+            self.install_signal_handlers()
+            self.module_logger.info(f"服务已启动: {site.name}")
+
+            await self.stop_event.wait()
+            await self.drain()
+        finally:
+            if runner:
+                await runner.cleanup()
+            await self.loop_monitor.stop()
+            await get_event_bus().close()
+            await self.browser_pool.close()
+            self.session_vault.close()
+            get_course_catalog().save()
+            self.module_logger.info("服务已停止")
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self.request_stop)
+            except (NotImplementedError, AttributeError, ValueError):
+                # Windows 下事件循环不支持信号处理器
+                signal.signal(sig, lambda *_: loop.call_soon_threadsafe(self.request_stop))
+
+    def request_stop(self):
+        """停止接收新任务, 进入排空阶段"""
+        if not self.draining:
+            self.module_logger.info("收到停止信号，停止接收新任务并等待已有任务完成")
+            self.draining = True
+            self.stop_event.set()
+
+    async def drain(self):
+        """等待已有任务完成, 超过排空超时后取消剩余任务"""
+        if not self.job_tasks:
+            return
+        timeout = self.config.service.drain_timeout_s or None
+        done, pending = await asyncio.wait(set(self.job_tasks), timeout=timeout)
+        if pending:
+            self.module_logger.warning(f"排空超时，取消 {len(pending)} 个未完成任务")
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def submit(self, users: list[UserData]) -> Job:
+        self.prune_jobs()
+        job = Job(job_id=uuid.uuid4().hex[:12], users=users)
+        self.jobs[job.job_id] = job
+        task = asyncio.create_task(self.run_job(job))
+        self.job_tasks.add(task)
+        task.add_done_callback(self.job_tasks.discard)
+        self.module_logger.info(f"任务 {job.job_id} 已提交, 共 {len(users)} 个用户")
+        return job
+
+    def prune_jobs(self):
+        """只保留最近的已结束任务"""
+        finished = [job for job in self.jobs.values() if job.status in ("done", "failed", "cancelled")]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:-self.MAX_FINISHED_JOBS]:
+            del self.jobs[job.job_id]
+
+    async def run_job(self, job: Job):
+        # main_async --mode serve 会导入本模块, 这里延迟导入, 避免两个模块互相依赖导入顺序
+        from main_async import MainAsync
+
+        async with self.job_slots:
+            job.status = "running"
+            job.started_at = time.time()
+            main_async = MainAsync(self.browser_pool, self.session_vault, run_id=f"job_{job.job_id}")
+            try:
+                job.results = await main_async.run_users(job.users)
+                job.status = "done"
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                self.module_logger.error(f"任务 {job.job_id} 执行出错: {e}")
+                job.status = "failed"
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                await main_async.run_ledger.write_summary({
+                    "resources": main_async.resource_accountant.build_summary(main_async.course_usage),
+                })
+                get_course_catalog().save()
+
+    async def handle_submit(self, request: web.Request) -> web.Response:
+        if self.draining:
+            return web.json_response({"error": "服务正在停止，不再接收新任务"}, status=503)
+        try:
+            body = await request.json()
+            if body.get("file_path"):
+                users = await asyncio.to_thread(read_user_info, UserConfig(file_path=body["file_path"]))
+            else:
+                users = [self.parse_user(item) for item in body.get("users", [])]
+        except Exception as e:
+            return web.json_response({"error": f"任务内容无效: {e}"}, status=400)
+        if not users:
+            return web.json_response({"error": "任务中没有用户"}, status=400)
+        job = self.submit(users)
+        return web.json_response(job.to_dict(), status=202)
+
+    async def handle_list(self, request: web.Request) -> web.Response:
+        return web.json_response([job.to_dict() for job in self.jobs.values()])
+
+    async def handle_get(self, request: web.Request) -> web.Response:
+        job = self.jobs.get(request.match_info["job_id"])
+        if not job:
+            return web.json_response({"error": "任务不存在"}, status=404)
+        return web.json_response(job.to_dict())
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "draining" if self.draining else "ok",
+            "running_jobs": sum(1 for job in self.jobs.values() if job.status == "running"),
+            "queued_jobs": sum(1 for job in self.jobs.values() if job.status == "queued"),
+            "loop_lag": self.loop_monitor.build_summary(),
+        })
+
+    @staticmethod
+    def parse_user(item: dict) -> UserData:
+        """将接口提交的用户信息转换为 UserData, 字段与账户表格一致"""
+        must_learn_course = item.get("must_learn_course", [])
+        if isinstance(must_learn_course, str):
+            must_learn_course = must_learn_course.replace("，", ",").replace("\n", "").split(",")
+        deadline = parse_deadline(item.get("deadline"))
+        return UserData(
+            class_id="None",
+            user_name=str(item.get("user_name", "")),
+            username=str(item["username"]),
+            userpwd=str(item.get("userpwd", "")),
+            need_credit=int(item.get("need_credit", 0)),
+            must_learn_course=must_learn_course,
+            deadline=deadline,
+            priority=max(int(item.get("priority", 1)), 1),
+            cohort=item.get("cohort") or "default"
+        )
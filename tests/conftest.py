@@ -0,0 +1,44 @@
+import pytest
+
+from config import config_loader
+from config.config_loader import (AppConfig, CookieConfig, ProjectConfig, QrCodeConfig, UserConfig,
+                                  VideoPlayConfig, WebConfig)
+
+
+def build_test_config(work_dir: str) -> AppConfig:
+    """不读取 config/config.yaml 的最小配置, 所有输出都写到临时目录"""
+    base_url = "http://test.invalid"
+    return AppConfig(
+        web=WebConfig(
+            base_domain=base_url,
+            sso_login_url=f"{base_url}/sso/login",
+            client_id="test",
+            site_code="test",
+            qr_code_url=f"{base_url}/captcha",
+            check_login_status_url=f"{base_url}/check_login",
+            check_is_need_setting=f"{base_url}/need_setting",
+            course_status_url=f"{base_url}/course_status",
+            select_elective_url=f"{base_url}/select_elective",
+            project_class_id_url=f"{base_url}/project",
+            login_page_url=f"{base_url}/login",
+            redirect_url=f"{base_url}/sso/redirect?to=",
+        ),
+        project=ProjectConfig(
+            user_batch_size=2,
+            ledger_dir=f"{work_dir}/ledger",
+            catalog_path=f"{work_dir}/course_catalog.json",
+        ),
+        qr_code=QrCodeConfig(api_url=f"{base_url}/captcha-api", token="test"),
+        video_play=VideoPlayConfig(class_id="test-project", each_batch=50),
+        cookie=CookieConfig(save_path=f"{work_dir}/cookies", vault_path=f"{work_dir}/sessions.db"),
+        account=UserConfig(file_path=""),
+    )
+
+
+@pytest.fixture(autouse=True)
+def app_config(tmp_path, monkeypatch):
+    """每个测试使用独立的配置, 日志等相对路径输出写到临时目录"""
+    monkeypatch.chdir(tmp_path)
+    config = build_test_config(str(tmp_path))
+    monkeypatch.setattr(config_loader, "config", config)
+    return config
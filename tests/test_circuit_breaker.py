@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+
+from utils.clock import VirtualClock, set_clock
+from utils.errors import DeadlineExceededError, PermanentError, ServerError
+from utils.retry_policy import CircuitBreaker, RetryPolicy, retry_call
+
+
+@pytest.fixture(autouse=True)
+def virtual_clock():
+    clock = VirtualClock(start_wall=0)
+    set_clock(clock)
+    yield clock
+    set_clock(None)
+
+
+def open_breaker(clock: VirtualClock, reset_s: float = 60) -> CircuitBreaker:
+    """返回已断开且已到达半开时刻的断路器"""
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_s=reset_s)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+async def probe(breaker: CircuitBreaker, error: BaseException = None):
+    async with breaker.guard():
+        if error is not None:
+            raise error
+
+
+def test_opens_after_threshold_and_success_resets_count():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_s=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_acquire_waits_for_reset_then_allows_one_probe(virtual_clock):
+    async def scenario():
+        breaker = open_breaker(virtual_clock)
+        await breaker.acquire()
+        assert virtual_clock.time() >= 60
+        assert breaker.state == CircuitBreaker.HALF_OPEN and breaker._probing
+        second = asyncio.create_task(breaker.acquire())
+        await virtual_clock.sleep(5)
+        assert not second.done()  # 探测进行中, 其他请求继续等待
+        breaker.record_success()
+        await second
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    virtual_clock.run(scenario())
+
+
+@pytest.mark.parametrize("error, state", [
+    (None, CircuitBreaker.CLOSED),
+    (PermanentError("账号错误"), CircuitBreaker.CLOSED),         # 业务错误说明接口可用
+    (ServerError(502), CircuitBreaker.OPEN),
+    (asyncio.TimeoutError(), CircuitBreaker.OPEN),
+])
+def test_half_open_probe_outcome(virtual_clock, error, state):
+    async def scenario():
+        breaker = open_breaker(virtual_clock)
+        with pytest.raises(type(error)) if error else nullcontext():
+            await probe(breaker, error)
+        assert breaker.state == state
+        assert not breaker._probing
+
+    virtual_clock.run(scenario())
+
+
+@pytest.mark.parametrize("error", [asyncio.CancelledError(), DeadlineExceededError("user/course", 60)])
+def test_cancelled_or_out_of_budget_probe_keeps_state(virtual_clock, error):
+    async def scenario():
+        breaker = open_breaker(virtual_clock)
+        with pytest.raises(type(error)):
+            await probe(breaker, error)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker._probing  # 释放探测名额, 下一个请求可以继续探测
+        await breaker.acquire()
+        assert breaker._probing
+
+    virtual_clock.run(scenario())
+
+
+def test_retry_call_gives_up_on_permanent_error(virtual_clock):
+    calls = []
+
+    async def operation(attempt: int):
+        calls.append(attempt)
+        raise PermanentError("账号错误") if attempt == 2 else ServerError(500)
+
+    with pytest.raises(PermanentError):
+        virtual_clock.run(retry_call(operation, RetryPolicy(max_attempts=5, jitter_s=0)))
+    assert calls == [1, 2]
+
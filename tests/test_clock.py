@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from utils.clock import Clock, VirtualClock, get_clock, set_clock
+
+
+def test_long_sleep_finishes_instantly_in_virtual_time():
+    clock = VirtualClock(start_wall=1000)
+
+    async def scenario():
+        await asyncio.sleep(3600)
+        await clock.sleep(1800)
+        return clock.time()
+
+    started = time.monotonic()
+    assert clock.run(scenario()) == pytest.approx(5400)
+    assert time.monotonic() - started < 5
+    assert clock.wall() == pytest.approx(1000 + 5400)
+
+
+def test_concurrent_timers_fire_in_order():
+    clock = VirtualClock(start_wall=0)
+    fired = []
+
+    async def sleeper(name: str, seconds: float):
+        await asyncio.sleep(seconds)
+        fired.append((name, clock.time()))
+
+    async def scenario():
+        await asyncio.gather(sleeper("b", 300), sleeper("a", 100), sleeper("c", 600))
+
+    clock.run(scenario())
+    assert fired == [("a", 100), ("b", 300), ("c", 600)]
+
+
+def test_timeout_uses_virtual_time():
+    clock = VirtualClock(start_wall=0)
+
+    async def scenario():
+        with pytest.raises(TimeoutError):
+            async with asyncio.timeout(60):
+                await asyncio.sleep(3600)
+        return clock.time()
+
+    assert clock.run(scenario()) == pytest.approx(60)
+
+
+def test_executor_jobs_do_not_advance_virtual_time():
+    clock = VirtualClock(start_wall=0)
+
+    async def scenario():
+        # 线程池中的工作运行期间定时器不被提前触发
+        timer = asyncio.create_task(asyncio.sleep(10))
+        await asyncio.to_thread(time.sleep, 0.05)
+        assert not timer.done()
+        assert clock.time() == 0
+        await timer
+        return clock.time()
+
+    assert clock.run(scenario()) == pytest.approx(10)
+
+
+def test_set_clock_replaces_global_clock():
+    virtual = VirtualClock(start_wall=0)
+    set_clock(virtual)
+    try:
+        assert get_clock() is virtual
+    finally:
+        set_clock(None)
+    assert isinstance(get_clock(), Clock) and not isinstance(get_clock(), VirtualClock)
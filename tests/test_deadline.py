@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from utils.clock import VirtualClock
+from utils.deadline import budget, current_deadline, derive_budget, step
+from utils.errors import DeadlineExceededError, StepTimeoutError
+
+
+def run(main):
+    """在虚拟时间上运行, 数小时的预算在测试中立即到期"""
+    clock = VirtualClock(start_wall=0)
+    return clock.run(main), clock
+
+
+def test_budget_expiry_raises_deadline_exceeded():
+    async def scenario():
+        async with budget("user", 100):
+            await asyncio.sleep(200)
+
+    with pytest.raises(DeadlineExceededError) as info:
+        run(scenario())
+    assert info.value.name == "user" and info.value.budget_s == 100
+
+
+def test_budget_finishing_in_time_does_not_raise():
+    async def scenario():
+        async with budget("user", 100) as deadline:
+            await asyncio.sleep(50)
+            return deadline.remaining()
+
+    remaining, clock = run(scenario())
+    assert remaining == pytest.approx(50)
+    assert clock.time() == pytest.approx(50)
+
+
+def test_nested_budget_uses_earlier_parent_deadline():
+    async def scenario():
+        async with budget("user", 100) as parent:
+            async with budget("course", 500) as child:
+                assert child.name == "user/course"
+                assert child.expires_at == parent.expires_at
+                await asyncio.sleep(200)
+
+    # 外层先到期, 由外层负责取消并上报
+    with pytest.raises(DeadlineExceededError) as info:
+        run(scenario())
+    assert info.value.name == "user"
+
+
+def test_nested_budget_shorter_child_expires_first():
+    async def scenario():
+        async with budget("user", 1000):
+            with pytest.raises(DeadlineExceededError) as info:
+                async with budget("course", 100):
+                    await asyncio.sleep(200)
+            assert current_deadline().name == "user"
+            return info.value.name
+
+    name, clock = run(scenario())
+    assert name == "user/course"
+    assert clock.time() == pytest.approx(100)
+
+
+def test_budget_without_seconds_inherits_parent():
+    async def scenario():
+        assert current_deadline() is None
+        async with budget("user", None) as top:
+            assert top is None
+        async with budget("user", 100) as parent:
+            async with budget("content", None) as child:
+                return parent, child
+
+    (parent, child), _ = run(scenario())
+    assert child.name == "user/content"
+    assert child.expires_at == parent.expires_at
+
+
+def test_budget_disabled_by_config(app_config):
+    app_config.deadline.enabled = False
+
+    async def scenario():
+        async with budget("user", 10):
+            await asyncio.sleep(100)
+        return current_deadline()
+
+    assert run(scenario())[0] is None
+
+
+def test_step_timeout_is_retryable_when_budget_remains():
+    async def scenario():
+        async with budget("user", 1000):
+            await step(asyncio.sleep(100), "goto", timeout_s=30)
+
+    with pytest.raises(StepTimeoutError) as info:
+        run(scenario())
+    assert info.value.name == "user/goto" and info.value.timeout_s == 30
+
+
+def test_step_clipped_by_budget_raises_deadline_exceeded():
+    async def scenario():
+        async with budget("user", 1000):
+            await asyncio.sleep(990)
+            await step(asyncio.sleep(100), "goto", timeout_s=30)
+
+    with pytest.raises(DeadlineExceededError) as info:
+        run(scenario())
+    assert info.value.name.startswith("user")
+
+
+def test_step_returns_result():
+    async def answer():
+        await asyncio.sleep(1)
+        return 42
+
+    assert run(step(answer(), "read"))[0] == 42
+
+
+def test_derive_budget(app_config):
+    config = app_config.deadline
+    assert derive_budget(None) is None
+    assert derive_budget(0) is None
+    assert derive_budget(1000) == 1000 * config.video_factor + config.slack_s
@@ -0,0 +1,28 @@
+from utils.errors import (DeadlineExceededError, FailureKind, ServerError, VideoStudyError, classify_failure,
+                          is_supervised_failure)
+
+
+def video_error(cause: Exception) -> VideoStudyError:
+    try:
+        raise VideoStudyError(f"视频学习重试 3 次后仍失败: {cause}") from cause
+    except VideoStudyError as e:
+        return e
+
+
+def test_exhausted_video_retries_are_local():
+    error = video_error(RuntimeError("视频卡住"))
+    assert classify_failure(error) == FailureKind.CONTENT_FAILED
+    assert not is_supervised_failure(error)
+
+
+def test_video_error_is_classified_by_cause():
+    assert classify_failure(video_error(Exception("Browser has been closed"))) == FailureKind.BROWSER_DISCONNECTED
+    assert classify_failure(video_error(Exception("Page crashed"))) == FailureKind.PAGE_CRASHED
+    assert classify_failure(video_error(ServerError(502))) == FailureKind.SERVER_ERROR
+    deadline = video_error(DeadlineExceededError("user/course/content", 600))
+    assert classify_failure(deadline) == FailureKind.DEADLINE_EXCEEDED
+    assert is_supervised_failure(deadline)
+
+
+def test_unclassified_errors_are_local():
+    assert not is_supervised_failure(ValueError("元素未找到"))
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+from utils.clock import VirtualClock
+from utils.event_bus import (ContentDone, CourseStarted, EventBus, VideoProgress, _Subscription)
+
+
+class RecordingSink:
+    name = "recording"
+
+    def __init__(self, delay_s: float = 0):
+        self.delay_s = delay_s
+        self.events = []
+
+    async def handle(self, event):
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        self.events.append(event)
+
+
+def progress(username: str, position_s: float) -> VideoProgress:
+    return VideoProgress(username, position_s=position_s, total_s=600, at=0)
+
+
+def started(username: str, index: int) -> CourseStarted:
+    return CourseStarted(username, course="A", index=index, total=3, at=0)
+
+
+def offer_all(subscription: _Subscription, events):
+    for seq, event in enumerate(events):
+        subscription.offer(event, seq)
+
+
+def test_progress_coalesces_in_place():
+    subscription = _Subscription(RecordingSink(), queue_size=10)
+    offer_all(subscription, [progress("u1", 10), started("u1", 1), progress("u1", 20), progress("u2", 5)])
+    queued = list(subscription.pending.values())
+    # u1 的进度保持在原位置, 内容更新为最新
+    assert queued == [progress("u1", 20), started("u1", 1), progress("u2", 5)]
+    assert subscription.coalesced == 1 and subscription.dropped == 0
+
+
+def test_full_queue_evicts_oldest_coalescable_event():
+    subscription = _Subscription(RecordingSink(), queue_size=3)
+    offer_all(subscription, [started("u1", 1), progress("u1", 10), progress("u2", 10), started("u1", 2)])
+    assert list(subscription.pending.values()) == [started("u1", 1), progress("u2", 10), started("u1", 2)]
+    assert subscription.dropped == 1
+
+
+def test_full_queue_without_coalescable_drops_new_event():
+    subscription = _Subscription(RecordingSink(), queue_size=2)
+    offer_all(subscription, [started("u1", 1), started("u1", 2), started("u1", 3)])
+    assert list(subscription.pending.values()) == [started("u1", 1), started("u1", 2)]
+    assert subscription.dropped == 1
+
+
+def test_emit_without_subscribers_is_noop():
+    bus = EventBus()
+    bus.emit(started("u1", 1))
+    assert bus.emitted == 0
+    assert bus.build_summary() == {"emitted": 0, "sinks": {}}
+
+
+def test_close_drains_queue_and_returns_stats():
+    sink = RecordingSink(delay_s=1)
+
+    async def scenario():
+        bus = EventBus()
+        bus.subscribe(sink)
+        for index in range(3):
+            bus.emit(started("u1", index))
+        summary = await bus.close()
+        bus.emit(started("u1", 9))  # 关闭后不再投递
+        return summary
+
+    summary = VirtualClock(start_wall=0).run(scenario())
+    assert [e.index for e in sink.events] == [0, 1, 2]
+    assert summary == {
+        "emitted": 3,
+        "sinks": {"recording": {"delivered": 3, "dropped": 0, "coalesced": 0, "errors": 0, "pending": 0}},
+    }
+
+
+def test_sink_errors_are_counted_and_do_not_stop_delivery():
+    class FlakySink(RecordingSink):
+        async def handle(self, event):
+            if event.index == 0:
+                raise ValueError("写入失败")
+            await super().handle(event)
+
+    sink = FlakySink()
+
+    async def scenario():
+        bus = EventBus()
+        bus.subscribe(sink)
+        bus.emit(started("u1", 0))
+        bus.emit(started("u1", 1))
+        return await bus.close()
+
+    summary = VirtualClock(start_wall=0).run(scenario())
+    assert [e.index for e in sink.events] == [1]
+    assert summary["sinks"]["recording"]["errors"] == 1
+
+
+def test_journal_sink_writes_json_lines(app_config, tmp_path):
+    app_config.event_bus.journal_path = str(tmp_path / "events" / "journal.jsonl")
+
+    async def scenario():
+        bus = EventBus()
+        await bus.start()
+        bus.emit(ContentDone("u1", course="A", content="视频1", content_type="video", success=True, at=0))
+        await bus.close()
+
+    asyncio.run(scenario())
+    lines = (tmp_path / "events" / "journal.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{
+        "kind": "content_done", "username": "u1", "at": 0,
+        "course": "A", "content": "视频1", "content_type": "video", "success": True,
+    }]
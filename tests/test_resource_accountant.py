@@ -0,0 +1,111 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.resource_accountant import ResourceAccountant, ResourceUsage
+from utils.run_ledger import UserRunStats
+
+
+class FakeSession:
+    def __init__(self, page):
+        self.page = page
+
+    async def send(self, method: str):
+        if method == "Performance.getMetrics":
+            return {"metrics": [
+                {"name": "TaskDuration", "value": self.page.task_s},
+                {"name": "JSHeapUsedSize", "value": self.page.heap_mb * 1024 * 1024},
+            ]}
+        return {}
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.task_s = 0.0
+        self.heap_mb = 0.0
+
+    def is_closed(self) -> bool:
+        return False
+
+
+class FakeContext:
+    def __init__(self, page_count: int):
+        self.pages = [FakePage(self) for _ in range(page_count)]
+
+    async def new_cdp_session(self, page):
+        return FakeSession(page)
+
+
+def make_user(username: str, page_count: int, course: str):
+    context = FakeContext(page_count)
+    return SimpleNamespace(
+        user_data=SimpleNamespace(username=username),
+        login_manager=SimpleNamespace(context=context),
+        study_manager=SimpleNamespace(course_manager=SimpleNamespace(current_course={"name": course})),
+        run_stats=UserRunStats(username),
+    )
+
+
+def make_accountant(app_config, browser_type: str) -> ResourceAccountant:
+    app_config.browser.browser_type = browser_type
+    app_config.resource.enabled = False     # 不启动后台采样, 由测试直接调用 attribute
+    return ResourceAccountant()
+
+
+def test_chromium_splits_by_measured_page_cost(app_config):
+    accountant = make_accountant(app_config, "chromium")
+    course_usage: dict[str, ResourceUsage] = {}
+    busy, idle = make_user("busy", 1, "heavy"), make_user("idle", 3, "light")
+    accountant.register(busy, course_usage)
+    accountant.register(idle, course_usage)
+
+    async def scenario():
+        await accountant.attribute(cpu_total=0, rss_mb=400)
+        busy.login_manager.context.pages[0].task_s = 3.0
+        busy.login_manager.context.pages[0].heap_mb = 30
+        for page in idle.login_manager.context.pages:
+            page.task_s = 1 / 3
+            page.heap_mb = 10 / 3
+        await accountant.attribute(cpu_total=8, rss_mb=400)
+
+    asyncio.run(scenario())
+    # 页面实测任务耗时 3:1, JS 堆 3:1, 与打开的页面数(1:3)无关
+    assert accountant.user_usage["busy"].cpu_seconds == 6
+    assert accountant.user_usage["idle"].cpu_seconds == 2
+    assert accountant.user_usage["busy"].rss_mb_peak == 300
+    summary = accountant.build_summary(course_usage)
+    assert summary["method"] == "page_metrics"
+    assert [c["course"] for c in summary["top_courses"]] == ["heavy", "light"]
+
+
+def test_firefox_is_labeled_estimate_without_course_ranking(app_config):
+    accountant = make_accountant(app_config, "firefox")
+    course_usage: dict[str, ResourceUsage] = {}
+    accountant.register(make_user("a", 1, "A"), course_usage)
+    accountant.register(make_user("b", 3, "B"), course_usage)
+
+    async def scenario():
+        await accountant.attribute(cpu_total=0, rss_mb=100)
+        await accountant.attribute(cpu_total=8, rss_mb=100)
+
+    asyncio.run(scenario())
+    assert accountant.user_usage["a"].cpu_seconds == 2
+    assert course_usage == {}
+    assert accountant.build_summary(course_usage) == {"method": "page_share_estimate", "top_courses": []}
+
+
+def test_course_usage_is_kept_per_run(app_config):
+    accountant = make_accountant(app_config, "chromium")
+    first_run, second_run = {}, {}
+    first, second = make_user("a", 1, "A"), make_user("b", 1, "B")
+    accountant.register(first, first_run)
+    accountant.register(second, second_run)
+
+    async def scenario():
+        await accountant.attribute(cpu_total=0, rss_mb=100)
+        await accountant.attribute(cpu_total=4, rss_mb=100)
+
+    asyncio.run(scenario())
+    assert list(first_run) == ["A"] and list(second_run) == ["B"]
+    usage = accountant.unregister(first)
+    assert first.run_stats.cpu_seconds == usage.cpu_seconds == 2
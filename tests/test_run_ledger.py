@@ -0,0 +1,58 @@
+import asyncio
+import json
+
+from utils.clock import VirtualClock, set_clock
+from utils.run_ledger import RunLedger, UserRunStats
+
+
+def study(stats: UserRunStats, course: str, seconds: float, video_s: float, stuck: int, success: bool = True):
+    """模拟学习一门课程: 推进虚拟时间并累加用户统计"""
+    clock = VirtualClock(start_wall=0)
+
+    async def scenario():
+        started_at, baseline = clock.wall(), stats.course_counters()
+        await clock.sleep(seconds)
+        stats.contents_studied += 2
+        stats.video_seconds_watched += video_s
+        stats.video_wall_seconds += seconds
+        stats.stuck_events += stuck
+        stats.record_course(course, started_at, baseline, success)
+
+    set_clock(clock)
+    try:
+        clock.run(scenario())
+    finally:
+        set_clock(None)
+
+
+def test_course_rows_hold_per_course_deltas():
+    stats = UserRunStats("u1")
+    study(stats, "A", 100, 90, stuck=1)
+    study(stats, "B", 300, 150, stuck=3, success=False)
+    a, b = stats.courses
+    assert (a.course, a.wall_seconds, a.video_seconds_watched, a.stuck_events) == ("A", 100, 90, 1)
+    assert (b.course, b.wall_seconds, b.video_seconds_watched, b.stuck_events, b.success) == ("B", 300, 150, 3, False)
+    assert b.contents_studied == 2
+
+
+def test_summary_aggregates_courses_across_users(tmp_path):
+    ledger = RunLedger(str(tmp_path / "ledger"), run_id="test")
+    first, second = UserRunStats("u1"), UserRunStats("u2")
+    study(first, "A", 100, 100, stuck=0)
+    study(first, "B", 600, 300, stuck=2)
+    study(second, "A", 200, 100, stuck=1)
+
+    async def scenario():
+        for stats in (first, second):
+            stats.finish(success=True)
+            await ledger.record(stats)
+        return await ledger.write_summary()
+
+    summary = asyncio.run(scenario())
+    courses = {row["course"]: row for row in summary["courses"]}
+    assert [row["course"] for row in summary["courses"]] == ["B", "A"]
+    assert courses["A"]["runs"] == 2 and courses["A"]["wall_seconds_avg"] == 150
+    assert courses["A"]["video_efficiency"] == 200 / 300
+    assert courses["B"]["stuck_events"] == 2
+    line = json.loads((tmp_path / "ledger" / "run_test.jsonl").read_text(encoding="utf-8").splitlines()[0])
+    assert [c["course"] for c in line["courses"]] == ["A", "B"]
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from config.config_loader import UserData
+from utils.course_catalog import CourseCatalog
+from utils.run_planner import RunPlanner
+
+
+def make_user(username: str, courses: list[str], deadline: datetime = None, priority: int = 1,
+              cohort: str = "default") -> UserData:
+    return UserData(class_id="None", user_name=username, need_credit=0, username=username, userpwd="",
+                    must_learn_course=courses, deadline=deadline, priority=priority, cohort=cohort)
+
+
+def make_planner(tmp_path, course_seconds: dict[str, int]) -> RunPlanner:
+    catalog = CourseCatalog(str(tmp_path / "catalog.json"))
+    for name, seconds in course_seconds.items():
+        catalog.keys[name] = name
+        catalog.record_structure(name, 1)
+        catalog.record_video(name, "视频1", seconds)
+    return RunPlanner(catalog)
+
+
+def test_estimate_skips_finished_courses(tmp_path):
+    planner = make_planner(tmp_path, {"A": 1000, "B": 2000})
+    planner.catalog.record_progress("u1", "A", "A", 100)
+    planner.catalog.record_progress("u1", "B", "B", 50)
+    estimate = planner.estimate_user_seconds(make_user("u1", ["A", "B"]))
+    assert estimate == RunPlanner.USER_OVERHEAD_S + 1000 + RunPlanner.COURSE_OVERHEAD_S
+
+
+def test_earliest_deadline_first_within_cohort(tmp_path):
+    planner = make_planner(tmp_path, {"A": 600})
+    now = datetime.now()
+    users = [
+        make_user("late", ["A"], deadline=now + timedelta(days=3)),
+        make_user("none", ["A"]),
+        make_user("early", ["A"], deadline=now + timedelta(days=1)),
+    ]
+    plan = planner.plan(users, batch_size=1)
+    assert [u.username for u in plan.ordered_users] == ["early", "late", "none"]
+
+
+def test_distinct_deadlines_share_default_cohort(tmp_path):
+    """未指定分组时不同截止日期的用户属于同一分组, 按EDF排序而不是在日期之间公平分配"""
+    planner = make_planner(tmp_path, {"A": 600})
+    now = datetime.now()
+    users = [make_user(f"late{i}", ["A"], deadline=now + timedelta(days=5)) for i in range(3)]
+    users += [make_user(f"early{i}", ["A"], deadline=now + timedelta(days=1)) for i in range(3)]
+    plan = planner.plan(users, batch_size=2)
+    assert [u.username[:4] for u in plan.ordered_users] == ["earl"] * 3 + ["late"] * 3
+
+
+def test_weighted_fair_share_between_cohorts(tmp_path):
+    planner = make_planner(tmp_path, {"A": 600})
+    users = [make_user(f"a{i}", ["A"], cohort="a", priority=2) for i in range(6)]
+    users += [make_user(f"b{i}", ["A"], cohort="b", priority=1) for i in range(6)]
+    plan = planner.plan(users, batch_size=3)
+    first_six = [u.cohort for u in plan.ordered_users[:6]]
+    # 权重 2:1, 前六个槽位中 a 分组约占三分之二
+    assert first_six.count("a") == 4
+
+
+def test_urgent_user_preempts_fair_share(tmp_path):
+    planner = make_planner(tmp_path, {"A": 3600})
+    users = [make_user(f"a{i}", ["A"], cohort="a", priority=10) for i in range(4)]
+    users.append(make_user("urgent", ["A"], cohort="b", deadline=datetime.now() + timedelta(hours=3)))
+    plan = planner.plan(users, batch_size=1)
+    assert plan.ordered_users[0].username == "urgent"
+
+
+def test_batches_predict_finish_and_at_risk(tmp_path):
+    planner = make_planner(tmp_path, {"A": 3600})
+    users = [make_user(f"u{i}", ["A"]) for i in range(3)]
+    users.append(make_user("tight", ["A"], deadline=datetime.now() + timedelta(minutes=30)))
+    plan = planner.plan(users, batch_size=2)
+    first, second = plan.users[:2], plan.users[2:]
+    assert min(p.predicted_finish_s for p in second) > max(p.predicted_finish_s for p in first)
+    assert plan.predicted_seconds == max(p.predicted_finish_s for p in plan.users)
+    assert [p.user_data.username for p in plan.at_risk_users] == ["tight"]
+
+
+def test_report_warns_about_at_risk_users(tmp_path, caplog):
+    planner = make_planner(tmp_path, {"A": 3600})
+    plan = planner.plan([make_user("tight", ["A"], deadline=datetime.now() + timedelta(minutes=30))], batch_size=1)
+    planner.report(plan)
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert len(warnings) == 1 and "tight" in warnings[0]
+
+
+def test_measured_estimate_requires_catalog_data(tmp_path):
+    planner = make_planner(tmp_path, {"A": 1000})
+    user = make_user("u1", ["A", "unknown"])
+    # 未记录时长的课程只在排序估算中按默认时长计, 不用于时间预算
+    assert planner.estimate_user_seconds(user) > RunPlanner.USER_OVERHEAD_S + 1000
+    assert planner.measured_user_seconds(user) is None
+    planner.catalog.record_progress("u1", "unknown", "unknown", 100)
+    assert planner.measured_user_seconds(user) == RunPlanner.USER_OVERHEAD_S + 1000 + RunPlanner.COURSE_OVERHEAD_S
@@ -1,59 +1,210 @@
 import asyncio
 import random
+from dataclasses import dataclass
 
 from playwright.async_api import BrowserContext, Page, Locator
 
 from config.config_loader import UserData, get_config
 from user.video_player import VideoPlayer
+from utils.clock import get_clock
+from utils.course_catalog import get_course_catalog
+from utils.course_structure_cache import CourseStructureCache, get_course_structure_cache
+from utils.deadline import budget, derive_budget, step
+from utils.errors import is_supervised_failure, raise_for_status
+from utils.event_bus import ContentDone, CourseStarted, get_event_bus
+from utils.har_transport import get_har_transport
 from utils.logger_manager import get_user_module_logger
+from utils.run_ledger import UserRunStats
+from utils.trace_recorder import get_trace_recorder
+
+
+@dataclass
+class PreparedCourse:
+    """已完成选课、打开页面并解析目录的课程"""
+    course: dict
+    page: Page
+    structure: list
 
 
 class CourseManager:
 
+    # 按与 parse_course_structure 相同的规则遍历目录, 一次返回目录指纹和所有内容项的完成状态
+    STRUCTURE_SNAPSHOT_JS = """menu => {
+        const children = el => Array.from(el.children).filter(c => c.tagName === 'DIV');
+        const parts = [];
+        const states = [];
+        const chapters = children(menu);
+        for (let i = 0; i < chapters.length; i++) {
+            if (chapters[i].getAttribute('class') !== 's_chapter') continue;
+            parts.push('C' + i + ':' + chapters[i].getAttribute('title'));
+            const sections = chapters[i + 1] ? children(chapters[i + 1]) : [];
+            for (let j = 0; j < sections.length; j += 2) {
+                if (sections[j].getAttribute('class') !== 's_section') continue;
+                parts.push('S' + j + ':' + sections[j].getAttribute('title'));
+                const contents = sections[j + 1] ? children(sections[j + 1]) : [];
+                contents.forEach((c, k) => {
+                    parts.push('I' + k + ':' + c.getAttribute('title') + ':' + c.getAttribute('itemtype'));
+                    states.push(c.getAttribute('completestate'));
+                });
+            }
+            i++;
+        }
+        const text = parts.join('|');
+        let hash = 5381;
+        for (let n = 0; n < text.length; n++) hash = ((hash * 33) ^ text.charCodeAt(n)) >>> 0;
+        return {fingerprint: hash.toString(16) + ':' + text.length + ':' + states.length, states: states};
+    }"""
+
 
-    def __init__(self, user_data: UserData):
+    def __init__(self, user_data: UserData, run_stats: UserRunStats = None):
         self.config = get_config()
+        self.clock = get_clock()
         self.user_data = user_data
+        self.run_stats = run_stats or UserRunStats(username=user_data.username, user_name=user_data.user_name)
         self.context : BrowserContext | None = None     # 在使用时才会初始化
+        self.api = None                                 # context.request, 录制/回放时为其包装
+        self.prefetch_trigger: asyncio.Event | None = None    # 当前课程进入尾声时设置, 用于触发预取
+        self.current_course: dict | None = None               # 正在学习的课程
+        self.unfinished_courses: list | None = None           # 本次运行需要学习的课程, 获取后作为续跑检查点
+        self.done_course_ids: set = set()                     # 本次运行已处理完的课程id
+        self.credit_summary: dict = {}                        # 最近一次学分统计结果
+        self.course_catalog = get_course_catalog()
+        self.structure_cache = get_course_structure_cache()
+        self.event_bus = get_event_bus()
         self.module_logger = get_user_module_logger(
             f"{self.user_data.user_name}_{self.user_data.username}",
             "Course"
         )
 
-        self.video_player = VideoPlayer(user_data)
+        self.video_player = VideoPlayer(user_data, self.run_stats)
 
     async def init_context(self, context: BrowserContext):
         self.context = context
+        self.api = get_har_transport(self.user_data.username).wrap_api(context.request)
         await self.video_player.init_context(self.context)
 
     async def run_study_course(self):
-        unfinished_course = await self.get_unfinished_courses()
-        self.module_logger.info(f"共找到 {len(unfinished_course)} 个未完成课程")
-        for index, course in enumerate(unfinished_course):
-            self.module_logger.info(f"开始学习第 {index + 1}/{len(unfinished_course)} 个课程: {course.get('name')}")
-            page_obj = await self.context.new_page()
-            try:
-                self.module_logger.info(f"正在学习第{index + 1}个课程, 课程名称为:{course.get('name')}")
-                await asyncio.sleep(random.random() * 3  + 1)
-                await self.study_single_course(course, page_obj)
-            finally:
-                await page_obj.close()
+        """
+        学习所有未完成课程, 重复调用时从检查点继续, 跳过本次运行已处理完的课程
+        """
+        if self.unfinished_courses is None:
+            self.unfinished_courses = await self.get_unfinished_courses()
+            self.module_logger.info(f"共找到 {len(self.unfinished_courses)} 个未完成课程")
+        unfinished_course = [c for c in self.unfinished_courses if c.get('id') not in self.done_course_ids]
+        if len(unfinished_course) < len(self.unfinished_courses):
+            self.module_logger.info(f"从检查点继续, 剩余 {len(unfinished_course)} 个课程")
+        prefetch_task: asyncio.Task | None = None
+        try:
+            for index, course in enumerate(unfinished_course):
+                self.module_logger.info(f"开始学习第 {index + 1}/{len(unfinished_course)} 个课程: {course.get('name')}")
+
+                # 优先使用预取好的课程页面, 预取失败时退回到串行准备
+                prepared = None
+                if prefetch_task is not None:
+                    prepared = await prefetch_task
+                    prefetch_task = None
+                if prepared is None:
+                    prepared = await self.prepare_course(course)
+
+                # 当前课程最后一个视频进入尾声时, 后台开始准备下一个课程
+                self.prefetch_trigger = asyncio.Event()
+                if index + 1 < len(unfinished_course):
+                    prefetch_task = asyncio.create_task(
+                        self.prefetch_course(unfinished_course[index + 1], self.prefetch_trigger)
+                    )
+
+                try:
+                    if prepared:
+                        self.current_course = course
+                        self.course_catalog.record_structure(course.get('name'), self.count_video_items(prepared.structure))
+                        self.module_logger.info(f"正在学习第{index + 1}个课程, 课程名称为:{course.get('name')}")
+                        self.event_bus.emit(CourseStarted(
+                            self.user_data.username, course=course.get('name'), index=index, total=len(unfinished_course)
+                        ))
+                        course_budget_s = derive_budget(self.course_catalog.course_video_seconds(course.get('name')))
+                        course_started_at = self.clock.wall()
+                        baseline = self.run_stats.course_counters()
+                        course_succeeded = False
+                        try:
+                            async with budget("course", course_budget_s):
+                                await self.study_course_content(prepared.page, prepared.structure)
+                            course_succeeded = True
+                        finally:
+                            self.run_stats.record_course(course.get('name'), course_started_at, baseline,
+                                                         course_succeeded)
+                        self.run_stats.courses_studied += 1
+                    # 学习完成或无法进入的课程都不再重复尝试
+                    self.done_course_ids.add(course.get('id'))
+                finally:
+                    # 当前课程结束(或失败)时, 无论是否到达视频尾声都放行预取
+                    self.prefetch_trigger.set()
+                    if prepared:
+                        await prepared.page.close()
+        finally:
+            if prefetch_task is not None:
+                prefetch_task.cancel()
+                leftover = (await asyncio.gather(prefetch_task, return_exceptions=True))[0]
+                if isinstance(leftover, PreparedCourse):
+                    await leftover.page.close()
 
         self.module_logger.info(f"用户 {self.user_data.user_name}_{self.user_data.username} 所有课程学习任务完成")
 
-    async def study_single_course(self, course, page_obj: Page):
+    async def prefetch_course(self, course, trigger: asyncio.Event):
         """
-        学习单个课程, 首先进行选课,然后打开对应页面学习
+        等待触发信号后在后台准备课程(选课/打开页面/解析目录)
+
+        Args:
+            course: 课程信息
+            trigger: 当前课程进入尾声或结束时被设置的事件
+        Returns:
+            PreparedCourse | None: 准备好的课程, 失败时返回None
+        """
+        await trigger.wait()
+        self.module_logger.info(f"开始预取下一个课程: {course.get('name')}")
+        return await self.prepare_course(course)
+
+    async def prepare_course(self, course):
+        """
+        准备单个课程: 首先进行选课, 然后打开课程页面, 关闭帮助助手并解析课程目录
+
+        Returns:
+            PreparedCourse | None: 准备好的课程, 失败时返回None
+        """
+        page_obj = await self.context.new_page()
+        try:
+            await self.clock.sleep(random.random() * 3 + 1)
+            if not await self.select_elective_course(course):
+                await page_obj.close()
+                return None
+            if not await self.open_course_page(course, page_obj):
+                await page_obj.close()
+                return None
+            course_study_detail = await self.load_course_structure(course, page_obj)
+            return PreparedCourse(course=course, page=page_obj, structure=course_study_detail)
+        except asyncio.CancelledError:
+            await page_obj.close()
+            raise
+        except Exception as e:
+            self.module_logger.error(f"准备课程 {course.get('name')} 失败: {e}")
+            await page_obj.close()
+            if is_supervised_failure(e):
+                raise
+            return None
+
+    async def select_elective_course(self, course) -> bool:
+        """
+        进行选课, 成功进入课程空间返回True
         """
         payload = {
             "entity.openCourse": course.get("openCourseId", ""),
             "entity.projectId": ""
         }
 
-        save_response = await self.context.request.get(
+        save_response = await step(self.api.get(
             self.config.web.select_elective_url,
             params=payload
-        )
+        ), "select_elective")
+        raise_for_status(save_response.status, self.config.web.select_elective_url)
 
         if save_response.status == 200:
             save_data = await save_response.json()
@@ -65,42 +216,52 @@ class CourseManager:
                 success = message.get('success', '0')
 
                 if success == '1':
-                    await self.open_and_study_course(course, page_obj)
+                    return True
                 else:
                     self.module_logger.error(f"进入课程空间失败: {message.get('info', '未知错误')}")
             else:
                 self.module_logger.error("保存选课信息失败: 返回数据格式不正确")
         else:
             self.module_logger.error(f"保存课程信息请求失败, 状态码: {save_response.status}")
+        return False
 
-    async def open_and_study_course(self, course, page_obj: Page):
+    async def open_course_page(self, course, page_obj: Page) -> bool:
         """
-        打开视频页面并学习课程
+        打开视频页面并关闭帮助助手
         """
         course_url = f"{course['learnspaceUrl']}/learnspace/sign/signLearn.action"
         course_url += f"?template=blue&courseId={course['id']}"
         course_url += f"&loginType=true&loginId={self.user_data.username}&sign=0&siteCode={self.config.web.site_code}"
         course_url += "&domain=youxun.webtrn.cn"
 
-        await page_obj.goto(course_url)
+        await step(page_obj.goto(course_url), "goto_course")
 
         if await page_obj.title() == "课程未发布":
             self.module_logger.error("课程未发布, 请检查该用户能否选择该课程!!!")
-            return
+            return False
 
-        frame_element = await page_obj.wait_for_selector("#learnHelperIframe", state="visible", timeout=30000)
-        await asyncio.sleep(random.random() * 3 + 1)
+        try:
+            frame_element = await page_obj.wait_for_selector("#learnHelperIframe", state="visible", timeout=30000)
+        except Exception:
+            await get_trace_recorder(self.user_data.username).dump("helper_iframe")
+            raise
+        await self.clock.sleep(random.random() * 3 + 1)
         frame = await  frame_element.content_frame()
-        await frame.click("a[onclick='closeLearnHelper()']")
+        await step(frame.click("a[onclick='closeLearnHelper()']"), "close_helper")
         self.module_logger.debug("已经关闭帮助助手页面")
-        await self.study_course_content(page_obj)
+        return True
 
-    async def study_course_content(self, page_obj: Page):
+    async def study_course_content(self, page_obj: Page, course_study_detail: list | None = None):
         """
         根据课程详情进行学习
         优化后的版本，只对需要学习的内容添加延迟，提高已完成课程的检查速度
+
+        Args:
+            page_obj: 课程页面
+            course_study_detail: 已解析的课程结构, 为空时重新解析
         """
-        course_study_detail = await self.parse_course_structure(page_obj)
+        if course_study_detail is None:
+            course_study_detail = await self.parse_course_structure(page_obj)
         # 初始化页面框架定位器
         section_frame = page_obj.frame_locator("#mainCont")
         video_frame = section_frame.frame_locator("#mainFrame")
@@ -151,9 +312,10 @@ class CourseManager:
         self.module_logger.info(f"开始学习课程，共 {len(chapters_to_learn)} 个章节需要学习，{total_contents_count} 个内容需要完成")
 
         if total_contents_count > 0:
+            await self.clock.sleep(random.random() * 3 + 1)
             await self.show_course_structure(page_obj)
 
-        await asyncio.sleep(random.random() * 3 + 1)
+        await self.clock.sleep(random.random() * 3 + 1)
 
         # 遍历需要学习的章节进行学习
         for chapter_index, chapter_info in enumerate(chapters_to_learn):
@@ -179,19 +341,25 @@ class CourseManager:
                     self.module_logger.info(f"    [{content_index + 1}/{len(contents_to_learn)}] {content_title} [{content_type}]")
                     self.module_logger.info(f"      → 开始学习内容")
 
+                    # 最后一个内容进入尾声时触发下一课程的预取
+                    is_last_content = (chapter_index == len(chapters_to_learn) - 1
+                                       and section_index == len(sections_to_learn) - 1
+                                       and content_index == len(contents_to_learn) - 1)
+                    self.video_player.near_end_event = self.prefetch_trigger if is_last_content else None
+
                     await self.study_single_content(content, video_frame)
 
                     # 内容间添加延迟（仅在需要学习的内容之间添加）
                     if content_index < len(contents_to_learn) - 1:  # 不是最后一条内容才添加延迟
-                        await asyncio.sleep(random.random() * 3 + 1)
+                        await self.clock.sleep(random.random() * 3 + 1)
 
                 # 小节间添加延迟（仅在需要学习的小节之间添加）
                 if section_index < len(sections_to_learn) - 1:  # 不是最后一个小节才添加延迟
-                    await asyncio.sleep(random.random() * 3 + 1)
+                    await self.clock.sleep(random.random() * 3 + 1)
 
             # 章节间添加延迟（仅在需要学习的章节之间添加）
             if chapter_index < len(chapters_to_learn) - 1:  # 不是最后一个章节才添加延迟
-                await asyncio.sleep(random.random() * 5 + 1)
+                await self.clock.sleep(random.random() * 5 + 1)
 
         self.module_logger.info("课程学习完成")
 
@@ -206,8 +374,10 @@ class CourseManager:
         content_title = content.get('title', '未知内容')
         content_type = content.get('itemtype', 'unknown')
         clicked = False
+        succeeded = False
+        self.run_stats.contents_studied += 1
         try:
-            await asyncio.sleep(random.random() * 3 + 1)
+            await self.clock.sleep(random.random() * 3 + 1)
             try:
                 await content['node'].evaluate("""element => {
                 element.scrollIntoView({block: 'center'});
@@ -218,18 +388,86 @@ class CourseManager:
             except Exception as e:
                  self.module_logger.error(f"      → 点击 {content_title} 失败：{e}")
 
-            await asyncio.sleep(1)
+            await self.clock.sleep(1)
             if content_type.strip() == 'video':
-                await self.video_player.play_video_content_with_retry(video_frame, content['node'])
+                self.video_player.last_video_duration_s = 0
+                # 已记录过该视频时长时按时长设置内容预算, 否则在读取到视频总时长后由播放器设置
+                course_name = self.current_course.get('name') if self.current_course else ""
+                content_budget_s = derive_budget(self.course_catalog.content_video_seconds(course_name, content_title))
+                async with budget("content", content_budget_s):
+                    await self.video_player.play_video_content_with_retry(video_frame, content['node'])
+                if self.video_player.last_video_duration_s and self.current_course:
+                    self.course_catalog.record_video(
+                        self.current_course.get('name'), content_title, self.video_player.last_video_duration_s
+                    )
             elif content_type.strip() == 'doc':
                 await self.study_document_content()
             elif content_type.strip() == 'test':
                 await self.start_exam_content()
             else:
                 self.module_logger.debug(f"      → 内容类型 {content_type}，暂不支持")
-                await asyncio.sleep(random.random() * 3 + 1)
+                await self.clock.sleep(random.random() * 3 + 1)
+            succeeded = True
         except Exception as e:
             self.module_logger.error(f"      → 尝试学习 {content_title} 失败：{e}")
+            # 页面崩溃、登录失效等需要监督器处理的错误继续上抛
+            if is_supervised_failure(e):
+                raise
+        finally:
+            if not succeeded:
+                self.run_stats.content_failures += 1
+            self.event_bus.emit(ContentDone(
+                self.user_data.username,
+                course=self.current_course.get('name') if self.current_course else "",
+                content=content_title, content_type=content_type.strip(), success=succeeded
+            ))
+
+    async def load_course_structure(self, course, page_obj: Page) -> list:
+        """
+        获取课程目录结构: 目录指纹与缓存一致时只读取一次完成状态, 否则完整解析并写入缓存
+
+        Args:
+            course: 课程信息
+            page_obj: 课程页面
+        Returns:
+            list: 与 parse_course_structure 相同格式的课程结构
+        """
+        course_id = str(course.get('id'))
+        learn_list_obj = page_obj.frame_locator("#mainCont").locator("#learnMenu")
+        snapshot = await learn_list_obj.evaluate(self.STRUCTURE_SNAPSHOT_JS)
+        skeleton = self.structure_cache.get(course_id, snapshot["fingerprint"])
+        if skeleton is not None and CourseStructureCache.content_count(skeleton) == len(snapshot["states"]):
+            self.module_logger.debug(f"使用缓存的课程目录结构: {course.get('name')}")
+            return self.build_course_structure(learn_list_obj, skeleton, snapshot["states"])
+
+        course_structure = await self.parse_course_structure(page_obj)
+        self.structure_cache.put(course_id, snapshot["fingerprint"], course_structure)
+        return course_structure
+
+    @staticmethod
+    def build_course_structure(learn_list_obj: Locator, skeleton: list, states: list) -> list:
+        """由缓存的目录骨架和当前用户的完成状态组装课程结构"""
+        child_nodes = learn_list_obj.locator("> div")
+        state_iter = iter(states)
+        course_structure = []
+        for chapter in skeleton:
+            section_list_child_nodes = child_nodes.nth(chapter["position"] + 1).locator("> div")
+            sections = []
+            for section in chapter["sections"]:
+                content_items = section_list_child_nodes.nth(section["position"] + 1).locator("> div")
+                contents = [
+                    {
+                        "node": content_items.nth(content["position"]),
+                        "title": content["title"],
+                        "itemtype": content["itemtype"],
+                        "completestate": next(state_iter),
+                        "position": content["position"],
+                    }
+                    for content in section["contents"]
+                ]
+                sections.append({"title": section["title"], "position": section["position"], "contents": contents})
+            course_structure.append({"title": chapter["title"], "position": chapter["position"], "sections": sections})
+        return course_structure
 
     async def parse_course_structure(self, page_obj: Page):
         """
@@ -294,6 +532,7 @@ class CourseManager:
                                 "title": content_title,
                                 "itemtype": item_type,
                                 "completestate": complete_state,
+                                "position": k,
                             }
 
                             contents.append(content_detail)
@@ -303,6 +542,7 @@ class CourseManager:
 
                         section_detail = {
                             "title": section_title,
+                            "position": j,
                             "contents": contents
                         }
                         sections.append(section_detail)
@@ -312,6 +552,7 @@ class CourseManager:
 
                 chapter_detail = {
                     "title": chapter_title,
+                    "position": i,
                     "sections": sections
                 }
                 course_structure.append(chapter_detail)
@@ -323,6 +564,17 @@ class CourseManager:
             i += 1
         return course_structure
 
+    @staticmethod
+    def count_video_items(course_structure: list) -> int:
+        """统计课程结构中的视频内容数量"""
+        return sum(
+            1
+            for chapter in course_structure
+            for section in chapter.get('sections', [])
+            for content in section.get('contents', [])
+            if (content.get('itemtype') or '').strip() == 'video'
+        )
+
     async def get_learn_course(self, search_key: str = "") -> list:
         """获取课程信息"""
         params = {
@@ -336,15 +588,16 @@ class CourseManager:
             "page.searchItem.searchKey": search_key,
             "page.orderBy": 1
         }
-        response = await self.context.request.get(
+        response = await step(self.api.get(
             self.config.web.course_status_url,
             params=params
-        )
+        ), "course_status")
+        raise_for_status(response.status, self.config.web.course_status_url)
         if response.status == 200:
             course_data = await response.json()
             page = course_data.get('page', {})
             items = page.get('items', [])
-            await asyncio.sleep(random.random() * 2)
+            await self.clock.sleep(random.random() * 2)
 
             return items
         else:
@@ -363,7 +616,7 @@ class CourseManager:
         unfinished_courses = []
         if not self.user_data.must_learn_course == "None":
             for must_course_name in self.user_data.must_learn_course:
-                await asyncio.sleep(random.random() * 2 + 2)
+                await self.clock.sleep(random.random() * 2 + 2)
                 course_items = await self.get_learn_course(must_course_name)
                 if not course_items:
                     self.module_logger.info(f"未找到必修课程 {must_course_name}, 请确认课程名称是否正确")
@@ -381,6 +634,7 @@ class CourseManager:
 
                 if not percent or not credit:
                     continue
+                self.course_catalog.record_progress(self.user_data.username, must_course_name, name, int(percent))
 
                 if int(percent) >= 100:
                     if is_in_learned:
@@ -413,7 +667,7 @@ class CourseManager:
         # 首先查询必修课程状态
         if not self.user_data.must_learn_course == "None":
             for must_course_name in self.user_data.must_learn_course:
-                await asyncio.sleep(random.random() * 2 + 2)
+                await self.clock.sleep(random.random() * 2 + 2)
                 course_items = await self.get_learn_course(must_course_name)
                 if not course_items:
                     self.module_logger.info(f"未找到必修课程 {must_course_name}, 请确认课程名称是否正确")
@@ -433,6 +687,7 @@ class CourseManager:
 
                 if not percent or not credit:
                     continue
+                self.course_catalog.record_progress(self.user_data.username, must_course_name, name, int(percent))
 
                 if int(percent) >= 100:
                     if is_in_learned:
@@ -457,6 +712,7 @@ class CourseManager:
         # 如果必修课学分已满足要求，则直接返回
         if total_earned_credit >= self.user_data.need_credit:
             self.module_logger.info("已达到目标学分要求， 无需学习更多课程")
+            self.record_credit_summary(accumulate_credit, learn_credit, unfinished_courses)
             return unfinished_courses
 
         # 获取所有课程补充最低学分要求
@@ -508,21 +764,42 @@ class CourseManager:
             self.module_logger.info(f"已达到目标学分 {self.user_data.need_credit}, 累计获得学分: {accumulate_credit}")
             self.module_logger.info(f"必修课程需要学习: {must_course_learn_credit}")
 
+        self.record_credit_summary(accumulate_credit, learn_credit, unfinished_courses)
         return unfinished_courses
 
+    def record_credit_summary(self, earned_credit: int, unfinished_credit: int, unfinished_courses: list):
+        """
+        记录学分统计结果, 供状态巡检报告使用
+
+        Args:
+            earned_credit: 已完成课程的学分
+            unfinished_credit: 待学习课程的学分
+            unfinished_courses: 待学习课程列表
+        """
+        self.credit_summary = {
+            "need_credit": self.user_data.need_credit,
+            "earned_credit": earned_credit,
+            "unfinished_credit": unfinished_credit,
+            "remaining_credit_needed": max(self.user_data.need_credit - earned_credit, 0),
+            "unfinished_courses": [
+                {"name": c.get('name'), "percent": c.get('percent'), "credit": c.get('credit')}
+                for c in unfinished_courses
+            ],
+        }
+
     async def study_document_content(self):
         """
         学习文档内容
         """
         self.module_logger.info(f"      → 文档内容，无需特殊处理")
-        await asyncio.sleep(random.random() * 3 + 2)
+        await self.clock.sleep(random.random() * 3 + 2)
 
     async def start_exam_content(self):
         """
         学习文档内容
         """
         self.module_logger.info(f"      → 文档内容，无需特殊处理")
-        await asyncio.sleep(random.random() * 3 + 2)
+        await self.clock.sleep(random.random() * 3 + 2)
 
     @staticmethod
     async def show_course_structure(page_obj: Page):
@@ -532,7 +809,6 @@ class CourseManager:
         Args:
             page_obj: 页面对象
         """
-        await asyncio.sleep(random.random() * 3 + 1)
         secton_frame = page_obj.frame_locator("#mainCont")
         learn_list_obj = secton_frame.locator("#learnMenu")
 
@@ -568,6 +844,3 @@ class CourseManager:
                 i += 1
 
             i += 1
-
-    async def select_elective_course(self, course) -> bool:
-        pass
\ No newline at end of file
@@ -1,30 +1,51 @@
-import asyncio
 import base64
 import json
-import os.path
 import random
+from http.cookies import SimpleCookie
 
 import aiohttp
-from aiohttp import ClientSession, ClientError
+from aiohttp import ClientSession
 from playwright.async_api import Browser, BrowserContext
+from yarl import URL
 
 from config.config_loader import UserData, get_config
+from utils.browser_profiles import get_browser_profile
 from utils.captcha import recognize_captcha_async
+from utils.clock import get_clock
+from utils.context_pool import apply_context_defaults, get_context_pool
+from utils.deadline import step
+from utils.errors import PermanentError, RetryableError, ServerError
+from utils.event_bus import LoginFailed, LoginSucceeded, get_event_bus
+from utils.har_transport import SessionAPIRequest, get_har_transport, release_har_transport
+from utils.host_limiter import get_host_limiter
 from utils.logger_manager import get_user_module_logger
+from utils.retry_policy import RetryPolicy, get_circuit_breaker, retry_call
+from utils.run_ledger import UserRunStats
+from utils.session_vault import SessionVault
+from utils.trace_recorder import get_trace_recorder, release_trace_recorder
 
 
 class LoginManager:
 
     # 常量
     MAX_LOGIN_ATTEMPTS = 3
+    LOGIN_RETRY_POLICY = RetryPolicy(max_attempts=MAX_LOGIN_ATTEMPTS, base_delay_s=1, jitter_s=2)
 
-    def __init__(self, user_data: UserData, browser: Browser, login_file: str = None):
+    def __init__(self, user_data: UserData, browser: Browser, session_vault: SessionVault = None,
+                 run_stats: UserRunStats = None):
         self.config = get_config()
+        self.clock = get_clock()
         self.user_data = user_data
+        self.run_stats = run_stats or UserRunStats(username=user_data.username, user_name=user_data.user_name)
         self.browser = browser
-        self.login_file = login_file
+        self.session_vault = session_vault
         self.isLogin = False
         self.session: ClientSession | None = None  # 声明类型并初始化为None
+        self.har_transport = get_har_transport(self.user_data.username)
+        self.host_limiter = get_host_limiter()
+        self.trace_recorder = get_trace_recorder(self.user_data.username)
+        self.event_bus = get_event_bus()
+        self.browser_profile = get_browser_profile(self.config.browser.profile, self.config.browser.browser_type)
         self.context: BrowserContext | None = None  # 声明类型并初始化为None
         self.module_logger = get_user_module_logger(
             f"{self.user_data.user_name}_{self.user_data.username}",
@@ -35,243 +56,196 @@ class LoginManager:
         """
         异步初始化用户: 首先尝试缓存登录, 如果登录失败才会正常登录流程
         """
-        if os.path.exists(self.login_file):
-            self.context = await self.browser.new_context(storage_state=self.login_file)
-            await self.context.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined  // 覆盖为undefined
-                });
-            """)
-            await self.context.set_extra_http_headers({"Accept-Language": "zh-CN"})
+        login_start = self.clock.time()
+        try:
+            return await self._login()
+        except Exception as e:
+            self.event_bus.emit(LoginFailed(self.user_data.username, reason=type(e).__name__))
+            raise
+        finally:
+            # 登录状态已转入 context, aiohttp 会话不再需要, 重新登录时会重新创建
+            await self.close_session()
+            self.run_stats.login_seconds += self.clock.time() - login_start
+
+    async def _login(self):
+        """登录流程本体, 由 login() 统计耗时"""
+        storage_state = None
+        if self.session_vault:
+            storage_state = self.session_vault.get(self.user_data.username, self.config.cookie.min_ttl_s)
+        if storage_state is not None:
+            self.context = await self.new_context(storage_state=storage_state)
             if await self.verify_login():
                 self.isLogin = True
                 self.module_logger.info("登录验证成功")
-                await asyncio.sleep(2)
+                self.event_bus.emit(LoginSucceeded(self.user_data.username, cached=True))
+                await self.clock.sleep(2)
                 return  True
             else:
                 self.module_logger.info(f"用户 {self.user_data.user_name}_{self.user_data.username} 缓存登录验证失败，尝试重新登录")
                 if await self.try_login():
                     self.isLogin = True
                     self.module_logger.info("登录验证成功")
-                    await asyncio.sleep(2)
+                    self.event_bus.emit(LoginSucceeded(self.user_data.username, cached=False))
+                    await self.clock.sleep(2)
                     return  True
                 else:
                     self.module_logger.error("登录验证失败")
+                    self.event_bus.emit(LoginFailed(self.user_data.username, reason="login_rejected"))
                     return False
         else:
             self.module_logger.info(f"用户 {self.user_data.user_name}_{self.user_data.username} 无缓存，开始登录")
-            self.session = ClientSession()
+            if self.session:
+                await self.session.close()
+            self.session = self.har_transport.client_session()
             if await self.try_login():
                 self.isLogin = True
                 self.module_logger.info("登录成功")
-                await asyncio.sleep(2)
+                self.event_bus.emit(LoginSucceeded(self.user_data.username, cached=False))
+                await self.clock.sleep(2)
                 return  True
             else:
                 self.module_logger.error("登录失败")
+                self.event_bus.emit(LoginFailed(self.user_data.username, reason="login_rejected"))
                 return False
 
     # 方法
-    async def try_login(self) -> bool:
-        """异步登录功能"""
+    async def try_login(self, convert_to_context: bool = True) -> bool:
+        """
+        异步登录功能
+        :param convert_to_context: 登录成功后是否转换为 Playwright context, 无浏览器巡检时为False
+        """
         # 创建aiohttp客户端会话
         if not hasattr(self, 'session') or self.session is None:
-            self.session = ClientSession()
+            self.session = self.har_transport.client_session()
 
         self.session.headers.update(self.get_headers())
 
-        cur_login_attempts = 0
-        base_delay = 1  # 基础延迟时间
-
-        while cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-            cur_login_attempts += 1
-            try:
-                # 计算指数退避延迟
-                delay = base_delay * (2 ** (cur_login_attempts - 1)) + random.random() * 2
-                self.module_logger.info(f"第 {cur_login_attempts} 次登录尝试，等待 {delay:.2f} 秒后执行")
-
-                # 首先访问登录页面，更新cookie参数
-                response = await self.session.get(self.config.web.login_page_url)
-                if response.status != 200:
-                    self.module_logger.error(f"访问登录页面失败，状态码: {response.status}")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        self.module_logger.error("达到最大重试次数，登录页面访问失败")
-                        return False
-
-                await asyncio.sleep(random.random() * 2 + 1)
-
-                # 获取验证码和识别结果
-                auth_code = ''
-                try:
-                    captcha_response = await self.session.get(self.config.web.qr_code_url)
-                    if captcha_response.status == 200:
-                        # 获取验证码图片
-                        captcha_content = await captcha_response.read()
-                        auth_code_base64 = base64.b64encode(captcha_content).decode("utf-8")
-                        auth_code = await recognize_captcha_async(
-                            self.config.qr_code.api_url,
-                            self.config.qr_code.token,
-                            auth_code_base64
-                        )
-                        self.module_logger.info(f"验证码识别结果: {auth_code}")
-                    else:
-                        self.module_logger.warning(f"获取验证码失败，状态码: {captcha_response.status}")
-                        if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                            await asyncio.sleep(delay)
-                            continue
-                        else:
-                            return False
-                except ClientError as e:
-                    self.module_logger.error(f"网络请求验证码时发生错误: {str(e)}")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        raise
-
-                # 构造登录请求参数
-                request_param = {
-                    "LoginID": self.user_data.username,
-                    "Password": self.user_data.userpwd,
-                    "AuthCode": auth_code,
-                    "ContentType": 'json',
-                    "client_id": self.config.web.client_id,
-                    "response_type": "code",
-                    "scope": "user_info",
-                    "AppID": "11",
-                    "redirect_uri": self.config.web.redirect_url + self.config.web.login_page_url
-                }
-
-                data_json = json.dumps(request_param)
-                data_b64 = base64.b64encode(data_json.encode("utf-8")).decode("utf-8")
-
-                # 构造最终的请求数据
-                payload = {
-                    "data": data_b64,
-                    "ContentType": "json"
-                }
-
-                response = await self.session.post(
-                    self.config.web.sso_login_url,
-                    data=payload,
-                )
+        async def log_retry(attempt: int, error: Exception, delay: float):
+            self.module_logger.error(f"第 {attempt} 次尝试失败: {error}，{delay:.2f} 秒后重新尝试...")
 
-                if response.status != 200:
-                    self.module_logger.error(f"登录请求失败，状态码 {response.status}")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        self.module_logger.error("达到最大重试次数，登录请求失败")
-                        return False
-
-                # 检查响应的内容类型
-                try:
-                    content_type = response.headers.get('content-type', '').lower()
-
-                    if 'application/json' in content_type:
-                        result = await response.json()
-                    elif 'text/javascript' in content_type:
-                        text_content = await response.text()
-                        result = json.loads(text_content)
-                    else:
-                        text_content = await response.text()
-                        result = json.loads(text_content)
-                except Exception as e:
-                    self.module_logger.error(f"解析登录响应JSON失败: {str(e)}")
-                    self.module_logger.error(f"响应内容: {await response.text()}")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        raise
-
-                if not result.get("success"):
-                    error_message = result.get("message", "未知错误")
-                    self.module_logger.error(f"登录失败，错误信息: {error_message}")
-
-                    # 如果是验证码错误，重新获取验证码重试
-                    if "验证码" in error_message or "authcode" in error_message.lower():
-                        self.module_logger.error(
-                            f"第 {cur_login_attempts} 次尝试失败, 因验证码失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    # 如果是账号密码错误，直接返回失败，不需要重试
-                    elif "密码" in error_message or "password" in error_message.lower():
-                        self.module_logger.error("账号或密码错误，终止重试")
-                        return False
-                    # 其他错误根据剩余尝试次数决定是否重试
-                    elif cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        return False
-
-                # 处理重定向，更新cookie参数
-                redirect_url = result.get("redirectURL") or result.get("RedirectURL")
-                if not redirect_url:
-                    self.module_logger.error(f"登录失败，未找到重定向URL")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        self.module_logger.error("达到最大重试次数，未找到重定向URL")
-                        return False
+        try:
+            return await retry_call(
+                lambda attempt: self._login_attempt(attempt, convert_to_context),
+                self.LOGIN_RETRY_POLICY,
+                on_retry=log_retry
+            )
+        except PermanentError as e:
+            self.module_logger.error(f"{e}，终止重试")
+            return False
+        except (RetryableError, ServerError) as e:
+            self.module_logger.error(f"达到最大登录尝试次数 ({self.MAX_LOGIN_ATTEMPTS})，登录失败: {e}")
+            return False
 
-                try:
-                    redirect_response = await self.session.get(redirect_url)
-                    if redirect_response.status != 200:
-                        self.module_logger.error(f"重定向请求失败，状态码 {redirect_response.status}")
-                        if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                            self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                            await asyncio.sleep(delay)
-                            continue
-                        else:
-                            self.module_logger.error("达到最大重试次数，重定向请求失败")
-                            return False
-                except ClientError as e:
-                    self.module_logger.error(f"重定向请求时发生网络错误: {str(e)}")
-                    if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                        self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                        await asyncio.sleep(delay)
-                        continue
-                    else:
-                        raise
-
-                self.module_logger.info(f"登录成功")
-                # 转换 session cookies 到 context 并保存
-                return await self.convert_session_to_context()
-
-            except ClientError as e:
-                self.module_logger.error(f"网络请求时发生错误: {str(e)}")
-                if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                    self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                    await asyncio.sleep(delay)
-                    continue
-                else:
-                    raise
-            except Exception as e:
-                self.module_logger.error(f"登录过程中发生未预期的错误: {str(e)}")
-                if cur_login_attempts < self.MAX_LOGIN_ATTEMPTS:
-                    self.module_logger.error(f"第 {cur_login_attempts} 次尝试失败，{delay:.2f} 秒后重新尝试...")
-                    await asyncio.sleep(delay)
-                    continue
-                else:
-                    raise
+    async def _login_attempt(self, attempt: int, convert_to_context: bool) -> bool:
+        """
+        单次登录尝试, 失败时抛出异常由重试策略处理
+        :param attempt: 当前尝试次数
+        :param convert_to_context: 登录成功后是否转换为 Playwright context
+        """
+        self.run_stats.login_attempts += 1
+        self.module_logger.info(f"第 {attempt} 次登录尝试")
+
+        # 首先访问登录页面，更新cookie参数
+        response = await self._request("GET", self.config.web.login_page_url)
+        if response.status != 200:
+            raise RetryableError(f"访问登录页面失败，状态码: {response.status}")
+
+        await self.clock.sleep(random.random() * 2 + 1)
+
+        # 获取验证码和识别结果
+        captcha_response = await self._request("GET", self.config.web.qr_code_url)
+        if captcha_response.status != 200:
+            raise RetryableError(f"获取验证码失败，状态码: {captcha_response.status}")
+        # 获取验证码图片
+        captcha_content = await captcha_response.read()
+        auth_code_base64 = base64.b64encode(captcha_content).decode("utf-8")
+        async with self.host_limiter.limit(self.config.qr_code.api_url):
+            auth_code = await recognize_captcha_async(
+                self.config.qr_code.api_url,
+                self.config.qr_code.token,
+                auth_code_base64,
+                session=self.har_transport.captcha_session()
+            )
+        self.module_logger.info(f"验证码识别结果: {auth_code}")
+
+        # 构造登录请求参数
+        request_param = {
+            "LoginID": self.user_data.username,
+            "Password": self.user_data.userpwd,
+            "AuthCode": auth_code,
+            "ContentType": 'json',
+            "client_id": self.config.web.client_id,
+            "response_type": "code",
+            "scope": "user_info",
+            "AppID": "11",
+            "redirect_uri": self.config.web.redirect_url + self.config.web.login_page_url
+        }
 
-        self.module_logger.error(f"达到最大登录尝试次数 ({self.MAX_LOGIN_ATTEMPTS})，登录失败")
-        return False
+        data_json = json.dumps(request_param)
+        data_b64 = base64.b64encode(data_json.encode("utf-8")).decode("utf-8")
 
-    async def verify_login(self) -> bool:
-        """验证登陆状态"""
+        # 构造最终的请求数据
+        payload = {
+            "data": data_b64,
+            "ContentType": "json"
+        }
+
+        response = await self._request("POST", self.config.web.sso_login_url, data=payload)
+        if response.status != 200:
+            raise RetryableError(f"登录请求失败，状态码 {response.status}")
+
+        # 检查响应的内容类型
+        try:
+            content_type = response.headers.get('content-type', '').lower()
+
+            if 'application/json' in content_type:
+                result = await response.json()
+            else:
+                text_content = await response.text()
+                result = json.loads(text_content)
+        except Exception as e:
+            self.module_logger.error(f"响应内容: {await response.text()}")
+            raise RetryableError(f"解析登录响应JSON失败: {str(e)}")
+
+        if not result.get("success"):
+            error_message = result.get("message", "未知错误")
+            # 账号密码错误不需要重试, 验证码错误及其他错误重新获取验证码重试
+            if "密码" in error_message or "password" in error_message.lower():
+                raise PermanentError(f"账号或密码错误: {error_message}")
+            raise RetryableError(f"登录失败，错误信息: {error_message}")
+
+        # 处理重定向，更新cookie参数
+        redirect_url = result.get("redirectURL") or result.get("RedirectURL")
+        if not redirect_url:
+            raise RetryableError("登录失败，未找到重定向URL")
+
+        redirect_response = await self._request("GET", redirect_url)
+        if redirect_response.status != 200:
+            raise RetryableError(f"重定向请求失败，状态码 {redirect_response.status}")
+
+        self.module_logger.info(f"登录成功")
+        if not convert_to_context:
+            return True
+        # 转换 session cookies 到 context 并保存
+        return await self.convert_session_to_context()
+
+    async def _request(self, method: str, url: str, **kwargs):
+        """
+        在主机并发上限和接口断路器保护下发起登录请求, 服务端错误抛出 ServerError
+        """
+        async with get_circuit_breaker(url).guard():
+            async with self.host_limiter.limit(url):
+                request = self.session.get if method == "GET" else self.session.post
+                response = await step(request(url, **kwargs), "login_request")
+            if response.status >= 500:
+                raise ServerError(response.status, url)
+        return response
+
+    async def verify_login(self, api=None) -> bool:
+        """
+        验证登陆状态
+        :param api: 发起请求的接口对象, 默认使用当前 context.request
+        """
         params = {
             "data": "info",
             "page.curPage": 1,
@@ -279,11 +253,13 @@ class LoginManager:
             "page.searchItem.type": 0
         }
 
-        if self.context:
-            response = await self.context.request.get(
+        if api is None and self.context:
+            api = self.har_transport.wrap_api(self.context.request)
+        if api:
+            response = await step(api.get(
                 self.config.web.check_login_status_url,
                 params=params
-            )
+            ), "verify_login")
             if response.status == 200:
                 result = await response.json()
                 if result.get('errorCode') == '0' and result.get('errorMessage') == '成功':
@@ -298,19 +274,31 @@ class LoginManager:
 
     async def convert_session_to_context(self) -> bool:
         """
-        将 aiohttp session 中的 cookies 转换为 Playwright context 并保存到文件
+        将 aiohttp session 中的 cookies 转换为 Playwright context 并保存到会话存储
         """
-        # 创建新的context
-        self.context = await self.browser.new_context()
-        # 注入JS代码，隐藏webdriver标识
-        await self.context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined  // 覆盖为undefined
-            });
-        """)
+        # 创建新的context, 关闭缓存登录失败时留下的旧context
+        await self.close_context()
+        self.context = await self.new_context()
 
+        cookies = self.session_cookies()
+        if cookies:
+            await self.context.add_cookies(cookies)
+
+        if await self.verify_login():
+            if self.session_vault:
+                storage_state = await self.context.storage_state()
+                await self.session_vault.save(self.user_data.username, storage_state)
+                self.module_logger.info("已保存登录信息到会话存储")
+            return True
+        else:
+            self.module_logger.error(f"无法验证登录状态")
+            return False
+
+
+    def session_cookies(self) -> list[dict]:
+        """将 aiohttp session 中的 cookies 转换为 Playwright cookie 格式"""
+        cookies = []
         if hasattr(self.session, 'cookie_jar'):
-            cookies = []
             for cookie in self.session.cookie_jar:
                 secure = cookie["secure"] if "secure" in cookie else False
                 http_only = cookie["httponly"] if "httponly" in cookie else False
@@ -323,33 +311,115 @@ class LoginManager:
                     "secure": bool(secure),
                     "httpOnly": bool(http_only)
                 })
+        return cookies
 
-            if cookies:
-                await self.context.add_cookies(cookies)
+    async def http_login(self) -> bool:
+        """
+        仅通过 aiohttp 登录, 不创建浏览器 context, 供无浏览器的状态巡检使用
+        优先使用会话存储中的cookie, 失效时走完整登录流程并把新cookie写回会话存储
+        """
+        if self.session:
+            await self.session.close()
+        self.session = self.har_transport.client_session()
+        api = SessionAPIRequest(self.session)
+
+        storage_state = None
+        if self.session_vault:
+            storage_state = self.session_vault.get(self.user_data.username, self.config.cookie.min_ttl_s)
+        if storage_state is not None:
+            for cookie in storage_state.get("cookies", []):
+                morsel = SimpleCookie({cookie["name"]: cookie["value"]})[cookie["name"]]
+                morsel["domain"] = cookie["domain"]
+                morsel["path"] = cookie.get("path", "/")
+                self.session.cookie_jar.update_cookies(
+                    {cookie["name"]: morsel}, URL(f"https://{cookie['domain'].lstrip('.')}/")
+                )
+            if await self.verify_login(api):
+                self.isLogin = True
+                return True
+            self.module_logger.info("缓存登录验证失败，尝试重新登录")
 
-        if await self.verify_login():
-            if self.login_file:
-                folder_path = os.path.dirname(self.login_file)
-                if folder_path and not os.path.exists(folder_path):
-                    os.makedirs(folder_path)
+        if not await self.try_login(convert_to_context=False) or not await self.verify_login(api):
+            return False
+        self.isLogin = True
+        if self.session_vault:
+            await self.session_vault.save(self.user_data.username, {"cookies": self.session_cookies(), "origins": []})
+        return True
 
-                await self.context.storage_state(path=self.login_file)
-                self.module_logger.info(f"已保存登录信息到 {self.login_file}")
+    async def new_context(self, storage_state: dict = None) -> BrowserContext:
+        """
+        获取 context: 优先从复用池取出已应用公共设置的 context 并载入登录状态;
+        否则新建, 应用浏览器配置预设和公共设置, 并按配置挂载录制/回放
+        """
+        context_pool = get_context_pool()
+        context = await context_pool.acquire(self.browser, storage_state) if context_pool.enabled else None
+        if context is None:
+            context = await self.browser.new_context(
+                storage_state=storage_state,
+                **self.browser_profile.context_options(), **self.har_transport.context_options()
+            )
+            await self.har_transport.attach(context)
+            await apply_context_defaults(context)
+        await self.trace_recorder.attach(context)
+        return context
+
+    async def is_context_alive(self) -> bool:
+        """探测当前 context 是否仍可用"""
+        if not self.context:
+            return False
+        try:
+            await self.context.cookies()
             return True
-        else:
-            self.module_logger.error(f"无法验证登录状态")
+        except Exception:
             return False
 
+    async def close_context(self):
+        """关闭当前 context(来自复用池时清理后归还), 忽略已失效 context 的关闭错误"""
+        if self.context:
+            await self.trace_recorder.detach()
+            context_pool = get_context_pool()
+            if context_pool.owns(self.context):
+                await context_pool.release(self.context)
+            else:
+                try:
+                    await self.context.close()
+                except Exception as e:
+                    self.module_logger.debug(f"关闭context出错: {e}")
+            self.context = None
+
+    async def rebuild_context(self, browser: Browser = None) -> bool:
+        """
+        重建 context: 优先使用会话存储中的登录状态, 失效时重新登录
+        :param browser: 浏览器断开后新启动的浏览器, 为空时沿用当前浏览器
+        """
+        if browser:
+            self.browser = browser
+        await self.close_context()
+        self.isLogin = False
+        return await self.login()
+
+    async def relogin(self) -> bool:
+        """登录失效时丢弃缓存的登录状态并重新登录"""
+        if self.session_vault:
+            await self.session_vault.delete(self.user_data.username)
+        return await self.rebuild_context()
+
+    async def close_session(self):
+        """关闭登录用的 aiohttp 会话"""
+        if self.session:
+            await self.session.close()
+            self.session = None
 
     async def close(self):
         """
         清理资源
         :return:
         """
-        if hasattr(self, 'session') and self.session:
-            await self.session.close()
-        if self.context:
-            await self.context.close()
+        await self.close_session()
+        await self.close_context()
+        await release_trace_recorder(self.user_data.username)
+        # context 关闭后 HAR 已写入, 保存接口录制
+        await release_har_transport(self.user_data.username)
 
     # async def block_resources(self, route):
     #     url = route.request.url
@@ -0,0 +1,106 @@
+import asyncio
+import csv
+import json
+import os
+
+from config.config_loader import UserData, get_config, read_user_info
+from user.login_manager import LoginManager
+from user.study_manager import StudyManager
+from utils.course_catalog import get_course_catalog
+from utils.har_transport import SessionAPIRequest
+from utils.logger_manager import get_module_logger, release_user_loggers
+from utils.session_vault import SessionVault
+
+
+class StatusSweep:
+    """
+    无浏览器状态巡检: 复用登录和学分统计逻辑, 仅通过 HTTP 并发检查所有账户的学分/进度,
+    输出每个用户的报告, 同时把课程进度写入课程目录供运行规划使用
+    """
+
+    def __init__(self):
+        self.config = get_config()
+        self.module_logger = get_module_logger("Sweep")
+        self.session_vault = SessionVault(self.config.cookie.vault_path)
+
+    async def run(self, users_data: list[UserData] = None) -> list[dict]:
+        """
+        :param users_data: 要巡检的用户, 为空时从账户表格读取
+        """
+        if users_data is None:
+            users_data = await asyncio.to_thread(read_user_info, self.config.account)
+        await self.session_vault.load(legacy_prefix=self.config.cookie.save_path)
+
+        semaphore = asyncio.Semaphore(self.config.sweep.concurrency)
+        self.module_logger.info(f"开始巡检 {len(users_data)} 个用户, 并发数 {self.config.sweep.concurrency}")
+        try:
+            reports = await asyncio.gather(*(self.check_user(user_data, semaphore) for user_data in users_data))
+        finally:
+            self.session_vault.close()
+
+        await asyncio.to_thread(self.write_report, reports)
+        await asyncio.to_thread(get_course_catalog().save)
+
+        ok_count = sum(1 for r in reports if r["status"] == "ok")
+        pending_count = sum(1 for r in reports if r.get("unfinished_courses"))
+        self.module_logger.info(
+            f"巡检完成: 成功 {ok_count}/{len(reports)}, 仍有未完成课程 {pending_count} 个, "
+            f"报告已保存到 {self.config.sweep.report_path}"
+        )
+        return reports
+
+    async def check_user(self, user_data: UserData, semaphore: asyncio.Semaphore) -> dict:
+        """检查单个用户的学分和课程进度"""
+        report = {"username": user_data.username, "user_name": user_data.user_name, "status": "ok"}
+        async with semaphore:
+            login_manager = LoginManager(user_data, None, self.session_vault)
+            try:
+                if not await login_manager.http_login():
+                    report["status"] = "login_failed"
+                    return report
+
+                api = SessionAPIRequest(login_manager.session)
+                study_manager = StudyManager(user_data)
+                study_manager.api = api
+                study_manager.course_manager.api = api
+
+                if await study_manager.check_is_need_settings():
+                    report["status"] = "need_settings"
+                    return report
+                if not await study_manager.get_project_class_id():
+                    report["status"] = "no_project"
+                    return report
+
+                await study_manager.course_manager.get_unfinished_courses_contain_credit()
+                report.update(study_manager.course_manager.credit_summary)
+            except Exception as e:
+                self.module_logger.error(f"用户 {user_data.user_name}_{user_data.username} 巡检出错: {e}")
+                report["status"] = "error"
+                report["error"] = str(e)
+            finally:
+                await login_manager.close()
+                # 巡检账户数可能很多, 及时关闭每个用户的日志文件
+                release_user_loggers(f"{user_data.user_name}_{user_data.username}")
+        return report
+
+    def write_report(self, reports: list[dict]):
+        """保存json报告, 并生成便于在Excel中查看的csv"""
+        report_path = self.config.sweep.report_path
+        folder_path = os.path.dirname(report_path)
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+
+        csv_path = os.path.splitext(report_path)[0] + ".csv"
+        with open(csv_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["账号", "姓名", "状态", "要求学分", "已修学分", "待修学分", "未完成课程数", "未完成课程"])
+            for r in reports:
+                courses = r.get("unfinished_courses", [])
+                writer.writerow([
+                    r["username"], r["user_name"], r["status"],
+                    r.get("need_credit", ""), r.get("earned_credit", ""), r.get("unfinished_credit", ""),
+                    len(courses), "，".join(f"{c['name']}({c['percent']}%)" for c in courses)
+                ])
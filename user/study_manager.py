@@ -1,33 +1,43 @@
-import asyncio
 import random
 
 from playwright.async_api import BrowserContext, Page, Locator
 
 from config.config_loader import UserData, get_config
 from user.course_manager import CourseManager
+from utils.clock import get_clock
+from utils.deadline import step
+from utils.errors import raise_for_status
+from utils.event_bus import StudyStopped, get_event_bus
+from utils.har_transport import get_har_transport
 from utils.logger_manager import get_user_module_logger
+from utils.run_ledger import UserRunStats
 
 
 class StudyManager:
 
-    def __init__(self, user_data: UserData):
+    def __init__(self, user_data: UserData, run_stats: UserRunStats = None):
         self.config = get_config()
+        self.clock = get_clock()
         self.user_data = user_data
+        self.run_stats = run_stats or UserRunStats(username=user_data.username, user_name=user_data.user_name)
         self.context : BrowserContext | None = None     # 在使用时才会初始化
+        self.api = None                                 # context.request, 录制/回放时为其包装
+        self.event_bus = get_event_bus()
         self.module_logger = get_user_module_logger(
             f"{self.user_data.user_name}_{self.user_data.username}",
             "Study"
         )
 
-        self.course_manager = CourseManager(self.user_data)
+        self.course_manager = CourseManager(self.user_data, self.run_stats)
 
     async def init_context(self, context: BrowserContext):
         self.context = context
+        self.api = get_har_transport(self.user_data.username).wrap_api(context.request)
         await self.course_manager.init_context(self.context)
 
     # 方法
     async def run_study_process(self):
-        await asyncio.sleep(random.random() * 2 + 1)
+        await self.clock.sleep(random.random() * 2 + 1)
 
         if not self.context:
             self.module_logger.error("用户上下文未初始化")
@@ -37,16 +47,29 @@ class StudyManager:
         # 查看未完成课程信息
         if await self.check_is_need_settings():
             self.module_logger.info("需要认证，停止学习任务")
+            self.event_bus.emit(StudyStopped(self.user_data.username, reason="need_settings"))
             return
 
         if not await self.get_project_class_id():
             self.module_logger.info("获取项目课程ID失败")
+            self.event_bus.emit(StudyStopped(self.user_data.username, reason="no_project"))
             return
         await self.course_manager.run_study_course()
 
+    async def resume_study_process(self):
+        """从检查点继续学习, 不重新执行认证检查和项目查询"""
+        if not self.can_resume():
+            await self.run_study_process()
+            return
+        await self.course_manager.run_study_course()
+
+    def can_resume(self) -> bool:
+        return self.course_manager.unfinished_courses is not None
+
     async def check_is_need_settings(self):
         """查看是否需要认证，如果需要认证，则无法进行"""
-        response = await self.context.request.post(self.config.web.check_is_need_setting)
+        response = await step(self.api.post(self.config.web.check_is_need_setting), "need_setting")
+        raise_for_status(response.status, self.config.web.check_is_need_setting)
         if response.status == 200:
             data = await response.json()
             page = data.get("page", [])
@@ -67,10 +90,11 @@ class StudyManager:
             "page.searchItem.searchScoreTypeSort": "sort2025",
             "page.searchItem.typeId": 4
         }
-        response = await self.context.request.get(
+        response = await step(self.api.get(
             self.config.web.project_class_id_url,
             params=params
-        )
+        ), "project_class_id")
+        raise_for_status(response.status, self.config.web.project_class_id_url)
         if response.status == 200:
             project_data = await response.json()
             if project_data.get("errorCode", '') == "0" and project_data.get("errorMessage", "") == "成功":
@@ -3,26 +3,29 @@ from playwright.async_api import Browser
 from config.config_loader import get_config, UserData
 from user.login_manager import LoginManager
 from user.study_manager import StudyManager
-from utils.logger_manager import get_user_module_logger
+from utils.logger_manager import get_user_module_logger, release_user_loggers
+from utils.run_ledger import UserRunStats
+from utils.session_vault import SessionVault
 
 
 class UserAsync:
     # 属性
 
     # 方法
-    def __init__(self, user_data: UserData, browser: Browser, login_file: str = None):
+    def __init__(self, user_data: UserData, browser: Browser, session_vault: SessionVault = None):
         self.config = get_config()
         self.user_data = user_data
         self.browser = browser
-        self.login_file = login_file
+        self.session_vault = session_vault
+        self.run_stats = UserRunStats(username=self.user_data.username, user_name=self.user_data.user_name)
         self.module_logger = get_user_module_logger(
             f"{self.user_data.user_name}_{self.user_data.username}",
             "Login"
         )
 
         # 初始化各个模块
-        self.login_manager = LoginManager(self.user_data, self.browser, self.login_file)
-        self.study_manager = StudyManager(self.user_data)
+        self.login_manager = LoginManager(self.user_data, self.browser, self.session_vault, self.run_stats)
+        self.study_manager = StudyManager(self.user_data, self.run_stats)
 
     async def initialize(self):
         """
@@ -37,6 +40,7 @@ class UserAsync:
         :return:
         """
         await self.login_manager.close()
+        release_user_loggers(f"{self.user_data.user_name}_{self.user_data.username}")
 
     async def run(self):  # 调用study_manager.run_study_process()
         """
@@ -48,6 +52,43 @@ class UserAsync:
         await self.study_manager.init_context(self.login_manager.context)
         await self.study_manager.run_study_process()
 
+    async def resume(self):
+        """
+        从当前课程继续学习, 跳过认证检查和课程查询
+        :return:
+        """
+        await self.study_manager.resume_study_process()
+
+    def can_resume(self) -> bool:
+        """
+        是否已具备续跑条件(已登录且已获取课程列表)
+        :return:
+        """
+        return self.login_manager.isLogin and self.study_manager.can_resume()
+
+    async def rebuild_context(self, browser: Browser = None) -> bool:
+        """
+        重建浏览器上下文并重新挂载到学习模块
+        :param browser: 新的浏览器对象, 为空时沿用当前浏览器
+        :return:
+        """
+        if browser:
+            self.browser = browser
+        if not await self.login_manager.rebuild_context(browser):
+            return False
+        await self.study_manager.init_context(self.login_manager.context)
+        return True
+
+    async def relogin(self) -> bool:
+        """
+        登录失效后重新登录并重新挂载到学习模块
+        :return:
+        """
+        if not await self.login_manager.relogin():
+            return False
+        await self.study_manager.init_context(self.login_manager.context)
+        return True
+
     def is_initialized(self) -> bool:
         """
         检查用户是否已初始化
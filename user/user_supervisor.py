@@ -0,0 +1,104 @@
+from typing import Awaitable, Callable
+
+from playwright.async_api import Browser
+
+from config.config_loader import get_config
+from user.user_async import UserAsync
+from utils.clock import get_clock
+from utils.deadline import budget, derive_budget
+from utils.errors import FailureKind, classify_failure
+from utils.logger_manager import get_user_module_logger
+from utils.run_planner import RunPlanner
+
+
+class UserSupervisor:
+    """
+    用户任务监督器: 学习过程中出错时按失败类型只重建必要的部分(页面/上下文/登录/浏览器),
+    然后从当前课程继续学习, 重启次数受预算限制
+    """
+
+    def __init__(self, user_async: UserAsync, browser_provider: Callable[[], Awaitable[Browser]]):
+        """
+        :param user_async: 被监督的用户
+        :param browser_provider: 返回可用浏览器的协程函数, 浏览器断开时用于获取新的浏览器
+        """
+        self.config = get_config()
+        self.clock = get_clock()
+        self.user_async = user_async
+        self.browser_provider = browser_provider
+        self.restart_count = 0
+        self.module_logger = get_user_module_logger(
+            f"{self.user_async.user_data.user_name}_{self.user_async.user_data.username}",
+            "Supervisor"
+        )
+
+    async def run(self) -> bool:
+        """
+        运行用户任务, 失败时按分类恢复并续跑
+        每次尝试都在按剩余工作量重新估算的用户总预算内执行, 超出预算与其他失败一样上报给监督器,
+        重建上下文后续跑并计入重启次数, 课程目录估算偏低时不会直接放弃仍在推进的用户
+        :return: 学习任务是否完成
+        """
+        max_restarts = self.config.supervisor.max_restarts
+        resume = False
+        while True:
+            try:
+                await self._attempt(resume)
+                return True
+            except Exception as e:
+                kind = await self.diagnose(e)
+                self.restart_count += 1
+                self.user_async.run_stats.restarts += 1
+                if kind == FailureKind.DEADLINE_EXCEEDED:
+                    self.user_async.run_stats.deadline_overruns += 1
+                self.module_logger.error(
+                    f"学习任务失败 [{kind.value}] ({self.restart_count}/{max_restarts}): {e}"
+                )
+                if self.restart_count > max_restarts:
+                    self.module_logger.error("达到最大重启次数，放弃该用户")
+                    return False
+                if not await self.recover(kind):
+                    self.module_logger.error("恢复失败，放弃该用户")
+                    return False
+                # 登录信息和课程列表已就绪时, 直接从当前课程继续
+                resume = self.user_async.can_resume()
+
+    async def _attempt(self, resume: bool):
+        """
+        一次运行尝试: 登录在进入监督器前完成, 恢复时的重建和重新登录也在预算之外, 预算只覆盖学习过程
+        有课程尚无时长数据时不设用户总预算, 只由课程/内容/视频各级预算限制
+        """
+        user_budget_s = derive_budget(RunPlanner().measured_user_seconds(self.user_async.user_data))
+        async with budget("user", user_budget_s):
+            if resume:
+                await self.user_async.resume()
+            else:
+                await self.user_async.run()
+
+    async def diagnose(self, error: Exception) -> FailureKind:
+        """对失败分类, 对无法从错误信息判断的情况探测浏览器和上下文状态"""
+        kind = classify_failure(error)
+        if kind in (FailureKind.PAGE_CRASHED, FailureKind.CONTEXT_CLOSED, FailureKind.CONTENT_FAILED,
+                    FailureKind.UNKNOWN):
+            if not self.user_async.browser.is_connected():
+                return FailureKind.BROWSER_DISCONNECTED
+            if not await self.user_async.login_manager.is_context_alive():
+                return FailureKind.CONTEXT_CLOSED
+        return kind
+
+    async def recover(self, kind: FailureKind) -> bool:
+        """按失败类型重建所需资源"""
+        if kind == FailureKind.BROWSER_DISCONNECTED:
+            browser = await self.browser_provider()
+            return await self.user_async.rebuild_context(browser)
+        if kind in (FailureKind.CONTEXT_CLOSED, FailureKind.DEADLINE_EXCEEDED):
+            # 超时的页面可能仍挂起在某个操作上, 丢弃整个上下文重建
+            return await self.user_async.rebuild_context()
+        if kind == FailureKind.AUTH_EXPIRED:
+            return await self.user_async.relogin()
+        if kind == FailureKind.SERVER_ERROR:
+            delay = self.config.supervisor.server_error_backoff_s * self.restart_count
+            self.module_logger.info(f"服务端错误，等待 {delay} 秒后继续")
+            await self.clock.sleep(delay)
+        # 页面崩溃/内容失败: 课程页面在 CourseManager 中按课程重新打开, 无需额外重建
+        return True
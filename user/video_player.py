@@ -4,7 +4,17 @@ import random
 from playwright.async_api import BrowserContext, Locator
 
 from config.config_loader import UserData, get_config
+from utils.clock import get_clock
+from utils.context_pool import get_context_pool
+from utils.deadline import budget, derive_budget, step
+from utils.errors import RetryableError, VideoStudyError
+from utils.event_bus import VideoProgress, VideoRecovered, VideoStuck, get_event_bus
+from utils.retry_policy import RetryPolicy, get_circuit_breaker, retry_call
 from utils.logger_manager import get_user_module_logger
+from utils.progress_tracker import ProgressTracker
+from utils.run_ledger import UserRunStats
+from utils.trace_recorder import get_trace_recorder
+from utils.time_utils import time_str_to_seconds, seconds_to_time_str
 
 
 class VideoPlayer:
@@ -14,72 +24,104 @@ class VideoPlayer:
     RECOVER_MAX_TRY = 3     # 恢复视频播放失败最大尝试次数
     VIDEO_MAX_RETRY = 3     # 视频学习失败重试次数
 
+    ENSURE_RETRY_POLICY = RetryPolicy(max_attempts=ENSURE_MAX_TRY + 1, base_delay_s=1, multiplier=1, jitter_s=2)
+    RECOVER_RETRY_POLICY = RetryPolicy(max_attempts=RECOVER_MAX_TRY, base_delay_s=0, jitter_s=0.5)
+    VIDEO_RETRY_POLICY = RetryPolicy(max_attempts=VIDEO_MAX_RETRY, base_delay_s=2, jitter_s=3)
+    LEARNSPACE_ENDPOINT = "learnspace"  # 视频学习共用的断路器名称, 学习空间不可用时所有用户一起推迟
+
     CHECK_FREQ_S = get_config().video_play.check_freq_s        # 视频检查频率(秒)
     REPORT_FREQ_S = get_config().video_play.report_freq_s     # 汇报频率(秒)
     MAX_STUCK_CHECKS = get_config().video_play.max_stuck_checks    # 最大停顿次数检查次数, 超过该次数认为停顿
+    PREFETCH_LEAD_S = get_config().video_play.prefetch_lead_s      # 视频剩余时长低于该值时触发下一课程预取(秒)
+    PROGRESS_STALE_S = get_config().video_play.progress_stale_s    # 超过该时长没有上报确认时改为读取页面进度(秒)
 
-    def __init__(self, user_data: UserData):
+    def __init__(self, user_data: UserData, run_stats: UserRunStats = None):
         self.config = get_config()
+        self.clock = get_clock()
         self.user_data = user_data
+        self.run_stats = run_stats or UserRunStats(username=user_data.username, user_name=user_data.user_name)
         self.context: BrowserContext | None = None  # 在使用时才会初始化
         self.module_logger = get_user_module_logger(
             f"{self.user_data.user_name}_{self.user_data.username}",
             "Video"
         )
-        self.video_end_requests_flag = False
+        self.progress_tracker = ProgressTracker()  # 通过学习时间上报接口跟踪视频进度
+        self.near_end_event: asyncio.Event | None = None  # 视频进入尾声时设置, 由CourseManager指定
+        self.last_video_duration_s = 0  # 最近一次播放视频的总时长(秒), 用于记录课程目录
+        self.trace_recorder = get_trace_recorder(self.user_data.username)
+        self.event_bus = get_event_bus()
 
     async def init_context(self, context: BrowserContext):
+        if self.context is context:
+            return  # 监督器续跑时同一个context不重复注册监听
+        # 资源拦截路由在创建 context 时已由 apply_context_defaults 注册
         self.context = context
-        await self.context.route("**/*", self.block_resources)
+        self.context.on("response", self.progress_tracker.on_response)
+        context_pool = get_context_pool()
+        if context_pool.owns(context):
+            # 复用池的 context 会交给下一个用户, 归还时移除本用户的进度监听
+            context_pool.add_cleanup(context, self.detach_context)
+
+    def detach_context(self):
+        """移除在 context 上注册的进度监听"""
+        if self.context:
+            self.context.remove_listener("response", self.progress_tracker.on_response)
+            self.context = None
 
     # 方法
     async def play_video_content_with_retry(self, video_frame, content_node):
         """
-        带重试机制的视频学习函数
+        带重试机制的视频学习函数, 学习空间不可用时刷新页面前由共享断路器推迟
 
         Args:
             video_frame: 视频框架定位器
             content_node: 内容节点
         """
-        retry_count = 0
+        frames = {"video": video_frame}
 
-        while retry_count < self.VIDEO_MAX_RETRY:
+        async def attempt_play(attempt: int):
             try:
-                await self.play_video_content(video_frame, content_node)
-                return  # 成功执行，退出重试循环
+                await self.play_video_content(frames["video"], content_node)
             except Exception as e:
-                retry_count += 1
-                self.module_logger.error(f"      → 视频学习第 {retry_count} 次尝试失败: {str(e)}")
-                if retry_count < self.VIDEO_MAX_RETRY:
-                    self.module_logger.info("      → 尝试刷新页面并重新开始视频学习流程")
+                self.run_stats.failures += 1
+                self.module_logger.error(f"      → 视频学习第 {attempt} 次尝试失败: {str(e)}")
+                await self.trace_recorder.dump("video_retry")
+                raise
 
-                    try:
-                        # 刷新页面
-                        page = video_frame.page
-                        await page.reload()
-                        await asyncio.sleep(random.random() * 5 + 1)
-
-                        frame_element = await page.wait_for_selector("#learnHelperIframe", state="visible",
-                                                                         timeout=30000)
-                        await asyncio.sleep(random.random() * 3 + 1)
-                        frame = await  frame_element.content_frame()
-                        await frame.click("a[onclick='closeLearnHelper()']")
-
-                        # 重新获取框架定位器
-                        section_frame = page.frame_locator("#mainCont")
-                        video_frame = section_frame.frame_locator("#mainFrame")
-
-                        # 重新点击内容节点
-                        await content_node.evaluate("""element => {
-                                element.scrollIntoView({block: 'center'});
-                                element.click();
-                            }""")
-                        await asyncio.sleep(random.random() * 3 + 1)
-
-                    except Exception as refresh_error:
-                        self.module_logger.error(f"      → 刷新页面失败: {str(refresh_error)}")
-                else:
-                    self.module_logger.error("      → 达到最大重试次数，视频学习失败")
+        async def reload_and_reopen(attempt: int, error: Exception, delay: float):
+            self.module_logger.info("      → 尝试刷新页面并重新开始视频学习流程")
+            try:
+                # 刷新页面, 学习空间不可用(断路器断开)时在此等待恢复
+                page = frames["video"].page
+                async with get_circuit_breaker(self.LEARNSPACE_ENDPOINT).guard():
+                    await step(page.reload(), "reload")
+                    self.run_stats.reloads += 1
+                    await self.clock.sleep(random.random() * 5 + 1)
+
+                    frame_element = await page.wait_for_selector("#learnHelperIframe", state="visible",
+                                                                     timeout=30000)
+                await self.clock.sleep(random.random() * 3 + 1)
+                frame = await  frame_element.content_frame()
+                await step(frame.click("a[onclick='closeLearnHelper()']"), "close_helper")
+
+                # 重新获取框架定位器
+                section_frame = page.frame_locator("#mainCont")
+                frames["video"] = section_frame.frame_locator("#mainFrame")
+
+                # 重新点击内容节点
+                await content_node.evaluate("""element => {
+                        element.scrollIntoView({block: 'center'});
+                        element.click();
+                    }""")
+
+            except Exception as refresh_error:
+                self.module_logger.error(f"      → 刷新页面失败: {str(refresh_error)}")
+
+        try:
+            await retry_call(attempt_play, self.VIDEO_RETRY_POLICY, on_retry=reload_and_reopen)
+        except Exception as e:
+            self.module_logger.error("      → 达到最大重试次数，视频学习失败")
+            raise VideoStudyError(f"视频学习重试 {self.VIDEO_MAX_RETRY} 次后仍失败: {e}") from e
 
     async def play_video_content(self, video_frame, content_node):
         """
@@ -90,6 +132,7 @@ class VideoPlayer:
             content_node: 内容节点
         """
         self.module_logger.info(f"      → 开始播放视频")
+        self.progress_tracker.reset()
 
         try:
             # 定位div.jwmute元素
@@ -110,18 +153,24 @@ class VideoPlayer:
             except Exception:
                 self.module_logger.info("      → 未找到div.jwmute元素，跳过静音操作")
 
-            await asyncio.sleep(random.random() * 2 + 1)
+            await self.clock.sleep(random.random() * 2 + 1)
             # 确保视频开始播放
             await self.ensure_video_playing(video_frame)
 
             # 获取视频总时长
-            total_video_time_str = await video_frame.locator(
-                "#container_controlbar_duration").text_content()
+            total_video_time_str = await step(video_frame.locator(
+                "#container_controlbar_duration").text_content(), "read_duration")
             total_video_time_s = self.time_str_to_seconds(total_video_time_str)
+            self.last_video_duration_s = total_video_time_s
 
             self.module_logger.info(f"      → 视频总时长: {total_video_time_str}")
-            # 监控视频播放进度
-            await self.monitor_video_progress(video_frame, total_video_time_s, content_node)
+            # 监控视频播放进度, 预算按视频总时长计算(不超过外层内容/课程的剩余预算)
+            monitor_start = self.clock.time()
+            try:
+                async with budget("video", derive_budget(total_video_time_s)):
+                    await self.monitor_video_progress(video_frame, total_video_time_s, content_node)
+            finally:
+                self.run_stats.video_wall_seconds += self.clock.time() - monitor_start
 
         except Exception as e:
             self.module_logger.error(f"      → 处理视频内容时发生错误: {str(e)}")
@@ -132,31 +181,30 @@ class VideoPlayer:
         """
         确保视频开始播放
         """
-        cur_try = 0
         # 等待播放按钮出现
         try:
             await video_frame.locator("#container_display_button").wait_for(state="visible", timeout=15000)
         except Exception as e:
             self.module_logger.error(f"等待播放按钮超时: {e}")
 
-        # 循环尝试播放直到播放器加载完成
-        while cur_try <= self.ENSURE_MAX_TRY:
+        async def start_playing(attempt: int):
             # 检查是否已经播放(通过是否存在暂停按钮jwtoggle判断)
             jwtoggle_count = await video_frame.locator(".jwtoggle").count()
             if jwtoggle_count > 0:
                 self.module_logger.info("视频已在播放中")
-                break
+                return
 
             self.module_logger.info("尝试启动视频播放")
             try:
-                await video_frame.locator("#container_display_button").click()
+                await step(video_frame.locator("#container_display_button").click(), "click_play")
             except Exception as e:
                 self.module_logger.error(f"点击播放按钮失败: {e}")
+            raise RetryableError("视频尚未开始播放")
 
-            cur_try += 1
-            await asyncio.sleep(random.random() * 2 + 1)  # 增加等待时间防止误判
-
-        if cur_try > self.ENSURE_MAX_TRY:
+        # 循环尝试播放直到播放器加载完成
+        try:
+            await retry_call(start_playing, self.ENSURE_RETRY_POLICY)
+        except RetryableError:
             self.module_logger.info("达到最大尝试次数，视频可能未正常播放")
 
     async def monitor_video_progress(self, video_frame, total_video_time_s, content_node: Locator):
@@ -170,18 +218,18 @@ class VideoPlayer:
         # 初始化状态变量
         last_report_time = 0
         last_video_time_s = -1  # 初始值设为-1以便第一次比较
-        start_time = asyncio.get_event_loop().time()
-        self.video_end_requests_flag = False
+        start_time = self.clock.time()
 
         while True:
             try:
-                elapsed_time = asyncio.get_event_loop().time() - start_time
+                elapsed_time = self.clock.time() - start_time
 
-                # 检查内容项是否已完成（通过完成标志检测）
-                if self.video_end_requests_flag:
+                # 服务端确认视频学习结束
+                if self.progress_tracker.ended:
                     self.module_logger.info("视频已结束，等待内容项完成")
                     break
 
+                # 检查内容项是否已完成（通过完成标志检测）, 结束上报丢失时作为兜底
                 try:
                     complete_flag = await content_node.locator("span.flagover-icon").count()
                     if complete_flag >= 1:
@@ -190,33 +238,57 @@ class VideoPlayer:
                 except Exception as e:
                     self.module_logger.error(f"检查完成标志时出错: {e}")
 
-                try:
-                    # 获取当前播放时间
-                    cur_video_time_str = (await video_frame.locator("#container_controlbar_elapsed").text_content()).strip()
-                    cur_video_time_s = self.time_str_to_seconds(cur_video_time_str)
-                except Exception as e:
-                    self.module_logger.error(f"获取当前播放时间失败: {e}")
-                    await asyncio.sleep(self.CHECK_FREQ_S)
-                    continue
-
-                # 检查视频是否卡住（包括播放按钮显示播放状态但进度条不动的情况）
-                if cur_video_time_s == last_video_time_s and cur_video_time_s >= 0:
+                # 优先使用服务端确认的上报进度, 确认位置长时间不前进时退回到读取页面(并做卡顿检测)
+                network_progress = self.progress_tracker.is_fresh(self.PROGRESS_STALE_S)
+                if network_progress:
+                    cur_video_time_s = self.progress_tracker.estimated_position(total_video_time_s)
+                    cur_video_time_str = self.seconds_to_time_str(cur_video_time_s)
+                else:
+                    try:
+                        # 获取当前播放时间
+                        cur_video_time_str = (await step(
+                            video_frame.locator("#container_controlbar_elapsed").text_content(), "read_elapsed"
+                        )).strip()
+                        cur_video_time_s = self.time_str_to_seconds(cur_video_time_str)
+                    except Exception as e:
+                        self.module_logger.error(f"获取当前播放时间失败: {e}")
+                        await self.clock.sleep(self.CHECK_FREQ_S)
+                        continue
+
+                # 检查视频是否卡住（包括播放按钮显示播放状态但进度条不动的情况）, 上报进度只在两次上报之间估算, 不做卡顿判断
+                if not network_progress and cur_video_time_s == last_video_time_s and cur_video_time_s >= 0:
                     stuck_check_count += 1
                     self.module_logger.info(
                         f"检测到播放时间未变化: {cur_video_time_str} ({stuck_check_count}/{self.MAX_STUCK_CHECKS})")
 
                     if stuck_check_count >= self.MAX_STUCK_CHECKS:
                         self.module_logger.info("检测到视频播放卡住，尝试重新播放")
-                        await self.try_recover_playback(video_frame)
+                        self.run_stats.stuck_events += 1
+                        self.event_bus.emit(VideoStuck(self.user_data.username, position_s=cur_video_time_s))
+                        await self.trace_recorder.dump("video_stuck")
+                        if await self.try_recover_playback(video_frame):
+                            self.run_stats.recoveries += 1
+                            self.event_bus.emit(VideoRecovered(self.user_data.username, position_s=cur_video_time_s))
                         stuck_check_count = 0  # 重置计数器
                 else:
                     # 如果播放时间有变化，重置卡顿计数器
                     if last_video_time_s != -1:  # 排除初始状态
                         stuck_check_count = 0
+                        if cur_video_time_s > last_video_time_s:
+                            self.run_stats.video_seconds_watched += cur_video_time_s - last_video_time_s
+                            self.event_bus.emit(VideoProgress(
+                                self.user_data.username, position_s=cur_video_time_s, total_s=total_video_time_s
+                            ))
 
                 # 更新上次播放时间
                 last_video_time_s = cur_video_time_s
 
+                # 视频进入尾声, 通知预取下一个课程
+                if (self.near_end_event is not None and not self.near_end_event.is_set()
+                        and total_video_time_s - cur_video_time_s <= self.PREFETCH_LEAD_S):
+                    self.module_logger.info("视频即将结束，开始预取下一个课程")
+                    self.near_end_event.set()
+
                 # 定期报告播放进度
                 if elapsed_time - last_report_time >= self.REPORT_FREQ_S:
                     progress = cur_video_time_s / total_video_time_s * 100
@@ -224,7 +296,7 @@ class VideoPlayer:
                         f"视频播放情况 {cur_video_time_str}/{self.seconds_to_time_str(total_video_time_s)}, 进度: {progress:.2f}%")
                     last_report_time = elapsed_time
 
-                await  asyncio.sleep(self.CHECK_FREQ_S)
+                await  self.clock.sleep(self.CHECK_FREQ_S)
 
             except Exception as e:
                 self.module_logger.error(f"视频播放监控出错: {e}")
@@ -234,32 +306,31 @@ class VideoPlayer:
         """
         尝试恢复视频播放
         """
-        attempt = 0
-
         self.module_logger.info("尝试恢复视频播放")
 
         try:
-            while attempt < self.RECOVER_MAX_TRY:
-                # 检查当前是否已经在播放（通过是否存在暂停按钮jwtoggle判断）
-                # jwtoggle_count = await video_frame.locator(".jwtoggle").count()
-
+            async def click_play(attempt: int):
                 # 即使有jwtoggle按钮，也要尝试点击播放按钮来确保播放状态
-                self.module_logger.info(f"尝试点击播放按钮 (第{attempt + 1}次)")
+                self.module_logger.info(f"尝试点击播放按钮 (第{attempt}次)")
                 try:
-                    await video_frame.locator("#container_display_button").click()
+                    await step(video_frame.locator("#container_display_button").click(), "click_play")
                     # 等待一小段时间让播放状态更新
-                    await asyncio.sleep(0.5)
-
-                    # 检查是否开始播放
-                    jwtoggle_count = await video_frame.locator(".jwtoggle").count()
-                    if jwtoggle_count > 0:
-                        self.module_logger.info("成功恢复视频播放")
-                        return True
-
+                    await self.clock.sleep(0.5)
                 except Exception as click_error:
                     self.module_logger.error(f"点击播放按钮失败: {click_error}")
+                    raise
+
+                # 检查是否开始播放
+                jwtoggle_count = await video_frame.locator(".jwtoggle").count()
+                if jwtoggle_count == 0:
+                    raise RetryableError("点击播放按钮后仍未播放")
 
-                attempt += 1
+            try:
+                await retry_call(click_play, self.RECOVER_RETRY_POLICY)
+                self.module_logger.info("成功恢复视频播放")
+                return True
+            except Exception:
+                pass
 
             # 如果点击播放按钮无效，尝试刷新页面
             self.module_logger.info("点击播放按钮无效，尝试刷新页面")
@@ -267,9 +338,10 @@ class VideoPlayer:
                 # 获取包含视频的页面对象
                 page = video_frame.page
                 # 刷新页面
-                await page.reload()
+                await step(page.reload(), "reload")
+                self.run_stats.reloads += 1
                 # 等待页面加载完成
-                await asyncio.sleep(5)
+                await self.clock.sleep(5)
 
                 # 重新获取frame对象
                 section_frame = page.frame_locator("#mainCont")
@@ -278,8 +350,8 @@ class VideoPlayer:
                     if video_frame:
                         # 尝试点击播放按钮
                         try:
-                            await video_frame.locator("#container_display_button").click()
-                            await asyncio.sleep(1)
+                            await step(video_frame.locator("#container_display_button").click(), "click_play")
+                            await self.clock.sleep(1)
                             jwtoggle_count = await video_frame.locator(".jwtoggle").count()
                             if jwtoggle_count > 0:
                                 self.module_logger.info("刷新页面后点击播放按钮成功")
@@ -296,52 +368,12 @@ class VideoPlayer:
             self.module_logger.error(f"恢复视频播放过程中发生异常: {e}")
             return False
 
-    async def block_resources(self, route):
-        url = route.request.url
-
-        # 阻止特定的视频CDN域名或路径模式
-        video_patterns = [
-            "learningTime_endVideoLearning.action"
-        ]
-
-        if any(pattern in url for pattern in video_patterns):
-            self.video_end_requests_flag = True
-            await route.continue_()
-        # 阻止其他不需要的资源类型
-        elif route.request.resource_type in ["image", "media", "font", "video"]:
-            await route.abort()
-        else:
-            await route.continue_()
-
     @staticmethod
     def time_str_to_seconds(time_str):
         """将时间字符串转换为秒，支持XX、XX:XX、XX:XX:XX格式"""
-        # 统一中文冒号为英文冒号
-        time_str = time_str.replace("：", ":").strip()
-
-        # 按冒号分割时间部分
-        time_parts = time_str.split(":")
-
-        # 根据不同格式处理
-        if len(time_parts) == 1:  # XX格式(秒)
-            return int(time_parts[0])
-        elif len(time_parts) == 2:  # XX:XX格式(分钟:秒)
-            minutes, seconds = map(int, time_parts)
-            return minutes * 60 + seconds
-        elif len(time_parts) == 3:  # XX:XX:XX格式(小时:分钟:秒)
-            hours, minutes, seconds = map(int, time_parts)
-            return hours * 3600 + minutes * 60 + seconds
-        else:
-            raise ValueError(f"不支持的时间格式: {time_str}")
+        return time_str_to_seconds(time_str)
 
     @staticmethod
     def seconds_to_time_str(seconds):
         """将秒数转换为时间字符串格式 (XX:XX:XX)"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-
-        if hours > 0:
-            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-        else:
-            return f"{minutes:02d}:{secs:02d}"
+        return seconds_to_time_str(seconds)
@@ -0,0 +1,197 @@
+# file: utils/async_profiler.py
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+
+# 事件循环自身的调度代码, 出现在运行栈中时截去其外层(含自身)的帧
+_LOOP_ENTRY = ("events.py", "_run")
+_IDLE_FILES = ("selectors.py",)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class AsyncSamplingProfiler:
+    """
+    感知 asyncio 的采样分析器, 输出 flamegraph 可用的折叠栈(collapsed stacks)
+
+    - CPU: 采样线程定期读取事件循环线程当前的调用栈, 截去事件循环调度部分, 只保留正在执行的协程链,
+      两次采样之间该线程消耗的CPU时间(微秒)计入采样到的栈; 采到空闲等待时计入上一次采到的执行栈
+    - 墙上时间: 每隔 wall_interval_s 由采样线程通过 call_soon_threadsafe 在事件循环中遍历所有任务
+      (任务和协程只能在事件循环线程中安全访问), 沿 cr_await 展开每个任务的等待链,
+      按采样间隔(毫秒)计入, 用于查看任务把时间花在等待什么上
+    """
+
+    def __init__(self):
+        self.config = get_config().profiler
+        self.module_logger = get_module_logger("Profiler")
+        self.cpu_stacks: Counter[str] = Counter()
+        self.wall_stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._cpu_clock: int | None = None
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._started_at = time.strftime("%Y%m%d_%H%M%S")
+        self._dumps = 0
+        self._switch_interval: float | None = None
+        self._task_sample_pending = False   # 已投递到事件循环、尚未执行的任务采样
+
+    def start(self):
+        """在事件循环中启动采样, 并注册 SIGUSR2 随时输出当前结果"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        try:
+            self._cpu_clock = time.pthread_getcpuclockid(self._loop_thread_id)
+        except (AttributeError, OSError):
+            self._cpu_clock = None  # 无法读取线程CPU时间时按采样间隔计
+        self._stop.clear()
+        # 采样线程要拿到 GIL 才能读取调用栈, 默认切换间隔(5毫秒)下事件循环线程通常在 select 让出 GIL 时才被采到,
+        # CPU 会全部计入 (idle); 采样期间缩短切换间隔, 使采样线程能在协程执行中途取得 GIL
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.config.interval_s / 10))
+        self._sampler = threading.Thread(target=self._sample, name="async-profiler", daemon=True)
+        self._sampler.start()
+        if hasattr(signal, "SIGUSR2"):
+            try:
+                self._loop.add_signal_handler(signal.SIGUSR2, self.dump, "signal")
+            except (NotImplementedError, RuntimeError):
+                pass
+        self.module_logger.info(f"性能采样已启动, 间隔 {self.config.interval_s * 1000:.0f} 毫秒")
+
+    async def stop(self):
+        """停止采样并输出最终结果"""
+        if not self._sampler:
+            return
+        self._stop.set()
+        await asyncio.to_thread(self._sampler.join)
+        self._sampler = None
+        sys.setswitchinterval(self._switch_interval)
+        if hasattr(signal, "SIGUSR2"):
+            try:
+                self._loop.remove_signal_handler(signal.SIGUSR2)
+            except (NotImplementedError, RuntimeError):
+                pass
+        self.dump("final")
+
+    def _thread_cpu(self) -> float:
+        return time.clock_gettime(self._cpu_clock) if self._cpu_clock is not None else 0.0
+
+    def _sample(self):
+        interval = self.config.interval_s
+        last_cpu = self._thread_cpu()
+        last_busy_stack = None
+        next_wall = time.monotonic()
+        while not self._stop.wait(interval):
+            cpu = self._thread_cpu()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = self.running_stack(frame) if frame is not None else None
+            if self._cpu_clock is not None:
+                weight = cpu - last_cpu
+                # 采到空闲时, 这段CPU时间是进入 select 之前消耗的, 计入上一次采到的执行栈
+                if stack == "(idle)" and last_busy_stack:
+                    stack = last_busy_stack
+                elif stack != "(idle)":
+                    last_busy_stack = stack
+            else:
+                weight = interval
+            last_cpu = cpu
+            with self._lock:
+                self.samples += 1
+                if stack:
+                    self.cpu_stacks[stack] += int(weight * 1_000_000)
+            if time.monotonic() >= next_wall:
+                next_wall = time.monotonic() + self.config.wall_interval_s
+                # 事件循环阻塞时上一次采样还没执行, 不重复投递
+                if not self._task_sample_pending:
+                    self._task_sample_pending = True
+                    try:
+                        self._loop.call_soon_threadsafe(self._sample_tasks)
+                    except RuntimeError:
+                        break   # 事件循环已关闭
+
+    @staticmethod
+    def running_stack(frame) -> str:
+        """事件循环线程正在执行的调用栈, 从任务的根协程开始"""
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        if os.path.basename(frames[-1].f_code.co_filename) in _IDLE_FILES:
+            return "(idle)"
+        for index, f in enumerate(frames):
+            if (os.path.basename(f.f_code.co_filename), f.f_code.co_name) == _LOOP_ENTRY:
+                frames = frames[index + 1:]
+                break
+        else:
+            # 不在回调中: 事件循环自身的调度开销
+            return "(event loop);" + _frame_label(frames[-1])
+        # 去掉 Task.__step 等 asyncio 内部帧, 从第一个业务协程开始
+        while frames and os.path.basename(os.path.dirname(frames[0].f_code.co_filename)) == "asyncio":
+            frames.pop(0)
+        return ";".join(_frame_label(f) for f in frames) or "(asyncio)"
+
+    def _sample_tasks(self):
+        """在事件循环线程中执行: 此时所有任务都处于挂起状态, 可以安全地展开等待链"""
+        self._task_sample_pending = False
+        tasks = asyncio.all_tasks(self._loop)
+        weight = int(self.config.wall_interval_s * 1000)
+        stacks = [self.await_chain(task) for task in tasks]
+        with self._lock:
+            for stack in stacks:
+                if stack:
+                    self.wall_stacks[stack] += weight
+
+    @staticmethod
+    def await_chain(task: asyncio.Task) -> str:
+        """沿 cr_await 展开任务当前的等待链, 最内层为正在等待的 Future 等对象"""
+        labels = []
+        awaitable = task.get_coro()
+        while awaitable is not None:
+            frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+            if frame is None:
+                if not hasattr(awaitable, "cr_frame") and not hasattr(awaitable, "gi_frame"):
+                    labels.append(f"<{type(awaitable).__name__}>")
+                break
+            labels.append(_frame_label(frame))
+            awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+        return ";".join(labels)
+
+    def dump(self, reason: str = "signal"):
+        """把当前累计的折叠栈写入 profiler.dir, 每次输出CPU和墙上时间两个文件"""
+        with self._lock:
+            cpu_stacks = dict(self.cpu_stacks)
+            wall_stacks = dict(self.wall_stacks)
+            samples = self.samples
+        self._dumps += 1
+        os.makedirs(self.config.dir, exist_ok=True)
+        prefix = os.path.join(self.config.dir, f"profile_{self._started_at}_{self._dumps}_{reason}")
+        for suffix, stacks in (("cpu_us", cpu_stacks), ("wall_ms", wall_stacks)):
+            with open(f"{prefix}.{suffix}.folded", "w", encoding="utf-8") as f:
+                for stack, value in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+                    if value > 0:
+                        f.write(f"{stack} {value}\n")
+        self.module_logger.info(f"性能采样结果已保存到 {prefix}.*.folded (共 {samples} 次采样)")
+
+
+async def run_profiled(main):
+    """在采样分析下运行主协程, 结束(或出错)时输出结果"""
+    profiler = AsyncSamplingProfiler()
+    profiler.start()
+    try:
+        return await main
+    finally:
+        await profiler.stop()
@@ -0,0 +1,81 @@
+# file: utils/browser_pool.py
+import asyncio
+
+from playwright.async_api import Browser, Playwright, async_playwright
+
+from config.config_loader import get_config
+from utils.browser_profiles import BrowserProfile, get_browser_profile
+from utils.context_pool import get_context_pool
+from utils.logger_manager import get_module_logger
+
+
+class BrowserPool:
+    """
+    浏览器池: 持有 Playwright 驱动和若干个已启动的浏览器, 供多个批次/任务复用,
+    浏览器断开时自动重新启动
+    """
+
+    def __init__(self, size: int = 1, profile: BrowserProfile = None):
+        """
+        :param size: 浏览器数量
+        :param profile: 浏览器配置预设, 为空时使用配置文件中选择的预设
+        """
+        config = get_config()
+        self.size = max(size, 1)
+        self.profile = profile or get_browser_profile(config.browser.profile, config.browser.browser_type)
+        self.module_logger = get_module_logger("BrowserPool")
+        self.playwright: Playwright | None = None
+        self.browsers: list[Browser | None] = []
+        self._next_index = 0
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """启动 Playwright 驱动和所有浏览器"""
+        if self.playwright:
+            return
+        self.playwright = await async_playwright().start()
+        self.browsers = [await self.launch_browser() for _ in range(self.size)]
+        self.module_logger.info(f"浏览器池已启动, 共 {self.size} 个浏览器, 配置预设 {self.profile.name}")
+
+    async def launch_browser(self) -> Browser:
+        """
+        按浏览器配置预设启动浏览器
+        :return: 浏览器对象
+        """
+        browser_type = getattr(self.playwright, self.profile.browser_type)
+        return await browser_type.launch(**self.profile.launch_options())
+
+    async def prewarm_contexts(self):
+        """为每个浏览器预先创建复用池中的空闲 context"""
+        for browser in self.browsers:
+            await get_context_pool().prewarm(browser)
+
+    async def get_browser(self) -> Browser:
+        """
+        轮询获取可用的浏览器, 浏览器断开时重新启动(多个用户同时请求时只启动一次)
+        :return: 浏览器对象
+        """
+        async with self._lock:
+            index = self._next_index
+            self._next_index = (self._next_index + 1) % self.size
+            browser = self.browsers[index]
+            if not browser or not browser.is_connected():
+                self.module_logger.warning(f"浏览器 {index} 已断开，重新启动浏览器")
+                if browser:
+                    get_context_pool().discard(browser)
+                browser = self.browsers[index] = await self.launch_browser()
+        return browser
+
+    async def close(self):
+        """关闭所有浏览器和 Playwright 驱动"""
+        await get_context_pool().close()
+        for browser in self.browsers:
+            if browser and browser.is_connected():
+                try:
+                    await browser.close()
+                except Exception as e:
+                    self.module_logger.error(f"关闭浏览器出错: {e}")
+        self.browsers = []
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
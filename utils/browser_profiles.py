@@ -0,0 +1,136 @@
+# file: utils/browser_profiles.py
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+# 各预设共用的 Firefox 设置: 禁用图片和动画(与最初的硬编码设置一致)
+_FIREFOX_BASE_PREFS = {
+    "permissions.default.image": 2,
+    "ui.prefersReducedMotion": 1,
+    "toolkit.cosmeticAnimations.enabled": False,  # 禁用工具箱动画
+    "browser.tabs.animate": False,  # 禁用标签页动画
+    "browser.download.animateNotifications": False,  # 禁用下载通知动画
+}
+
+# 关闭预连接/预取等后台网络请求
+_FIREFOX_NO_PREFETCH_PREFS = {
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+}
+
+
+@dataclass(frozen=True)
+class BrowserProfile:
+    """浏览器配置预设: 启动参数、浏览器首选项和 context 参数"""
+    name: str
+    browser_type: str = "firefox"                           # firefox / chromium
+    args: tuple = ()
+    firefox_user_prefs: dict = field(default_factory=dict)
+    viewport: Optional[dict] = None                         # 为空时使用 Playwright 默认大小
+    locale: Optional[str] = None                            # 为空时不设置, 使用浏览器默认值
+    reduced_motion: Optional[str] = None                    # "reduce" 时页面的 prefers-reduced-motion 生效
+    block_service_workers: bool = False
+
+    def launch_options(self) -> dict:
+        """传给 browser_type.launch 的参数"""
+        options = {"headless": True, "args": list(self.args)}
+        if self.browser_type == "firefox":
+            options["firefox_user_prefs"] = dict(self.firefox_user_prefs)
+        return options
+
+    def context_options(self) -> dict:
+        """传给 browser.new_context 的参数"""
+        options = {}
+        if self.locale:
+            options["locale"] = self.locale
+        if self.reduced_motion:
+            options["reduced_motion"] = self.reduced_motion
+        if self.viewport:
+            options["viewport"] = dict(self.viewport)
+        if self.block_service_workers:
+            options["service_workers"] = "block"
+        return options
+
+
+PROFILES: dict[str, BrowserProfile] = {
+    # 原有设置, context 不附加任何参数
+    "default": BrowserProfile(
+        name="default",
+        args=("--disable-css-animation", "--disable-animations"),
+        firefox_user_prefs=_FIREFOX_BASE_PREFS,
+    ),
+    # 关闭缓存、Service Worker、网页字体和预取, 降低后台页面定时器频率
+    "balanced": BrowserProfile(
+        name="balanced",
+        args=("--disable-css-animation", "--disable-animations"),
+        firefox_user_prefs={
+            **_FIREFOX_BASE_PREFS,
+            **_FIREFOX_NO_PREFETCH_PREFS,
+            "browser.cache.disk.enable": False,
+            "browser.cache.memory.capacity": 32768,     # KB
+            "dom.serviceWorkers.enabled": False,
+            "gfx.downloadable_fonts.enabled": False,
+            "dom.min_background_timeout_value": 5000,  # 后台页面定时器最小间隔(毫秒)
+            "browser.sessionhistory.max_entries": 5,
+        },
+        viewport={"width": 1280, "height": 720},
+        locale="zh-CN",
+        reduced_motion="reduce",
+        block_service_workers=True,
+    ),
+    # 在 balanced 基础上限制内容进程数、降低渲染帧率并使用小视口
+    "minimal": BrowserProfile(
+        name="minimal",
+        args=("--disable-css-animation", "--disable-animations"),
+        firefox_user_prefs={
+            **_FIREFOX_BASE_PREFS,
+            **_FIREFOX_NO_PREFETCH_PREFS,
+            "browser.cache.disk.enable": False,
+            "browser.cache.memory.capacity": 8192,      # KB
+            "dom.serviceWorkers.enabled": False,
+            "gfx.downloadable_fonts.enabled": False,
+            "dom.min_background_timeout_value": 10000,
+            "browser.sessionhistory.max_entries": 2,
+            "dom.ipc.processCount": 1,
+            "fission.autostart": False,
+            "layout.frame_rate": 10,
+        },
+        viewport={"width": 800, "height": 600},
+        locale="zh-CN",
+        reduced_motion="reduce",
+        block_service_workers=True,
+    ),
+    "chromium-minimal": BrowserProfile(
+        name="chromium-minimal",
+        browser_type="chromium",
+        args=(
+            "--disable-gpu",
+            "--disable-dev-shm-usage",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-component-update",
+            "--mute-audio",
+            "--blink-settings=imagesEnabled=false",
+            "--disk-cache-size=1",
+            "--media-cache-size=1",
+            "--renderer-process-limit=2",
+        ),
+        viewport={"width": 800, "height": 600},
+        locale="zh-CN",
+        reduced_motion="reduce",
+        block_service_workers=True,
+    ),
+}
+
+
+def get_browser_profile(name: str, browser_type: str = "") -> BrowserProfile:
+    """
+    按名称获取预设
+    :param browser_type: 不为空时覆盖预设的浏览器类型
+    """
+    if name not in PROFILES:
+        raise ValueError(f"未知的浏览器配置预设: {name}, 可选: {', '.join(PROFILES)}")
+    profile = PROFILES[name]
+    if browser_type and browser_type != profile.browser_type:
+        profile = replace(profile, browser_type=browser_type)
+    return profile
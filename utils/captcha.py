@@ -5,13 +5,14 @@ from aiohttp import ClientSession
 from requests import post
 
 
-async def recognize_captcha_async(api_url: str, token: str, base64_data: str) -> Optional[str]:
+async def recognize_captcha_async(api_url: str, token: str, base64_data: str, session=None) -> Optional[str]:
     """
     从指定 URL 异步识别验证码
 
     :param api_url: 验证码识别API的URL
     :param token: 验证码识别API的token
     :param base64_data: base64编码
+    :param session: 复用的会话(如录制回放会话), 为空时创建临时会话
     :return: 图片的验证码文本
     """
     try:
@@ -27,23 +28,30 @@ async def recognize_captcha_async(api_url: str, token: str, base64_data: str) ->
         }
 
         # 使用aiohttp进行异步请求
-        async with ClientSession() as session:
-            async with session.post(api_url, headers=headers, data=dumps(payload)) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("code") == 10000:
-                        captcha_text = result["data"]["data"]
-                        return captcha_text
-                    else:
-                        print(f"API识别失败: {result.get('msg', '未知错误')}")
-                else:
-                    print(f"API请求失败，状态码: {response.status}")
+        if session is None:
+            async with ClientSession() as session:
+                return await _post_captcha(session, api_url, headers, payload)
+        return await _post_captcha(session, api_url, headers, payload)
     except Exception as e:
         print(f"验证码识别出错: {e}")
 
     return ""
 
 
+async def _post_captcha(session, api_url: str, headers: dict, payload: dict) -> str:
+    async with session.post(api_url, headers=headers, data=dumps(payload)) as response:
+        if response.status == 200:
+            result = await response.json()
+            if result.get("code") == 10000:
+                captcha_text = result["data"]["data"]
+                return captcha_text
+            else:
+                print(f"API识别失败: {result.get('msg', '未知错误')}")
+        else:
+            print(f"API请求失败，状态码: {response.status}")
+    return ""
+
+
 def recognize_captcha(api_url: str, token: str, base64_data: str, ) -> str:
     """
     从指定 URL 识别验证码
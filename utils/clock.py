@@ -0,0 +1,112 @@
+# file: utils/clock.py
+import asyncio
+import selectors
+import time
+
+
+class Clock:
+    """
+    系统时钟. 各模块通过 get_clock() 取时间和等待, 不直接调用 asyncio.sleep / loop.time / time.time,
+    模拟运行时替换为 VirtualClock
+    """
+
+    def time(self) -> float:
+        """单调时间(秒), 用于计算耗时和超时"""
+        try:
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic()
+
+    def wall(self) -> float:
+        """墙上时间(时间戳), 用于记录开始/结束时刻"""
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def run(self, main):
+        """运行主协程"""
+        return asyncio.run(main)
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """
+    不等待超时的选择器: 有真实IO事件(线程池结果、信号等)时立即返回,
+    否则把虚拟时间直接推进到最近一个定时器的到期时刻
+    """
+
+    def __init__(self, loop: "VirtualEventLoop"):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        # 没有定时器, 或线程池中还有任务未完成时, 等待真实IO, 线程中的工作不消耗虚拟时间
+        if timeout is None or self._loop.executor_jobs:
+            return super().select(None)
+        self._loop.advance(timeout)
+        return []
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """时间由 _VirtualSelector 推进的事件循环, asyncio.sleep / asyncio.timeout / call_later 均按虚拟时间执行"""
+
+    def __init__(self, start: float = 0.0):
+        self._virtual_now = start
+        self.executor_jobs = 0
+        super().__init__(_VirtualSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_now
+
+    def advance(self, seconds: float):
+        self._virtual_now += seconds
+
+    def run_in_executor(self, executor, func, *args):
+        future = super().run_in_executor(executor, func, *args)
+        self.executor_jobs += 1
+        future.add_done_callback(self._executor_job_done)
+        return future
+
+    def _executor_job_done(self, _future):
+        self.executor_jobs -= 1
+
+
+class VirtualClock(Clock):
+    """
+    虚拟时钟: 主协程在 VirtualEventLoop 上运行, 所有任务都在等待定时器时直接跳到下一个到期时刻,
+    数小时的视频播放和调度过程可以在几秒内模拟完成. 只适用于不依赖真实网络IO的模拟
+    """
+
+    def __init__(self, start_wall: float | None = None):
+        self.start_wall = time.time() if start_wall is None else start_wall
+        self.loop: VirtualEventLoop | None = None
+
+    def time(self) -> float:
+        return self.loop.time() if self.loop else 0.0
+
+    def wall(self) -> float:
+        return self.start_wall + self.time()
+
+    def run(self, main):
+        self.loop = VirtualEventLoop()
+        with asyncio.Runner(loop_factory=lambda: self.loop) as runner:
+            return runner.run(main)
+
+
+clock: Clock | None = None
+
+
+def get_clock() -> Clock:
+    global clock
+    if clock is None:
+        clock = Clock()
+    return clock
+
+
+def set_clock(new_clock: Clock):
+    """替换全局时钟, 需要在创建各模块对象之前调用"""
+    global clock
+    clock = new_clock
@@ -0,0 +1,193 @@
+# file: utils/context_pool.py
+import asyncio
+from typing import Callable, Optional
+
+from playwright.async_api import Browser, BrowserContext, Route
+
+from config.config_loader import get_config
+from utils.browser_profiles import get_browser_profile
+from utils.logger_manager import get_module_logger
+
+# 隐藏 webdriver 标识
+HIDE_WEBDRIVER_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined  // 覆盖为undefined
+    });
+"""
+EXTRA_HTTP_HEADERS = {"Accept-Language": "zh-CN"}
+WIPE_PATH = "/__context_pool_wipe__"
+
+
+async def block_resources(route: Route):
+    """
+    阻止不需要的资源类型, 放行的请求使用 fallback, 以便回放模式下交给 HAR 路由处理
+    学习时间上报(learningTime_*)由 progress_tracker 通过 response 事件跟踪, 这里只拦截资源
+    """
+    if route.request.resource_type in ["image", "media", "font", "video"]:
+        await route.abort()
+    else:
+        await route.fallback()
+
+
+async def apply_context_defaults(context: BrowserContext):
+    """所有用户共用的 context 设置: 初始化脚本、请求头和资源拦截路由"""
+    await context.add_init_script(HIDE_WEBDRIVER_JS)
+    await context.set_extra_http_headers(EXTRA_HTTP_HEADERS)
+    await context.route("**/*", block_resources)
+
+
+class ContextPool:
+    """
+    BrowserContext 复用池: 预先创建并应用公共设置的 context, 用户结束后清空 cookie、存储和页面再交给下一个用户,
+    频繁换用户时每个槽位只付一次 context 创建和设置的开销
+
+    - 每个浏览器最多保留 size 个空闲 context, 使用 max_uses 次后关闭重建, 避免长期复用积累状态
+    - 清理后仍有残留 cookie/存储的 context 直接关闭, 不再复用
+    - 录制/回放模式下每个用户有自己的 HAR 文件, 不使用复用池
+    """
+
+    def __init__(self):
+        self.config = get_config()
+        self.settings = self.config.context_pool
+        self.module_logger = get_module_logger("ContextPool")
+        self.browser_profile = get_browser_profile(self.config.browser.profile, self.config.browser.browser_type)
+        self._idle: dict[Browser, list[BrowserContext]] = {}
+        self._uses: dict[BrowserContext, int] = {}
+        self._cleanups: dict[BrowserContext, list[Callable[[], None]]] = {}
+        self.created = 0
+        self.reused = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled and self.config.har.mode == "off"
+
+    def owns(self, context: BrowserContext) -> bool:
+        return context in self._uses
+
+    def add_cleanup(self, context: BrowserContext, cleanup: Callable[[], None]):
+        """登记归还时要执行的清理(如移除用户注册的事件监听)"""
+        self._cleanups.setdefault(context, []).append(cleanup)
+
+    async def _create(self, browser: Browser) -> BrowserContext:
+        context = await browser.new_context(**self.browser_profile.context_options())
+        await apply_context_defaults(context)
+        self._uses[context] = 0
+        self.created += 1
+        return context
+
+    async def prewarm(self, browser: Browser):
+        """为浏览器预先创建空闲 context"""
+        if not self.enabled:
+            return
+        idle = self._idle.setdefault(browser, [])
+        while len(idle) < self.settings.size:
+            idle.append(await self._create(browser))
+        self.module_logger.info(f"已预创建 {len(idle)} 个 context")
+
+    async def acquire(self, browser: Browser, storage_state: dict = None) -> Optional[BrowserContext]:
+        """
+        取出一个 context 并载入登录状态
+        :param storage_state: 会话存储中的登录状态, 只有 cookie 时可以复用
+        :return: 登录状态包含 localStorage 等无法载入已有 context 的数据时返回 None, 由调用方新建
+        """
+        if storage_state and any(origin.get("localStorage") for origin in storage_state.get("origins", [])):
+            return None
+        idle = self._idle.get(browser, [])
+        context = None
+        while idle and context is None:
+            candidate = idle.pop()
+            if browser.is_connected():
+                context = candidate
+            else:
+                self._forget(candidate)
+        if context is None:
+            context = await self._create(browser)
+        else:
+            self.reused += 1
+        self._uses[context] += 1
+        if storage_state and storage_state.get("cookies"):
+            await context.add_cookies(storage_state["cookies"])
+        return context
+
+    async def release(self, context: BrowserContext):
+        """用户结束时归还 context: 清理后放回空闲列表, 无法清理干净或超过使用次数时关闭"""
+        for cleanup in self._cleanups.pop(context, []):
+            try:
+                cleanup()
+            except Exception as e:
+                self.module_logger.debug(f"context 清理回调出错: {e}")
+        browser = context.browser
+        reusable = (
+            browser is not None and browser.is_connected()
+            and self._uses.get(context, 0) < self.settings.max_uses
+            and len(self._idle.get(browser, [])) < self.settings.size
+        )
+        if reusable:
+            try:
+                reusable = await self.wipe(context)
+            except Exception as e:
+                self.module_logger.debug(f"清理 context 失败: {e}")
+                reusable = False
+        if reusable:
+            self._idle.setdefault(browser, []).append(context)
+            return
+        self._forget(context)
+        try:
+            await context.close()
+        except Exception as e:
+            self.module_logger.debug(f"关闭context出错: {e}")
+
+    async def wipe(self, context: BrowserContext) -> bool:
+        """
+        清空页面、cookie、权限和各源的 localStorage/sessionStorage
+        :return: 清理后是否已没有任何残留状态
+        """
+        for page in list(context.pages):
+            await page.close()
+        await context.clear_cookies()
+        await context.clear_permissions()
+
+        state = await context.storage_state()
+        origins = [origin["origin"] for origin in state.get("origins", [])]
+        if origins:
+            # 在每个源下打开一个本地返回的空白页清空存储, 不向站点发出请求
+            page = await context.new_page()
+            await page.route(f"**{WIPE_PATH}", lambda route: route.fulfill(
+                status=200, content_type="text/html", body="<html></html>"
+            ))
+            try:
+                for origin in origins:
+                    await page.goto(f"{origin}{WIPE_PATH}")
+                    await page.evaluate("() => { localStorage.clear(); sessionStorage.clear(); }")
+            finally:
+                await page.close()
+            await context.clear_cookies()
+            state = await context.storage_state()
+        return not state.get("cookies") and not state.get("origins")
+
+    def _forget(self, context: BrowserContext):
+        self._uses.pop(context, None)
+        self._cleanups.pop(context, None)
+
+    def discard(self, browser: Browser):
+        """浏览器关闭时丢弃其全部空闲 context"""
+        for context in self._idle.pop(browser, []):
+            self._forget(context)
+
+    async def close(self):
+        """关闭所有空闲 context"""
+        for browser in list(self._idle):
+            idle = self._idle.pop(browser)
+            for context in idle:
+                self._forget(context)
+            await asyncio.gather(*(context.close() for context in idle), return_exceptions=True)
+
+
+context_pool: ContextPool | None = None
+
+
+def get_context_pool() -> ContextPool:
+    global context_pool
+    if context_pool is None:
+        context_pool = ContextPool()
+    return context_pool
@@ -0,0 +1,96 @@
+# file: utils/course_catalog.py
+import json
+import os
+from typing import Optional
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+
+
+class CourseCatalog:
+    """
+    课程目录: 记录运行中观察到的课程视频时长和各用户的课程进度, 供运行前规划使用
+
+    文件结构:
+        courses:  课程名称 -> {"video_items": 视频数, "contents": {内容标题: 视频秒数}}
+        keys:     必修课程搜索关键字 -> 课程名称
+        progress: 用户账号 -> {必修课程搜索关键字: 完成百分比}
+    """
+
+    def __init__(self, catalog_path: str = "save_data/course_catalog.json"):
+        self.catalog_path = catalog_path
+        self.courses: dict[str, dict] = {}
+        self.keys: dict[str, str] = {}
+        self.progress: dict[str, dict[str, int]] = {}
+        self.module_logger = get_module_logger("Catalog")
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.catalog_path):
+            return
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            self.module_logger.error(f"课程目录文件读取失败, 将重新生成: {e}")
+            return
+        self.courses = data.get("courses", {})
+        self.keys = data.get("keys", {})
+        self.progress = data.get("progress", {})
+
+    def save(self):
+        """原子写入: 先写临时文件再替换"""
+        folder_path = os.path.dirname(self.catalog_path)
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+        tmp_path = f"{self.catalog_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"courses": self.courses, "keys": self.keys, "progress": self.progress}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.catalog_path)
+
+    def record_progress(self, username: str, search_key: str, course_name: str, percent: int):
+        """记录用户某门必修课程的完成百分比"""
+        self.keys[search_key] = course_name
+        self.progress.setdefault(username, {})[search_key] = percent
+
+    def record_structure(self, course_name: str, video_items: int):
+        """记录课程包含的视频内容数量"""
+        self.courses.setdefault(course_name, {"video_items": 0, "contents": {}})["video_items"] = video_items
+
+    def record_video(self, course_name: str, content_title: str, video_seconds: int):
+        """记录课程中单个视频的时长"""
+        course = self.courses.setdefault(course_name, {"video_items": 0, "contents": {}})
+        course["contents"][content_title] = video_seconds
+
+    def course_video_seconds(self, course_name: str) -> Optional[float]:
+        """
+        估算课程的视频总时长: 已知视频时长按平均值外推到全部视频数量
+        :return: 没有任何观测数据时返回 None
+        """
+        course = self.courses.get(course_name)
+        if not course or not course["contents"]:
+            return None
+        known = list(course["contents"].values())
+        video_items = max(course.get("video_items", 0), len(known))
+        return sum(known) / len(known) * video_items
+
+    def content_video_seconds(self, course_name: str, content_title: str) -> Optional[float]:
+        """已观测到的单个视频时长, 没有记录时返回 None"""
+        return self.courses.get(course_name, {}).get("contents", {}).get(content_title)
+
+    def user_progress(self, username: str, search_key: str) -> int:
+        return self.progress.get(username, {}).get(search_key, 0)
+
+    def course_name(self, search_key: str) -> str:
+        return self.keys.get(search_key, search_key)
+
+
+# 全局课程目录实例
+course_catalog: Optional[CourseCatalog] = None
+
+
+def get_course_catalog() -> CourseCatalog:
+    global course_catalog
+    if course_catalog is None:
+        course_catalog = CourseCatalog(get_config().project.catalog_path)
+    return course_catalog
@@ -0,0 +1,58 @@
+# file: utils/course_structure_cache.py
+
+
+class CourseStructureCache:
+    """
+    跨用户共享的课程目录结构缓存, 以 (课程id, 目录指纹) 为键
+
+    缓存只保存与用户无关的部分: 章节/小节/内容项的标题、类型和在目录中的位置,
+    各用户的完成状态在每次读取时单独获取
+    """
+
+    def __init__(self):
+        self._skeletons: dict[tuple[str, str], list] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, course_id: str, fingerprint: str) -> list | None:
+        skeleton = self._skeletons.get((course_id, fingerprint))
+        if skeleton is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return skeleton
+
+    def put(self, course_id: str, fingerprint: str, course_structure: list):
+        """从完整解析的课程结构中提取与用户无关的骨架保存"""
+        self._skeletons[(course_id, fingerprint)] = [
+            {
+                "title": chapter["title"],
+                "position": chapter["position"],
+                "sections": [
+                    {
+                        "title": section["title"],
+                        "position": section["position"],
+                        "contents": [
+                            {"title": c["title"], "itemtype": c["itemtype"], "position": c["position"]}
+                            for c in section["contents"]
+                        ],
+                    }
+                    for section in chapter["sections"]
+                ],
+            }
+            for chapter in course_structure
+        ]
+
+    @staticmethod
+    def content_count(skeleton: list) -> int:
+        return sum(len(section["contents"]) for chapter in skeleton for section in chapter["sections"])
+
+
+course_structure_cache: CourseStructureCache | None = None
+
+
+def get_course_structure_cache() -> CourseStructureCache:
+    global course_structure_cache
+    if course_structure_cache is None:
+        course_structure_cache = CourseStructureCache()
+    return course_structure_cache
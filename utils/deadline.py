@@ -0,0 +1,112 @@
+# file: utils/deadline.py
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Optional, TypeVar
+
+from config.config_loader import get_config
+from utils.errors import DeadlineExceededError, StepTimeoutError
+from utils.logger_manager import get_module_logger
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Deadline:
+    """当前所在阶段的时间预算"""
+    name: str           # 嵌套路径, 如 user/course/content
+    expires_at: float   # 到期时刻(事件循环时间)
+    budget_s: float     # 本阶段申请的预算(秒)
+
+    def remaining(self) -> float:
+        return self.expires_at - asyncio.get_running_loop().time()
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def derive_budget(video_s: Optional[float]) -> Optional[float]:
+    """按预计视频时长计算阶段预算, 没有时长数据时返回 None(只继承外层预算)"""
+    if not video_s:
+        return None
+    config = get_config().deadline
+    return video_s * config.video_factor + config.slack_s
+
+
+@asynccontextmanager
+async def budget(name: str, seconds: Optional[float]):
+    """
+    在时间预算内执行代码块, 超时后取消其中正在等待的操作并抛出 DeadlineExceededError
+
+    嵌套时到期时刻取本阶段与外层剩余时间中较早者, 外层先到期时由外层负责取消;
+    seconds 为空或预算关闭时只继承外层预算
+    """
+    parent = _current_deadline.get()
+    path = f"{parent.name}/{name}" if parent else name
+    if seconds is None or not get_config().deadline.enabled:
+        if parent is None:
+            yield None
+            return
+        deadline = Deadline(path, parent.expires_at, parent.budget_s)
+        token = _current_deadline.set(deadline)
+        try:
+            yield deadline
+        finally:
+            _current_deadline.reset(token)
+        return
+
+    expires_at = asyncio.get_running_loop().time() + seconds
+    if parent is not None and parent.expires_at <= expires_at:
+        # 外层预算更早到期
+        token = _current_deadline.set(Deadline(path, parent.expires_at, seconds))
+        try:
+            yield _current_deadline.get()
+        finally:
+            _current_deadline.reset(token)
+        return
+
+    deadline = Deadline(path, expires_at, seconds)
+    token = _current_deadline.set(deadline)
+    timeout = asyncio.timeout_at(expires_at)
+    try:
+        async with timeout:
+            yield deadline
+    except TimeoutError as e:
+        # 只转换本预算到期引起的超时, 其余超时(如网络库自身的超时)原样上抛
+        if not timeout.expired():
+            raise
+        get_module_logger("Deadline").warning(f"阶段超出时间预算: {path} ({seconds:.0f} 秒)")
+        raise DeadlineExceededError(path, seconds) from e
+    finally:
+        _current_deadline.reset(token)
+
+
+async def step(awaitable: Awaitable[T], name: str, timeout_s: Optional[float] = None) -> T:
+    """
+    执行单步操作, 最长 timeout_s 秒(默认 deadline.step_s), 且不超过当前阶段的剩余预算
+
+    超过自身时限时抛出可重试的 StepTimeoutError; 受阶段剩余预算限制而超时时抛出 DeadlineExceededError
+    """
+    config = get_config().deadline
+    if not config.enabled:
+        return await awaitable
+    limit = timeout_s or config.step_s
+    deadline = _current_deadline.get()
+    clipped = deadline is not None and deadline.remaining() < limit
+    if clipped:
+        limit = deadline.remaining()
+    timeout = asyncio.timeout(max(limit, 0))
+    try:
+        async with timeout:
+            return await awaitable
+    except TimeoutError as e:
+        if not timeout.expired():
+            raise
+        if clipped:
+            raise DeadlineExceededError(f"{deadline.name}/{name}", deadline.budget_s) from e
+        raise StepTimeoutError(f"{deadline.name}/{name}" if deadline else name, limit) from e
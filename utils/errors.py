@@ -0,0 +1,107 @@
+# file: utils/errors.py
+from enum import Enum
+
+
+class StudyError(Exception):
+    """学习流程中可由监督器处理的异常基类"""
+
+
+class ServerError(StudyError):
+    """服务端返回 5xx"""
+
+    def __init__(self, status: int, url: str = ""):
+        super().__init__(f"服务端错误 {status}: {url}")
+        self.status = status
+        self.url = url
+
+
+class AuthExpiredError(StudyError):
+    """登录状态失效"""
+
+    def __init__(self, status: int, url: str = ""):
+        super().__init__(f"登录状态失效 {status}: {url}")
+        self.status = status
+        self.url = url
+
+
+class VideoStudyError(StudyError):
+    """视频学习达到最大重试次数仍失败"""
+
+
+class DeadlineExceededError(StudyError):
+    """步骤或阶段超出时间预算"""
+
+    def __init__(self, name: str, budget_s: float):
+        super().__init__(f"超出时间预算 {name} ({budget_s:.0f} 秒)")
+        self.name = name
+        self.budget_s = budget_s
+
+
+class StepTimeoutError(TimeoutError):
+    """单步操作超过自身时限(阶段预算仍有剩余), 可在局部重试"""
+
+    def __init__(self, name: str, timeout_s: float):
+        super().__init__(f"操作超时 {name} ({timeout_s:.0f} 秒)")
+        self.name = name
+        self.timeout_s = timeout_s
+
+
+class RetryableError(Exception):
+    """可重试的失败(状态码异常、响应格式不符等), 由重试策略决定是否再次尝试"""
+
+
+class PermanentError(Exception):
+    """重试无意义的失败(如账号密码错误), 重试策略直接放弃"""
+
+
+class FailureKind(Enum):
+    BROWSER_DISCONNECTED = "browser"    # 浏览器进程断开, 需要重新启动浏览器
+    CONTEXT_CLOSED = "context"          # 浏览器上下文被关闭, 需要重建上下文
+    PAGE_CRASHED = "page"               # 页面崩溃或被关闭, 重新打开页面即可
+    CONTENT_FAILED = "content"          # 单个内容学习失败, 在课程中记录后跳过该内容
+    AUTH_EXPIRED = "auth"               # 登录失效, 需要重新登录
+    SERVER_ERROR = "server"             # 服务端错误, 等待后重试
+    DEADLINE_EXCEEDED = "deadline"      # 阶段超出时间预算, 页面可能已挂起, 需要重建上下文
+    UNKNOWN = "unknown"
+
+
+def raise_for_status(status: int, url: str = ""):
+    """对需要监督器介入的HTTP状态码抛出异常, 其余状态码由调用方自行处理"""
+    if status >= 500:
+        raise ServerError(status, url)
+    if status in (401, 403):
+        raise AuthExpiredError(status, url)
+
+
+def classify_failure(error: BaseException) -> FailureKind:
+    """根据异常类型和 Playwright 错误信息对失败进行分类"""
+    if isinstance(error, AuthExpiredError):
+        return FailureKind.AUTH_EXPIRED
+    if isinstance(error, ServerError):
+        return FailureKind.SERVER_ERROR
+    if isinstance(error, VideoStudyError):
+        # 重试耗尽时按最后一次的原因分类(浏览器断开、页面崩溃、超出预算等), 无法分类时才是单个内容失败
+        cause = classify_failure(error.__cause__) if error.__cause__ is not None else FailureKind.UNKNOWN
+        return FailureKind.CONTENT_FAILED if cause == FailureKind.UNKNOWN else cause
+    if isinstance(error, DeadlineExceededError):
+        return FailureKind.DEADLINE_EXCEEDED
+
+    message = str(error).lower()
+    if "browser has been closed" in message or "browser closed" in message or "connection closed" in message:
+        return FailureKind.BROWSER_DISCONNECTED
+    if "crash" in message:
+        return FailureKind.PAGE_CRASHED
+    if "context" in message and "closed" in message and "page" not in message:
+        return FailureKind.CONTEXT_CLOSED
+    # "Target page, context or browser has been closed" 无法区分, 由监督器进一步探测
+    if "target" in message and "closed" in message:
+        return FailureKind.PAGE_CRASHED
+    return FailureKind.UNKNOWN
+
+
+def is_supervised_failure(error: BaseException) -> bool:
+    """
+    是否应向上抛给监督器处理, 而不是在局部记录后跳过
+    单个内容学习失败时页面、上下文和登录都仍可用, 记录后继续学习下一个内容, 不因一个损坏的视频中断整个用户
+    """
+    return classify_failure(error) not in (FailureKind.UNKNOWN, FailureKind.CONTENT_FAILED)
@@ -0,0 +1,252 @@
+# file: utils/event_bus.py
+import asyncio
+import itertools
+import json
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import ClassVar, Hashable, Protocol
+
+from config.config_loader import get_config
+from utils.clock import get_clock
+from utils.logger_manager import get_module_logger
+
+
+@dataclass(frozen=True, slots=True)
+class ProgressEvent:
+    """学习进度事件基类, kind 为事件类型名, at 为发生时刻(时间戳)"""
+    kind: ClassVar[str] = "event"
+    username: str
+    at: float = field(default_factory=lambda: get_clock().wall(), kw_only=True)
+
+    @property
+    def coalesce_key(self) -> Hashable | None:
+        """相同键的事件在队列中只保留最新一条, 为空时不合并"""
+        return None
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, **asdict(self)}
+
+
+@dataclass(frozen=True, slots=True)
+class LoginSucceeded(ProgressEvent):
+    kind: ClassVar[str] = "login_ok"
+    cached: bool        # 是否通过会话存储中的登录状态登录
+
+
+@dataclass(frozen=True, slots=True)
+class LoginFailed(ProgressEvent):
+    kind: ClassVar[str] = "login_failed"
+    reason: str
+
+
+@dataclass(frozen=True, slots=True)
+class StudyStopped(ProgressEvent):
+    kind: ClassVar[str] = "study_stopped"
+    reason: str
+
+
+@dataclass(frozen=True, slots=True)
+class CourseStarted(ProgressEvent):
+    kind: ClassVar[str] = "course_started"
+    course: str
+    index: int
+    total: int
+
+
+@dataclass(frozen=True, slots=True)
+class ContentDone(ProgressEvent):
+    kind: ClassVar[str] = "content_done"
+    course: str
+    content: str
+    content_type: str
+    success: bool
+
+
+@dataclass(frozen=True, slots=True)
+class VideoProgress(ProgressEvent):
+    kind: ClassVar[str] = "video_progress"
+    position_s: float
+    total_s: float
+
+    @property
+    def coalesce_key(self) -> Hashable | None:
+        return self.kind, self.username
+
+
+@dataclass(frozen=True, slots=True)
+class VideoStuck(ProgressEvent):
+    kind: ClassVar[str] = "video_stuck"
+    position_s: float
+
+
+@dataclass(frozen=True, slots=True)
+class VideoRecovered(ProgressEvent):
+    kind: ClassVar[str] = "video_recovered"
+    position_s: float
+
+
+class EventSink(Protocol):
+    """事件接收端"""
+    name: str
+
+    async def handle(self, event: ProgressEvent): ...
+
+
+class _Subscription:
+    """
+    一个接收端的有界队列和投递任务
+    队列满时: 可合并的事件替换队列中同键的旧事件; 否则先丢弃最旧的可合并事件, 仍没有空位时丢弃新事件
+    """
+
+    def __init__(self, sink: EventSink, queue_size: int):
+        self.sink = sink
+        self.queue_size = queue_size
+        self.pending: OrderedDict[Hashable, ProgressEvent] = OrderedDict()
+        self.ready = asyncio.Event()
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.handling = False   # 是否有已出队、正在处理的事件
+        self.task: asyncio.Task | None = None
+
+    def offer(self, event: ProgressEvent, seq: int):
+        key = event.coalesce_key
+        if key is not None and key in self.pending:
+            # 保持原位置, 只更新内容
+            self.pending[key] = event
+            self.coalesced += 1
+            return
+        if len(self.pending) >= self.queue_size and not self._evict_coalescable():
+            self.dropped += 1
+            return
+        self.pending[key if key is not None else seq] = event
+        self.ready.set()
+
+    def _evict_coalescable(self) -> bool:
+        for key, queued in self.pending.items():
+            if queued.coalesce_key is not None:
+                del self.pending[key]
+                self.dropped += 1
+                return True
+        return False
+
+    async def run(self, module_logger):
+        while True:
+            await self.ready.wait()
+            while self.pending:
+                _, event = self.pending.popitem(last=False)
+                self.handling = True
+                try:
+                    await self.sink.handle(event)
+                    self.delivered += 1
+                except Exception as e:
+                    self.errors += 1
+                    module_logger.debug(f"事件接收端 {self.sink.name} 处理 {event.kind} 出错: {e}")
+                finally:
+                    self.handling = False
+            self.ready.clear()
+
+    @property
+    def drained(self) -> bool:
+        return not self.pending and not self.handling
+
+    def to_dict(self) -> dict:
+        return {
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "pending": len(self.pending),
+        }
+
+
+class EventBus:
+    """
+    进程内进度事件总线: 各模块调用 emit() 发布事件, 每个接收端有自己的有界队列和投递任务,
+    emit 不等待任何接收端, 慢接收端只会让自己的队列合并或丢弃事件, 不影响学习流程
+    """
+
+    def __init__(self):
+        self.config = get_config().event_bus
+        self.module_logger = get_module_logger("EventBus")
+        self._subscriptions: list[_Subscription] = []
+        self._seq = itertools.count()
+        self.emitted = 0
+        self._started = False
+
+    def subscribe(self, sink: EventSink, queue_size: int = None):
+        """注册接收端, 需在事件循环中调用"""
+        subscription = _Subscription(sink, queue_size or self.config.queue_size)
+        subscription.task = asyncio.create_task(subscription.run(self.module_logger))
+        self._subscriptions.append(subscription)
+
+    def emit(self, event: ProgressEvent):
+        """发布事件, 没有接收端时直接返回"""
+        if not self._subscriptions:
+            return
+        self.emitted += 1
+        seq = next(self._seq)
+        for subscription in self._subscriptions:
+            subscription.offer(event, seq)
+
+    async def start(self):
+        """注册配置中的接收端(重复调用时只注册一次)"""
+        if self._started:
+            return
+        self._started = True
+        if self.config.journal_path:
+            self.subscribe(JournalSink(self.config.journal_path))
+
+    async def close(self) -> dict:
+        """
+        等待各接收端处理完队列中的事件(最多 drain_timeout_s 秒)后停止投递
+        :return: 停止时的事件统计, 与 build_summary() 格式相同
+        """
+        loop_time = get_clock().time
+        deadline = loop_time() + self.config.drain_timeout_s
+        while not all(s.drained for s in self._subscriptions) and loop_time() < deadline:
+            await get_clock().sleep(0.05)
+        summary = self.build_summary()
+        subscriptions, self._subscriptions = self._subscriptions, []
+        self._started = False
+        for subscription in subscriptions:
+            subscription.task.cancel()
+        await asyncio.gather(*(s.task for s in subscriptions), return_exceptions=True)
+        return summary
+
+    def build_summary(self) -> dict:
+        return {
+            "emitted": self.emitted,
+            "sinks": {s.sink.name: s.to_dict() for s in self._subscriptions},
+        }
+
+
+class JournalSink:
+    """把事件逐行写入 JSON Lines 文件, 写文件在线程中执行"""
+    name = "journal"
+
+    def __init__(self, path: str):
+        self.path = path
+        folder_path = os.path.dirname(path)
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+
+    async def handle(self, event: ProgressEvent):
+        line = json.dumps(event.to_dict(), ensure_ascii=False)
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+event_bus: EventBus | None = None
+
+
+def get_event_bus() -> EventBus:
+    global event_bus
+    if event_bus is None:
+        event_bus = EventBus()
+    return event_bus
@@ -0,0 +1,333 @@
+# file: utils/har_transport.py
+import json
+import os
+from http.cookies import SimpleCookie
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+from aiohttp import ClientSession, CookieJar
+from playwright.async_api import APIRequestContext, BrowserContext
+from yarl import URL
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class TapedResponse:
+    """
+    录制/回放的HTTP响应, 同时兼容 aiohttp 响应和 Playwright APIResponse 的常用接口
+    """
+
+    def __init__(self, url: str, status: int, headers: list, body: bytes, set_cookies: list = None):
+        """
+        :param set_cookies: 包括重定向过程在内收到的 [url, Set-Cookie] 列表, 回放时用于恢复cookie
+        """
+        self.url = url
+        self.status = status
+        self.header_pairs = headers
+        self.set_cookies = set_cookies or []
+        self.headers = {k.lower(): v for k, v in headers}
+        self._body = body
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def body(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode("utf-8", errors="replace")
+
+    async def json(self, **kwargs):
+        return json.loads(self._body)
+
+    def release(self):
+        pass
+
+
+class HttpTape:
+    """
+    HTTP请求磁带: 以 "方法 URL 参数" 为键按调用顺序保存响应, 回放时按相同顺序取出
+    """
+
+    def __init__(self, tape_path: str):
+        self.tape_path = tape_path
+        self.entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+
+    @staticmethod
+    def make_key(method: str, url: str, params=None) -> str:
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        if params:
+            for name, value in params.items() if isinstance(params, dict) else params:
+                for item in value if isinstance(value, list) else [value]:
+                    query.append((name, str(item)))
+        base = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        return f"{method.upper()} {base} {json.dumps(sorted(query), ensure_ascii=False)}"
+
+    def record(self, key: str, response: TapedResponse):
+        self.entries.setdefault(key, []).append({
+            "url": response.url,
+            "status": response.status,
+            "headers": response.header_pairs,
+            "body": response._body.decode("latin-1"),
+            "set_cookies": response.set_cookies,
+        })
+
+    def lookup(self, key: str) -> Optional[TapedResponse]:
+        """按录制顺序取出响应, 超出录制次数时重复返回最后一个"""
+        recorded = self.entries.get(key)
+        if not recorded:
+            return None
+        index = min(self._cursor.get(key, 0), len(recorded) - 1)
+        self._cursor[key] = index + 1
+        entry = recorded[index]
+        return TapedResponse(entry["url"], entry["status"], entry["headers"], entry["body"].encode("latin-1"),
+                             entry.get("set_cookies"))
+
+    def load(self):
+        if os.path.exists(self.tape_path):
+            with open(self.tape_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        folder_path = os.path.dirname(self.tape_path)
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+        with open(self.tape_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+
+
+class _TapedRequest:
+    """与 aiohttp 请求对象一致: 既可以 await, 也可以用于 async with"""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._response = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._response = await self._coro
+        return self._response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class TapedClientSession:
+    """
+    替代 aiohttp.ClientSession: 录制模式下透传并录制, 回放模式下只从磁带返回响应并维护cookie
+    """
+
+    def __init__(self, transport: "HarTransport"):
+        self.transport = transport
+        self._inner = ClientSession() if transport.mode == MODE_RECORD else None
+        self.cookie_jar = self._inner.cookie_jar if self._inner else CookieJar()
+        self.headers = self._inner.headers if self._inner else {}
+
+    def get(self, url: str, **kwargs) -> _TapedRequest:
+        return _TapedRequest(self._request("GET", url, **kwargs))
+
+    def post(self, url: str, **kwargs) -> _TapedRequest:
+        return _TapedRequest(self._request("POST", url, **kwargs))
+
+    async def _request(self, method: str, url: str, **kwargs) -> TapedResponse:
+        key = HttpTape.make_key(method, url, kwargs.get("params"))
+        if self._inner:
+            async with self._inner.request(method, url, **kwargs) as response:
+                set_cookies = [
+                    [str(r.url), value]
+                    for r in (*response.history, response)
+                    for value in r.headers.getall("Set-Cookie", [])
+                ]
+                taped = TapedResponse(str(response.url), response.status, list(response.headers.items()),
+                                      await response.read(), set_cookies)
+            self.transport.tape.record(key, taped)
+            return taped
+        return self.transport.replay(key, url, self.cookie_jar)
+
+    async def close(self):
+        if self._inner:
+            await self._inner.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._inner.closed if self._inner else False
+
+
+class TapedAPIRequest:
+    """替代 BrowserContext.request: 录制模式下透传并录制, 回放模式下只从磁带返回响应"""
+
+    def __init__(self, transport: "HarTransport", inner: APIRequestContext):
+        self.transport = transport
+        self._inner = inner
+
+    async def get(self, url: str, **kwargs) -> TapedResponse:
+        return await self._request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> TapedResponse:
+        return await self._request("POST", url, **kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs) -> TapedResponse:
+        key = HttpTape.make_key(method, url, kwargs.get("params"))
+        if self.transport.mode == MODE_RECORD:
+            response = await self._inner.fetch(url, method=method, **kwargs)
+            taped = TapedResponse(response.url, response.status, list(response.headers.items()),
+                                  await response.body())
+            self.transport.tape.record(key, taped)
+            return taped
+        return self.transport.replay(key, url)
+
+
+class SessionAPIRequest:
+    """
+    用 aiohttp 会话提供与 context.request 相同的 get/post 接口, 供无浏览器的状态巡检使用
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def get(self, url: str, **kwargs) -> TapedResponse:
+        return await self._request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> TapedResponse:
+        return await self._request("POST", url, **kwargs)
+
+    async def _request(self, method: str, url: str, params: dict = None, **kwargs) -> TapedResponse:
+        # Playwright 的列表参数展开为重复的查询参数
+        query = []
+        for name, value in (params or {}).items():
+            for item in value if isinstance(value, list) else [value]:
+                query.append((name, str(item)))
+        request = self.session.get if method == "GET" else self.session.post
+        async with request(url, params=query, **kwargs) as response:
+            return TapedResponse(str(response.url), response.status, list(response.headers.items()),
+                                 await response.read())
+
+
+class HarTransport:
+    """
+    单个用户的录制/回放传输层
+
+    - 浏览器页面流量: 录制模式下由 Playwright 录制为 HAR, 回放模式下通过 route_from_har 返回
+    - context.request 和 aiohttp 登录请求: 不经过浏览器路由, 录制到同目录下的 .http.json 磁带
+    """
+
+    def __init__(self, username: str):
+        self.config = get_config()
+        self.username = username
+        self.mode = self.config.har.mode
+        self.har_path = os.path.join(self.config.har.dir, f"{username}.har")
+        self.tape = HttpTape(os.path.join(self.config.har.dir, f"{username}.http.json"))
+        self.module_logger = get_module_logger("HarTransport")
+        self._captcha_session: TapedClientSession | None = None
+        self._har_segments: list[str] = []     # 录制模式下每个 context 单独录制的 HAR 分段
+        if self.mode == MODE_REPLAY:
+            self.tape.load()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    def context_options(self) -> dict:
+        """
+        传给 browser.new_context 的额外参数
+        录制模式下监督器恢复、重新登录都会重建 context, 每个 context 录制到单独的分段, 保存时合并
+        """
+        if self.mode == MODE_RECORD:
+            os.makedirs(os.path.dirname(self.har_path) or ".", exist_ok=True)
+            segment_path = f"{os.path.splitext(self.har_path)[0]}.{len(self._har_segments)}.har"
+            self._har_segments.append(segment_path)
+            return {"record_har_path": segment_path, "record_har_content": "embed"}
+        return {}
+
+    def merge_har_segments(self):
+        """把各 context 的 HAR 分段按顺序合并为 har_path 并删除分段, context 关闭后才写入分段"""
+        segments = [path for path in self._har_segments if os.path.exists(path)]
+        self._har_segments = []
+        if not segments:
+            return
+        merged = None
+        for path in segments:
+            with open(path, "r", encoding="utf-8") as f:
+                har = json.load(f)
+            if merged is None:
+                merged = har
+            else:
+                merged["log"].setdefault("pages", []).extend(har["log"].get("pages", []))
+                merged["log"].setdefault("entries", []).extend(har["log"].get("entries", []))
+        with open(self.har_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, ensure_ascii=False)
+        for path in segments:
+            os.remove(path)
+
+    async def attach(self, context: BrowserContext):
+        """回放模式下为 context 挂载 HAR 路由, 未录制的请求直接中止"""
+        if self.mode == MODE_REPLAY:
+            await context.route_from_har(self.har_path, not_found="abort")
+
+    def wrap_api(self, request: APIRequestContext):
+        """包装 context.request, 关闭录制回放时原样返回"""
+        if not self.enabled:
+            return request
+        return TapedAPIRequest(self, request)
+
+    def client_session(self):
+        """创建登录用的 aiohttp 会话"""
+        if not self.enabled:
+            return ClientSession()
+        return TapedClientSession(self)
+
+    def captcha_session(self) -> Optional[TapedClientSession]:
+        """验证码识别接口使用的会话, 关闭录制回放时返回None(由识别函数自行创建)"""
+        if not self.enabled:
+            return None
+        if self._captcha_session is None:
+            self._captcha_session = TapedClientSession(self)
+        return self._captcha_session
+
+    def replay(self, key: str, url: str, cookie_jar: CookieJar = None) -> TapedResponse:
+        response = self.tape.lookup(key)
+        if response is None:
+            self.module_logger.warning(f"回放磁带中没有请求: {key}")
+            return TapedResponse(url, 404, [], b"{}")
+        if cookie_jar is not None:
+            for cookie_url, value in response.set_cookies:
+                cookie_jar.update_cookies(SimpleCookie(value), URL(cookie_url))
+        return response
+
+    async def close(self):
+        if self._captcha_session:
+            await self._captcha_session.close()
+        if self.mode == MODE_RECORD:
+            self.tape.save()
+            self.merge_har_segments()
+            self.module_logger.info(f"已保存用户 {self.username} 的HTTP录制到 {self.tape.tape_path}, 页面录制到 {self.har_path}")
+
+
+# 按用户缓存的传输层实例
+_transports: dict[str, HarTransport] = {}
+
+
+def get_har_transport(username: str) -> HarTransport:
+    if username not in _transports:
+        _transports[username] = HarTransport(username)
+    return _transports[username]
+
+
+async def release_har_transport(username: str):
+    """用户结束时保存录制并释放实例"""
+    transport = _transports.pop(username, None)
+    if transport:
+        await transport.close()
@@ -0,0 +1,190 @@
+# file: utils/host_calibration.py
+import asyncio
+import json
+import math
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+from utils.loop_monitor import LoopLagMonitor
+from utils.proc_stats import memory_available_bytes, tree_cpu_seconds, tree_rss_bytes
+from utils.run_ledger import percentile
+
+
+@dataclass
+class HostCalibration:
+    """主机校准结果"""
+    hostname: str
+    cpu_count: int
+    memory_available_mb: float
+    browser_profile: str
+    users_measured: int
+    cpu_percent_per_user: float     # 每个活跃用户占用的单核CPU百分比
+    rss_mb_per_user: float          # 每个活跃用户增加的常驻内存
+    base_rss_mb: float              # 没有用户时本进程和浏览器的常驻内存
+    cpu_limit: int                  # 按CPU目标计算的并发上限
+    memory_limit: int               # 按内存目标计算的并发上限
+    lag_limit: Optional[int]        # 事件循环延迟超标前的最大用户数, 未超标时为空
+    recommended_concurrency: int
+    measured_at: float
+
+    def matches_host(self) -> bool:
+        """校准结果是否属于当前主机(复制到其他机器上的结果不使用)"""
+        return self.hostname == socket.gethostname() and self.cpu_count == os.cpu_count()
+
+
+def load_calibration(path: str = None) -> Optional[HostCalibration]:
+    path = path or get_config().calibration.path
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return HostCalibration(**json.load(f))
+    except Exception as e:
+        get_module_logger("Calibration").error(f"主机校准结果读取失败: {e}")
+        return None
+
+
+def save_calibration(calibration: HostCalibration, path: str = None):
+    path = path or get_config().calibration.path
+    folder_path = os.path.dirname(path)
+    if folder_path:
+        os.makedirs(folder_path, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(asdict(calibration), f, ensure_ascii=False, indent=2)
+
+
+def resolve_batch_size() -> int:
+    """
+    每批用户数: 优先使用配置值, 未配置时使用本机的校准结果, 都没有时使用默认值
+    """
+    config = get_config()
+    if config.project.user_batch_size > 0:
+        return config.project.user_batch_size
+    module_logger = get_module_logger("Calibration")
+    calibration = load_calibration()
+    if calibration and calibration.matches_host():
+        module_logger.info(f"使用主机校准的推荐并发数: {calibration.recommended_concurrency}")
+        return calibration.recommended_concurrency
+    if calibration:
+        module_logger.warning(f"校准结果来自其他主机 {calibration.hostname}, 请在本机重新运行 --mode calibrate")
+    else:
+        module_logger.warning("未配置每批用户数且没有主机校准结果, 建议运行 --mode calibrate")
+    return config.calibration.default_batch_size
+
+
+class HostCalibrator:
+    """
+    主机校准: 在本地替身学习平台上逐步增加播放视频的模拟用户, 测量每个活跃用户占用的CPU、内存
+    和事件循环延迟, 按CPU/内存目标比例和延迟上限计算本机推荐的最大并发数
+    """
+
+    def __init__(self):
+        self.config = get_config()
+        self.module_logger = get_module_logger("Calibration")
+
+    async def run(self) -> HostCalibration:
+        # 替身平台和模拟用户只在校准时需要
+        from utils.browser_pool import BrowserPool
+        from utils.stand_in_lms import StandInLMS, open_user
+
+        settings = self.config.calibration
+        memory_available = memory_available_bytes()
+        lms = StandInLMS(course_count=1, videos_per_course=1, video_s=3600, speed=1.0)
+        browser_pool = BrowserPool(1)
+        loop_monitor = LoopLagMonitor()
+        await lms.start()
+        await browser_pool.start()
+        loop_monitor.start()
+        contexts = []
+        try:
+            browser = await browser_pool.get_browser()
+            await asyncio.sleep(settings.settle_s)
+            base_rss = tree_rss_bytes()
+
+            measurements = []
+            lag_limit = None
+            while len(contexts) < settings.max_users:
+                for _ in range(min(settings.step_users, settings.max_users - len(contexts))):
+                    contexts.append(await open_user(browser, browser_pool.profile, lms.base_url, len(contexts)))
+                await asyncio.sleep(settings.settle_s)
+                measurement = await self.measure(len(contexts), loop_monitor, settings.window_s)
+                measurements.append(measurement)
+                self.module_logger.info(
+                    f"{measurement['users']} 个用户: CPU {measurement['cpu_percent']:.0f}%, "
+                    f"内存 {measurement['rss_bytes'] / 1024 / 1024:.0f} MB, "
+                    f"循环延迟P99 {measurement['lag_p99_s'] * 1000:.0f} ms"
+                )
+                if measurement["lag_p99_s"] > settings.max_loop_lag_s:
+                    lag_limit = measurements[-2]["users"] if len(measurements) > 1 else 1
+                    self.module_logger.info(f"事件循环延迟超过 {settings.max_loop_lag_s} 秒, 停止增加用户")
+                    break
+        finally:
+            for context in contexts:
+                await context.close()
+            await loop_monitor.stop()
+            await browser_pool.close()
+            await lms.stop()
+
+        return self.recommend(measurements, base_rss, memory_available, lag_limit, browser_pool.profile.name)
+
+    @staticmethod
+    async def measure(users: int, loop_monitor: LoopLagMonitor, window_s: float) -> dict:
+        """统计窗口内进程树的CPU占用、常驻内存和事件循环延迟"""
+        cpu_start = await asyncio.to_thread(tree_cpu_seconds)
+        await asyncio.sleep(window_s)
+        cpu_end = await asyncio.to_thread(tree_cpu_seconds)
+        lag = list(loop_monitor.samples)[-int(window_s / loop_monitor.config.interval_s):]
+        return {
+            "users": users,
+            "cpu_percent": max(cpu_end - cpu_start, 0.0) / window_s * 100,
+            "rss_bytes": await asyncio.to_thread(tree_rss_bytes),
+            "lag_p99_s": percentile(lag, 99),
+        }
+
+    def recommend(self, measurements: list[dict], base_rss: int, memory_available: int,
+                  lag_limit: Optional[int], profile_name: str) -> HostCalibration:
+        settings = self.config.calibration
+        # 取延迟未超标的最后一轮计算每用户开销(用户数越多, 固定开销的影响越小)
+        usable = [m for m in measurements if lag_limit is None or m["users"] <= lag_limit] or measurements[:1]
+        last = usable[-1]
+        cpu_per_user = last["cpu_percent"] / last["users"]
+        rss_per_user = max(last["rss_bytes"] - base_rss, 0) / last["users"]
+
+        cpu_count = os.cpu_count() or 1
+        cpu_limit = math.floor(cpu_count * 100 * settings.cpu_target / cpu_per_user) if cpu_per_user else 10 ** 6
+        memory_budget = memory_available * settings.memory_target - base_rss
+        memory_limit = math.floor(memory_budget / rss_per_user) if rss_per_user else 10 ** 6
+        recommended = max(1, min(cpu_limit, memory_limit, lag_limit or cpu_limit))
+
+        calibration = HostCalibration(
+            hostname=socket.gethostname(),
+            cpu_count=cpu_count,
+            memory_available_mb=memory_available / 1024 / 1024,
+            browser_profile=profile_name,
+            users_measured=last["users"],
+            cpu_percent_per_user=cpu_per_user,
+            rss_mb_per_user=rss_per_user / 1024 / 1024,
+            base_rss_mb=base_rss / 1024 / 1024,
+            cpu_limit=cpu_limit,
+            memory_limit=memory_limit,
+            lag_limit=lag_limit,
+            recommended_concurrency=recommended,
+            measured_at=time.time(),
+        )
+        self.module_logger.info(
+            f"校准完成: 每用户CPU {cpu_per_user:.1f}%, 内存 {calibration.rss_mb_per_user:.0f} MB; "
+            f"并发上限 CPU {cpu_limit} / 内存 {memory_limit} / 延迟 {lag_limit or '-'}, 推荐 {recommended}"
+        )
+        return calibration
+
+    async def calibrate(self) -> HostCalibration:
+        """运行校准并保存结果"""
+        calibration = await self.run()
+        save_calibration(calibration)
+        self.module_logger.info(f"校准结果已保存到 {self.config.calibration.path}")
+        return calibration
@@ -0,0 +1,50 @@
+# file: utils/host_limiter.py
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from config.config_loader import get_config
+
+
+class HostLimiter:
+    """
+    按主机限制并发请求数: 每个主机一个信号量, 未单独设置上限的主机使用默认上限
+    """
+
+    def __init__(self, default_limit: int):
+        self.default_limit = max(default_limit, 1)
+        self.limits: dict[str, int] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def set_limit(self, url_or_host: str, limit: int):
+        """为指定主机设置单独的并发上限, 需在该主机首次请求前设置"""
+        self.limits[self.host_of(url_or_host)] = max(limit, 1)
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        return urlsplit(url_or_host).hostname or url_or_host
+
+    def semaphore(self, url: str) -> asyncio.Semaphore:
+        host = self.host_of(url)
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.limits.get(host, self.default_limit))
+        return self._semaphores[host]
+
+    @asynccontextmanager
+    async def limit(self, url: str):
+        """在该主机的并发上限内执行请求"""
+        async with self.semaphore(url):
+            yield
+
+
+_host_limiter: HostLimiter | None = None
+
+
+def get_host_limiter() -> HostLimiter:
+    """登录阶段共享的主机限流器: SSO等站点按 sso_concurrency, 验证码接口按 captcha_concurrency"""
+    global _host_limiter
+    if _host_limiter is None:
+        config = get_config()
+        _host_limiter = HostLimiter(config.login.sso_concurrency)
+        _host_limiter.set_limit(config.qr_code.api_url, config.login.captcha_concurrency)
+    return _host_limiter
@@ -98,9 +98,23 @@ class LoggerManager:
         log_file = f"logs/user/{username}/{module_name}.log"
         return cls.get_logger(f"user.{username}.{module_name}", log_file, level, console_level, file_level)
 
+    @classmethod
+    def release_user_loggers(cls, username: str):
+        """
+        用户结束时关闭并移除其专属日志记录器的处理器, 避免长时间运行时文件句柄累积
+        Logger 对象本身保留在 logging 的管理器中(父子层级由管理器维护), 再次获取时重新添加处理器
+        """
+        prefix = f"user.{username}"
+        for name in [n for n in cls._loggers if n == prefix or n.startswith(prefix + ".")]:
+            logger = cls._loggers.pop(name)
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+
 
 # 全局访问点
 get_logger = LoggerManager.get_logger
 get_user_logger = LoggerManager.get_user_logger
 get_module_logger = LoggerManager.get_module_logger
 get_user_module_logger = LoggerManager.get_user_module_logger
+release_user_loggers = LoggerManager.release_user_loggers
@@ -0,0 +1,97 @@
+# file: utils/loop_monitor.py
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+from utils.run_ledger import percentile
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+
+    - 采样协程: 每隔 interval_s 记录一次 sleep 的实际唤醒延迟, 用于统计延迟百分位
+    - 看门狗线程: 采样协程超过 threshold_s 没有心跳时, 抓取事件循环线程当前的调用栈,
+      循环恢复后把阻塞时长和调用栈一起记录下来
+    """
+
+    SAMPLE_LIMIT = 100000   # 保留的延迟样本上限
+
+    def __init__(self):
+        self.config = get_config().loop_monitor
+        self.module_logger = get_module_logger("LoopMonitor")
+        self.samples: deque[float] = deque(maxlen=self.SAMPLE_LIMIT)
+        self.stalls: deque[dict] = deque(maxlen=self.config.max_stalls)
+        self._last_beat = time.monotonic()
+        self._pending_stack: list[str] | None = None
+        self._loop_thread_id: int | None = None
+        self._sample_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """在事件循环中启动监控"""
+        if not self.config.enabled or self._sample_task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._sample_task = asyncio.create_task(self._sample_loop())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        if not self._sample_task:
+            return
+        self._stop.set()
+        self._sample_task.cancel()
+        try:
+            await self._sample_task
+        except asyncio.CancelledError:
+            pass
+        self._sample_task = None
+        await asyncio.to_thread(self._watchdog.join)
+        self._watchdog = None
+
+    async def _sample_loop(self):
+        loop = asyncio.get_running_loop()
+        interval = self.config.interval_s
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(loop.time() - expected, 0.0)
+            self._last_beat = time.monotonic()
+            self.samples.append(lag)
+
+            stack = self._pending_stack
+            if stack is not None:
+                self._pending_stack = None
+                self.stalls.append({"at": time.time(), "lag_s": lag, "stack": stack})
+                self.module_logger.warning(
+                    f"事件循环被阻塞 {lag:.3f} 秒, 阻塞时的调用栈:\n{''.join(stack)}"
+                )
+
+    def _watch(self):
+        """看门狗线程: 心跳超时时抓取事件循环线程的调用栈(每次阻塞只抓一次)"""
+        threshold = self.config.threshold_s
+        while not self._stop.wait(threshold / 4):
+            if self._pending_stack is not None:
+                continue
+            if time.monotonic() - self._last_beat - self.config.interval_s < threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._pending_stack = traceback.format_stack(frame)
+
+    def build_summary(self) -> dict:
+        samples = list(self.samples)
+        return {
+            "samples": len(samples),
+            "lag_seconds": {q: percentile(samples, q) for q in (50, 90, 99)} | {"max": max(samples, default=0.0)},
+            "stalls": list(self.stalls),
+        }
@@ -0,0 +1,86 @@
+# file: utils/proc_stats.py
+"""
+通过 /proc 读取进程资源占用(仅Linux), 用于统计本进程及其启动的浏览器进程
+"""
+import os
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_stat(pid: int) -> list[str] | None:
+    """读取 /proc/<pid>/stat, 返回进程名之后的字段"""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 进程名可能包含空格, 从最后一个右括号之后开始切分
+    return data[data.rfind(")") + 2:].split()
+
+
+def process_tree(root_pid: int = None) -> list[int]:
+    """返回根进程及其所有子孙进程的pid"""
+    root_pid = root_pid or os.getpid()
+    children: dict[int, list[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        fields = _read_stat(int(entry))
+        if fields:
+            children.setdefault(int(fields[1]), []).append(int(entry))
+
+    tree, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+
+def rss_bytes(pid: int) -> int:
+    """进程常驻内存(字节), 进程已退出时为0"""
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def cpu_seconds(pid: int) -> float:
+    """进程累计占用的CPU时间(用户态+内核态, 秒)"""
+    fields = _read_stat(pid)
+    if not fields:
+        return 0.0
+    # stat 第14、15个字段为 utime、stime, 去掉 pid 和进程名后下标为 11、12
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def open_fds(pid: int = None) -> int:
+    """进程打开的文件描述符数量"""
+    try:
+        return len(os.listdir(f"/proc/{pid or os.getpid()}/fd"))
+    except OSError:
+        return 0
+
+
+def tree_rss_bytes(root_pid: int = None) -> int:
+    """进程树的常驻内存总和"""
+    return sum(rss_bytes(pid) for pid in process_tree(root_pid))
+
+
+def tree_cpu_seconds(root_pid: int = None) -> float:
+    """进程树累计占用的CPU时间总和"""
+    return sum(cpu_seconds(pid) for pid in process_tree(root_pid))
+
+
+def memory_available_bytes() -> int:
+    """系统可用内存(/proc/meminfo 中的 MemAvailable), 读取失败时为0"""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    return 0
@@ -0,0 +1,73 @@
+# file: utils/progress_tracker.py
+from urllib.parse import parse_qsl, urlsplit
+
+from playwright.async_api import Response
+
+from utils.clock import get_clock
+from utils.time_utils import time_str_to_seconds
+
+LEARNING_TIME_PATTERN = "learningTime_"
+END_VIDEO_PATTERN = "learningTime_endVideoLearning.action"
+
+
+class ProgressTracker:
+    """
+    通过播放器上报学习时间的接口(learningTime_*)被动获取视频进度, 只记录服务端已确认(响应200)的进度,
+    不读取页面DOM. 一段时间内没有新的上报时由调用方退回到DOM检查
+    """
+
+    # 上报参数中可能表示播放位置的字段, 按顺序取第一个能解析的
+    POSITION_PARAMS = ("learnTime", "studyTime", "currentTime", "position", "time")
+
+    def __init__(self):
+        self.position_s: float | None = None    # 服务端确认的播放位置(秒)
+        self.acked_at = 0.0                      # 确认位置最近一次前进(或确认结束)的时间(时钟单调时间)
+        self.ended = False                       # 服务端已确认视频学习结束
+        self.reports = 0                         # 本视频收到的确认上报次数
+
+    def reset(self):
+        """开始新视频时清空进度"""
+        self.position_s = None
+        self.acked_at = 0.0
+        self.ended = False
+        self.reports = 0
+
+    def on_response(self, response: Response):
+        """context 的 response 事件处理函数"""
+        url = response.url
+        if LEARNING_TIME_PATTERN not in url or response.status != 200:
+            return
+        self.reports += 1
+        if END_VIDEO_PATTERN in url:
+            self.ended = True
+            self.acked_at = get_clock().time()
+            return
+        # 只有解析到前进的位置才刷新确认时间, 没有位置或位置不变(播放卡住)的上报不能延长新鲜期,
+        # 超过 stale_s 后调用方退回到读取页面并做卡顿检测
+        position = self.parse_position(url, response.request.post_data)
+        if position is not None and (self.position_s is None or position > self.position_s):
+            self.position_s = position
+            self.acked_at = get_clock().time()
+
+    @classmethod
+    def parse_position(cls, url: str, post_data: str | None) -> float | None:
+        params = dict(parse_qsl(urlsplit(url).query))
+        if post_data:
+            params.update(parse_qsl(post_data))
+        for name in cls.POSITION_PARAMS:
+            value = params.get(name)
+            if not value:
+                continue
+            try:
+                return float(time_str_to_seconds(value)) if ":" in value else float(value)
+            except ValueError:
+                continue
+        return None
+
+    def is_fresh(self, stale_s: float) -> bool:
+        """最近 stale_s 秒内确认位置是否前进过"""
+        return self.position_s is not None and get_clock().time() - self.acked_at <= stale_s
+
+    def estimated_position(self, total_s: float) -> float:
+        """按确认位置加上此后经过的时间估算当前播放位置"""
+        return min(self.position_s + get_clock().time() - self.acked_at, total_s)
@@ -0,0 +1,211 @@
+# file: utils/resource_accountant.py
+import asyncio
+import time
+from dataclasses import dataclass
+
+from playwright.async_api import Page
+
+from config.config_loader import get_config
+from utils.browser_profiles import get_browser_profile
+from utils.logger_manager import get_module_logger
+from utils.proc_stats import cpu_seconds, open_fds, process_tree, rss_bytes
+
+
+@dataclass
+class ResourceUsage:
+    """一个用户或一门课程累计分摊到的资源"""
+    cpu_seconds: float = 0.0        # 分摊到的浏览器进程树CPU时间
+    rss_mb_peak: float = 0.0        # 分摊到的常驻内存峰值
+    rss_mb_seconds: float = 0.0     # 常驻内存对时间的积分, 除以时长得到平均内存
+    fds_peak: float = 0.0           # 分摊到的浏览器进程树打开的文件描述符(含socket)峰值
+    seconds: float = 0.0            # 参与分摊的时长
+
+    def add(self, cpu: float, rss_mb: float, fds: float, interval: float):
+        self.cpu_seconds += cpu
+        self.rss_mb_peak = max(self.rss_mb_peak, rss_mb)
+        self.rss_mb_seconds += rss_mb * interval
+        self.fds_peak = max(self.fds_peak, fds)
+        self.seconds += interval
+
+    def to_dict(self) -> dict:
+        return {
+            "cpu_seconds": self.cpu_seconds,
+            "rss_mb_peak": self.rss_mb_peak,
+            "rss_mb_avg": self.rss_mb_seconds / self.seconds if self.seconds else 0.0,
+            "fds_peak": self.fds_peak,
+        }
+
+
+class ResourceAccountant:
+    """
+    用户资源核算: 定期采样浏览器进程树(Playwright 驱动和浏览器进程)的CPU时间、常驻内存和打开的文件描述符,
+    分摊到正在学习的用户和课程, 用于找出资源消耗异常的用户和课程
+
+    - Chromium: 通过 CDP Performance.getMetrics 读取每个页面主线程的任务耗时(TaskDuration)和 JS 堆大小,
+      进程树的CPU按各用户页面实测的任务耗时分摊, 内存按 JS 堆分摊, 课程排名反映实际消耗
+    - Firefox: 内容进程由多个 context 共用且没有按页面的资源指标, 只能按各用户打开的页面数平均分摊,
+      结果只是估算(近似于按学习时长分配), 不累计课程消耗
+    文件描述符(含 context.request 发出的连接)无法对应到页面, 始终按页面数分摊
+    """
+
+    def __init__(self):
+        self.config = get_config().resource
+        self.module_logger = get_module_logger("Resource")
+        browser_config = get_config().browser
+        profile = get_browser_profile(browser_config.profile, browser_config.browser_type)
+        self.measured = profile.browser_type == "chromium"    # 是否有按页面的实测指标
+        self.users: dict[str, object] = {}                              # 用户账号 -> UserAsync
+        self.user_usage: dict[str, ResourceUsage] = {}
+        self._course_usage: dict[str, dict[str, ResourceUsage]] = {}    # 用户账号 -> 所属运行的课程累计
+        self._page_metrics: dict[Page, list] = {}                       # 页面 -> [CDP会话, 上次的任务耗时]
+        self._last_cpu: float | None = None
+        self._last_sample = 0.0
+        self._task: asyncio.Task | None = None
+
+    def register(self, user_async, course_usage: dict[str, ResourceUsage] = None):
+        """
+        用户开始学习时登记, 首次登记时启动采样
+        :param course_usage: 该用户所属运行的课程累计, 服务模式下多个任务共用核算但各自汇总课程消耗
+        """
+        username = user_async.user_data.username
+        self.users[username] = user_async
+        self.user_usage.setdefault(username, ResourceUsage())
+        self._course_usage[username] = course_usage if course_usage is not None else {}
+        if self.config.enabled and self._task is None:
+            self._task = asyncio.create_task(self._sample_loop())
+
+    def unregister(self, user_async) -> ResourceUsage:
+        """用户结束时注销, 返回其累计资源并写入运行统计"""
+        username = user_async.user_data.username
+        self.users.pop(username, None)
+        self._course_usage.pop(username, None)
+        usage = self.user_usage.pop(username, ResourceUsage())
+        user_async.run_stats.cpu_seconds = usage.cpu_seconds
+        user_async.run_stats.rss_mb_peak = usage.rss_mb_peak
+        user_async.run_stats.fds_peak = usage.fds_peak
+        if not self.users and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._last_cpu = None
+            self._page_metrics.clear()
+        return usage
+
+    async def _sample_loop(self):
+        while True:
+            try:
+                # 读取 /proc 放到线程中, 分摊时要访问 Playwright 对象, 留在事件循环中执行
+                cpu_total, rss_mb, fds = await asyncio.to_thread(self.read_browser_tree)
+                await self.attribute(cpu_total, rss_mb, fds)
+            except Exception as e:
+                self.module_logger.error(f"资源采样出错: {e}")
+            await asyncio.sleep(self.config.sample_s)
+
+    @staticmethod
+    def read_browser_tree() -> tuple[float, float, int]:
+        """本进程所有子孙进程(Playwright 驱动和浏览器)的累计CPU时间(秒)、常驻内存(MB)和打开的文件描述符数"""
+        pids = process_tree()[1:]
+        cpu_total = sum(cpu_seconds(pid) for pid in pids)
+        rss_mb = sum(rss_bytes(pid) for pid in pids) / 1024 / 1024
+        fds = sum(open_fds(pid) for pid in pids)
+        return cpu_total, rss_mb, fds
+
+    async def attribute(self, cpu_total: float, rss_mb: float, fds: int = 0):
+        """分摊一次采样结果, Chromium 下按页面实测消耗, 否则按页面数"""
+        now = time.monotonic()
+        first_sample = self._last_cpu is None
+        # 有进程退出时累计CPU时间会变小, 此时不计入
+        cpu_delta = 0.0 if first_sample else max(cpu_total - self._last_cpu, 0.0)
+        interval = now - self._last_sample
+        self._last_cpu, self._last_sample = cpu_total, now
+
+        users = list(self.users.items())
+        pages = {username: self.page_count(user_async) for username, user_async in users}
+        if self.measured:
+            # 首次采样也读取页面指标, 作为下次计算任务耗时增量的基准
+            for page in [page for page in self._page_metrics if page.is_closed()]:
+                del self._page_metrics[page]
+            measurements = {username: await self.measure_user(user_async) for username, user_async in users}
+            cpu_shares = self.shares({username: m[0] for username, m in measurements.items()}, pages)
+            rss_shares = self.shares({username: m[1] for username, m in measurements.items()}, pages)
+        else:
+            cpu_shares = rss_shares = self.shares(pages, pages)
+        if first_sample or not users:
+            return
+        fds_shares = self.shares(pages, pages)
+        for username, user_async in users:
+            cpu = cpu_delta * cpu_shares[username]
+            rss = rss_mb * rss_shares[username]
+            user_fds = fds * fds_shares[username]
+            self.user_usage.setdefault(username, ResourceUsage()).add(cpu, rss, user_fds, interval)
+            course = user_async.study_manager.course_manager.current_course
+            if self.measured and course:
+                course_usage = self._course_usage.setdefault(username, {})
+                course_usage.setdefault(course.get('name'), ResourceUsage()).add(cpu, rss, user_fds, interval)
+
+    async def measure_user(self, user_async) -> tuple[float, float]:
+        """用户各页面自上次采样以来的主线程任务耗时(秒)之和, 以及当前 JS 堆已用大小(MB)之和"""
+        context = user_async.login_manager.context
+        task_delta = heap_mb = 0.0
+        for page in list(context.pages) if context else []:
+            try:
+                task_s, page_heap_mb = await self.page_metrics(page)
+            except Exception as e:
+                self.module_logger.debug(f"读取页面指标失败: {e}")
+                continue
+            entry = self._page_metrics[page]
+            if entry[1] is not None:
+                task_delta += max(task_s - entry[1], 0.0)
+            entry[1] = task_s
+            heap_mb += page_heap_mb
+        return task_delta, heap_mb
+
+    async def page_metrics(self, page: Page) -> tuple[float, float]:
+        """读取页面主线程累计任务耗时(秒)和 JS 堆已用大小(MB), 每个页面只创建一次 CDP 会话"""
+        entry = self._page_metrics.get(page)
+        if entry is None:
+            session = await page.context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            entry = self._page_metrics[page] = [session, None]
+        result = await entry[0].send("Performance.getMetrics")
+        metrics = {metric["name"]: metric["value"] for metric in result["metrics"]}
+        return metrics.get("TaskDuration", 0.0), metrics.get("JSHeapUsedSize", 0.0) / 1024 / 1024
+
+    @staticmethod
+    def shares(weights: dict[str, float], fallback: dict[str, float]) -> dict[str, float]:
+        """按权重计算各用户的分摊比例, 权重全为0时改用 fallback, 仍全为0时平均分摊"""
+        for candidate in (weights, fallback):
+            total = sum(candidate.values())
+            if total > 0:
+                return {username: weight / total for username, weight in candidate.items()}
+        return {username: 1 / len(weights) for username in weights}
+
+    @staticmethod
+    def page_count(user_async) -> int:
+        context = user_async.login_manager.context
+        try:
+            return len(context.pages) if context else 0
+        except Exception:
+            return 0
+
+    def build_summary(self, course_usage: dict[str, ResourceUsage]) -> dict:
+        """
+        一次运行的资源汇总
+        :param course_usage: 该运行登记用户时传入的课程累计
+        """
+        if not self.measured:
+            # 按页面数平均分摊的课程消耗只反映学习时长, 不能用于找出消耗异常的课程
+            return {"method": "page_share_estimate", "top_courses": []}
+        courses = sorted(course_usage.items(), key=lambda item: item[1].cpu_seconds, reverse=True)
+        return {"method": "page_metrics", "top_courses": [
+            {"course": name, **usage.to_dict()} for name, usage in courses[:self.config.top_courses]
+        ]}
+
+
+resource_accountant: ResourceAccountant | None = None
+
+
+def get_resource_accountant() -> ResourceAccountant:
+    global resource_accountant
+    if resource_accountant is None:
+        resource_accountant = ResourceAccountant()
+    return resource_accountant
@@ -0,0 +1,182 @@
+# file: utils/retry_policy.py
+import asyncio
+import random
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, TypeVar
+from urllib.parse import urlsplit
+
+from config.config_loader import get_config
+from utils.clock import get_clock
+from utils.errors import AuthExpiredError, DeadlineExceededError, PermanentError, ServerError
+from utils.logger_manager import get_module_logger
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    重试策略: 第 n 次失败后等待 min(base_delay_s * multiplier^(n-1), 上限) + 随机抖动
+    """
+    max_attempts: int = 3
+    base_delay_s: float = 1.0
+    multiplier: float = 2.0     # 为1时为固定间隔
+    jitter_s: float = 2.0       # 随机抖动上限, 避免大量用户同时重试
+
+    def delay(self, attempt: int) -> float:
+        backoff = self.base_delay_s * self.multiplier ** (attempt - 1)
+        return min(backoff, get_config().retry.max_delay_s) + random.random() * self.jitter_s
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    账号密码错误、登录失效等重试也无法成功的错误直接放弃, 其余错误都可重试;
+    阶段预算耗尽时重试也会立即超时, 直接交给监督器
+    """
+    return not isinstance(error, (PermanentError, AuthExpiredError, DeadlineExceededError))
+
+
+def is_outage(error: BaseException) -> bool:
+    """是否说明接口本身不可用(服务端错误、网络错误、超时), 只有这类错误计入断路器"""
+    if isinstance(error, (ServerError, asyncio.TimeoutError)):
+        return True
+    # 只在已加载时取 aiohttp/playwright 的异常类型: 未加载说明不可能抛出, 断路器本身不依赖这两个库
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None and isinstance(error, aiohttp.ClientError):
+        return True
+    playwright_api = sys.modules.get("playwright.async_api")
+    return playwright_api is not None and isinstance(error, playwright_api.TimeoutError)
+
+
+class CircuitBreaker:
+    """
+    接口断路器, 由所有用户共享
+
+    - 关闭: 正常放行
+    - 断开: 连续失败达到阈值后断开, 期间请求在 acquire() 中等待, 推迟工作而不是消耗重试次数
+    - 半开: 断开超过 reset_s 后只放行一个探测请求, 成功则关闭, 失败则重新断开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_s: float):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_s = reset_s
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.module_logger = get_module_logger("CircuitBreaker")
+
+    async def acquire(self):
+        """等待断路器放行"""
+        while True:
+            if self.state == self.CLOSED:
+                return
+            now = get_clock().time()
+            if self.state == self.OPEN and now >= self.opened_at + self.reset_s:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            # 断开中或已有探测请求在进行, 等待后再检查(加抖动避免所有用户同时恢复)
+            wait = self.opened_at + self.reset_s - now if self.state == self.OPEN else 1.0
+            await get_clock().sleep(max(wait, 1.0) + random.random())
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            self.module_logger.info(f"接口 {self.name} 已恢复")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.module_logger.warning(
+                    f"接口 {self.name} 连续失败 {self.failures} 次，暂停请求 {self.reset_s} 秒"
+                )
+            self.state = self.OPEN
+            self.opened_at = get_clock().time()
+            self._probing = False
+
+    def release_probe(self):
+        """请求被取消或预算耗尽, 没有得到接口的结果: 只释放探测名额, 不改变状态"""
+        self._probing = False
+
+    @asynccontextmanager
+    async def guard(self):
+        """
+        在断路器保护下执行一次请求: 接口不可用类错误计入失败, 正常完成或普通业务错误视为接口可用,
+        被取消(CancelledError 等)或阶段预算耗尽时不能说明接口状态, 只释放探测名额
+        """
+        await self.acquire()
+        try:
+            yield
+        except (Exception, asyncio.CancelledError) as e:
+            if isinstance(e, (asyncio.CancelledError, DeadlineExceededError)):
+                self.release_probe()
+            elif is_outage(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            self.release_probe()
+            raise
+        self.record_success()
+
+
+# 按接口共享的断路器
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def endpoint_of(url_or_name: str) -> str:
+    """URL 按 主机+路径 区分接口, 非URL的名称原样使用"""
+    parts = urlsplit(url_or_name)
+    if not parts.netloc:
+        return url_or_name
+    return f"{parts.netloc}{parts.path}"
+
+
+def get_circuit_breaker(url_or_name: str) -> CircuitBreaker:
+    endpoint = endpoint_of(url_or_name)
+    if endpoint not in _breakers:
+        config = get_config().retry
+        _breakers[endpoint] = CircuitBreaker(endpoint, config.breaker_failure_threshold, config.breaker_reset_s)
+    return _breakers[endpoint]
+
+
+async def retry_call(operation: Callable[[int], Awaitable[T]], policy: RetryPolicy,
+                     breaker: Optional[CircuitBreaker] = None,
+                     on_retry: Optional[Callable[[int, Exception, float], Awaitable[None]]] = None) -> T:
+    """
+    按重试策略执行操作
+    :param operation: 接收当前尝试次数(从1开始)的协程函数, 失败时抛出异常
+    :param policy: 重试策略
+    :param breaker: 断路器, 断开期间等待而不计入尝试次数
+    :param on_retry: 每次失败且还会重试时调用, 参数为 (尝试次数, 异常, 等待秒数), 可用于记录日志或刷新页面
+    :return: 操作的返回值, 达到最大尝试次数或遇到不可重试的错误时抛出最后一次的异常
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            if breaker:
+                async with breaker.guard():
+                    return await operation(attempt)
+            return await operation(attempt)
+        except Exception as e:
+            if attempt >= policy.max_attempts or not is_retryable(e):
+                raise
+            delay = policy.delay(attempt)
+            if on_retry:
+                await on_retry(attempt, e, delay)
+            await get_clock().sleep(delay)
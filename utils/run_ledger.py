@@ -0,0 +1,219 @@
+# file: utils/run_ledger.py
+import asyncio
+import json
+import math
+import os
+import time
+from dataclasses import dataclass, field, asdict
+
+from utils.clock import get_clock
+from utils.logger_manager import get_module_logger
+
+
+# 课程记录中按课程开始和结束时用户统计的差值计算的计数
+COURSE_COUNTERS = ("contents_studied", "content_failures", "video_seconds_watched", "video_wall_seconds",
+                   "stuck_events", "recoveries", "reloads", "failures")
+
+
+@dataclass
+class CourseRunStats:
+    """一个用户学习一门课程的统计数据, 课程结束时追加到用户统计中"""
+    course: str
+    started_at: float
+    wall_seconds: float
+    success: bool
+    contents_studied: int = 0
+    content_failures: int = 0
+    video_seconds_watched: float = 0.0
+    video_wall_seconds: float = 0.0
+    stuck_events: int = 0
+    recoveries: int = 0
+    reloads: int = 0
+    failures: int = 0
+
+
+@dataclass
+class UserRunStats:
+    """单个用户一次运行的统计数据, 由各模块在执行过程中累加"""
+    username: str
+    user_name: str = ""
+    started_at: float = field(default_factory=lambda: get_clock().wall())
+    finished_at: float = 0.0
+    success: bool = False
+
+    login_seconds: float = 0.0          # 登录耗时
+    login_attempts: int = 0             # 登录尝试次数
+    courses_studied: int = 0            # 完成学习流程的课程数
+    contents_studied: int = 0           # 尝试学习的内容项数
+    content_failures: int = 0           # 学习失败的内容项数
+    video_seconds_watched: float = 0.0  # 视频播放进度推进的秒数
+    video_wall_seconds: float = 0.0     # 视频监控实际耗费的秒数
+    stuck_events: int = 0               # 检测到卡顿的次数
+    recoveries: int = 0                 # 卡顿后成功恢复的次数
+    reloads: int = 0                    # 页面刷新次数
+    failures: int = 0                   # 视频学习失败次数
+    restarts: int = 0                   # 监督器重启次数
+    deadline_overruns: int = 0          # 超出时间预算的次数
+    cpu_seconds: float = 0.0            # 分摊到的浏览器进程树CPU时间
+    rss_mb_peak: float = 0.0            # 分摊到的浏览器常驻内存峰值(MB)
+    fds_peak: float = 0.0               # 分摊到的浏览器进程树文件描述符(含socket)峰值
+    courses: list[CourseRunStats] = field(default_factory=list)     # 每门课程(每次尝试)的记录
+
+    @property
+    def wall_seconds(self) -> float:
+        end = self.finished_at or get_clock().wall()
+        return end - self.started_at
+
+    def finish(self, success: bool):
+        self.finished_at = get_clock().wall()
+        self.success = success
+
+    def course_counters(self) -> dict:
+        """课程开始时的计数快照, 课程结束时传给 record_course"""
+        return {name: getattr(self, name) for name in COURSE_COUNTERS}
+
+    def record_course(self, course: str, started_at: float, baseline: dict, success: bool):
+        """记录一门课程: 各计数取课程期间的增量"""
+        self.courses.append(CourseRunStats(
+            course=course,
+            started_at=started_at,
+            wall_seconds=get_clock().wall() - started_at,
+            success=success,
+            **{name: getattr(self, name) - baseline[name] for name in COURSE_COUNTERS},
+        ))
+
+
+def percentile(values: list[float], q: float) -> float:
+    """计算百分位数(线性插值), q 取值 0~100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class RunLedger:
+    """
+    运行账本: 每个用户完成时追加一行记录, 运行结束时生成汇总
+    """
+
+    SLOWEST_COUNT = 10  # 汇总中列出的最慢用户数量
+
+    def __init__(self, ledger_dir: str = "logs/ledger", run_id: str = None):
+        """
+        :param ledger_dir: 账本目录
+        :param run_id: 账本文件名标识, 为空时使用当前时间; 服务模式下同一秒内可能启动多个任务, 使用任务id区分
+        """
+        run_id = run_id or time.strftime("%Y%m%d_%H%M%S")
+        self.ledger_path = os.path.join(ledger_dir, f"run_{run_id}.jsonl")
+        self.summary_path = os.path.join(ledger_dir, f"run_{run_id}_summary.json")
+        self.module_logger = get_module_logger("Ledger")
+        self.records: list[UserRunStats] = []
+        os.makedirs(ledger_dir, exist_ok=True)
+
+    async def record(self, stats: UserRunStats):
+        """记录一个用户的运行结果, 立即追加写入账本文件"""
+        self.records.append(stats)
+        line = json.dumps({**asdict(stats), "wall_seconds": stats.wall_seconds}, ensure_ascii=False)
+        await asyncio.to_thread(self._append, line)
+
+    def _append(self, line: str):
+        with open(self.ledger_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def build_summary(self) -> dict:
+        wall = [r.wall_seconds for r in self.records]
+        login = [r.login_seconds for r in self.records]
+        total_video = sum(r.video_seconds_watched for r in self.records)
+        total_video_wall = sum(r.video_wall_seconds for r in self.records)
+        slowest = sorted(self.records, key=lambda r: r.wall_seconds, reverse=True)[:self.SLOWEST_COUNT]
+        costliest = sorted(self.records, key=lambda r: r.cpu_seconds, reverse=True)[:self.SLOWEST_COUNT]
+
+        return {
+            "users": len(self.records),
+            "succeeded": sum(1 for r in self.records if r.success),
+            "failed": sum(1 for r in self.records if not r.success),
+            "totals": {
+                "login_attempts": sum(r.login_attempts for r in self.records),
+                "courses_studied": sum(r.courses_studied for r in self.records),
+                "contents_studied": sum(r.contents_studied for r in self.records),
+                "content_failures": sum(r.content_failures for r in self.records),
+                "video_seconds_watched": total_video,
+                "video_wall_seconds": total_video_wall,
+                "stuck_events": sum(r.stuck_events for r in self.records),
+                "recoveries": sum(r.recoveries for r in self.records),
+                "reloads": sum(r.reloads for r in self.records),
+                "failures": sum(r.failures for r in self.records),
+                "restarts": sum(r.restarts for r in self.records),
+                "deadline_overruns": sum(r.deadline_overruns for r in self.records),
+                "cpu_seconds": sum(r.cpu_seconds for r in self.records),
+            },
+            # 视频推进秒数 / 监控实际耗时, 越接近1说明播放越顺畅
+            "video_efficiency": total_video / total_video_wall if total_video_wall else 0.0,
+            "wall_seconds": {q: percentile(wall, q) for q in (50, 90, 99)} | {"max": max(wall, default=0.0)},
+            "login_seconds": {q: percentile(login, q) for q in (50, 90, 99)} | {"max": max(login, default=0.0)},
+            "slowest_users": [
+                {"username": r.username, "user_name": r.user_name, "wall_seconds": r.wall_seconds}
+                for r in slowest
+            ],
+            "costliest_users": [
+                {"username": r.username, "user_name": r.user_name, "cpu_seconds": r.cpu_seconds,
+                 "rss_mb_peak": r.rss_mb_peak, "fds_peak": r.fds_peak}
+                for r in costliest if r.cpu_seconds
+            ],
+            "courses": self.build_course_summary(),
+        }
+
+    def build_course_summary(self) -> list[dict]:
+        """按课程汇总所有用户的课程记录, 按平均耗时从高到低排列"""
+        by_course: dict[str, list[CourseRunStats]] = {}
+        for r in self.records:
+            for course in r.courses:
+                by_course.setdefault(course.course, []).append(course)
+        rows = []
+        for name, runs in by_course.items():
+            wall = sum(c.wall_seconds for c in runs)
+            video = sum(c.video_seconds_watched for c in runs)
+            video_wall = sum(c.video_wall_seconds for c in runs)
+            rows.append({
+                "course": name,
+                "runs": len(runs),
+                "succeeded": sum(1 for c in runs if c.success),
+                "wall_seconds": wall,
+                "wall_seconds_avg": wall / len(runs),
+                "video_seconds_watched": video,
+                "video_efficiency": video / video_wall if video_wall else 0.0,
+                **{counter: sum(getattr(c, counter) for c in runs) for counter in (
+                    "contents_studied", "content_failures", "stuck_events", "recoveries", "reloads", "failures"
+                )},
+            })
+        return sorted(rows, key=lambda row: row["wall_seconds_avg"], reverse=True)
+
+    async def write_summary(self, extra: dict = None) -> dict:
+        """
+        生成并保存本次运行的汇总
+        :param extra: 附加到汇总中的其他统计(如事件循环延迟)
+        """
+        summary = self.build_summary() | (extra or {})
+        await asyncio.to_thread(self._write_summary, summary)
+
+        self.module_logger.info(
+            f"运行汇总: 用户 {summary['users']} 个 (成功 {summary['succeeded']}, 失败 {summary['failed']}), "
+            f"视频效率 {summary['video_efficiency']:.2%}, "
+            f"耗时 P50/P90/P99: {summary['wall_seconds'][50]:.0f}/{summary['wall_seconds'][90]:.0f}/"
+            f"{summary['wall_seconds'][99]:.0f} 秒"
+        )
+        for r in summary["slowest_users"]:
+            self.module_logger.info(f"  较慢用户 {r['user_name']}_{r['username']}: {r['wall_seconds']:.0f} 秒")
+        for c in summary["courses"][:self.SLOWEST_COUNT]:
+            self.module_logger.info(
+                f"  课程 {c['course']}: 平均 {c['wall_seconds_avg']:.0f} 秒, 视频效率 {c['video_efficiency']:.2%}, "
+                f"卡顿 {c['stuck_events']} 次, 刷新 {c['reloads']} 次, 失败 {c['failures'] + c['content_failures']} 次"
+            )
+        self.module_logger.info(f"运行账本已保存到 {self.ledger_path}")
+        return summary
+
+    def _write_summary(self, summary: dict):
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
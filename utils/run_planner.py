@@ -0,0 +1,167 @@
+# file: utils/run_planner.py
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from config.config_loader import UserData, get_config
+from utils.course_catalog import CourseCatalog, get_course_catalog
+from utils.logger_manager import get_module_logger
+from utils.time_utils import seconds_to_time_str
+
+
+@dataclass
+class UserPlan:
+    user_data: UserData
+    estimated_seconds: float        # 预计剩余学习时间(秒)
+    predicted_finish_s: float = 0.0  # 按计划顺序预计完成时刻(距运行开始的秒数)
+
+    @property
+    def deadline_s(self) -> float:
+        """截止时间距当前的秒数, 无截止时间时为无穷大"""
+        if self.user_data.deadline is None:
+            return math.inf
+        return (self.user_data.deadline - datetime.now()).total_seconds()
+
+    @property
+    def at_risk(self) -> bool:
+        return self.predicted_finish_s > self.deadline_s
+
+
+@dataclass
+class RunPlan:
+    users: list[UserPlan]       # 按调度顺序排列
+    batch_size: int
+    predicted_seconds: float    # 预计总运行时间(秒)
+
+    @property
+    def ordered_users(self) -> list[UserData]:
+        return [plan.user_data for plan in self.users]
+
+    @property
+    def at_risk_users(self) -> list[UserPlan]:
+        return [plan for plan in self.users if plan.at_risk]
+
+
+@dataclass
+class _CohortQueue:
+    """调度时单个分组的待运行队列(已按截止时间排序)"""
+    name: str
+    weight: int
+    users: list[UserPlan]
+    pass_value: float = 0.0     # 步幅调度的累计虚拟时间, 越小越优先
+
+
+class RunPlanner:
+    """
+    运行前规划: 根据课程目录估算每个用户的剩余工作量(无需打开浏览器), 并决定运行顺序
+
+    调度策略:
+        - 分组内按截止时间最早优先(EDF), 截止时间相同时工作量大的优先
+        - 分组之间按优先级权重做加权公平分配(步幅调度)
+        - 某分组队首用户临近截止时间时, 跳过公平分配直接按EDF抢占
+    """
+
+    USER_OVERHEAD_S = 60        # 每个用户登录、检查设置、查询课程的固定开销
+    COURSE_OVERHEAD_S = 45      # 每门课程选课、打开页面、解析目录的固定开销
+    LOGIN_INTERVAL_S = 10       # 单个用户登录的平均耗时, 批内按登录并发数分摊
+    START_INTERVAL_S = 4.5      # 批内学习任务启动间隔的平均值
+    BATCH_DELAY_S = 5           # 批次之间的等待时间
+
+    def __init__(self, catalog: CourseCatalog = None):
+        self.config = get_config()
+        self.catalog = catalog or get_course_catalog()
+        self.module_logger = get_module_logger("Planner")
+
+    def estimate_user_seconds(self, user_data: UserData) -> float:
+        """估算单个用户的剩余学习时间: 未完成必修课程的剩余视频时长加上固定开销, 未记录时长的课程按默认时长计"""
+        return self._remaining_seconds(user_data, self.config.project.default_course_video_s)
+
+    def measured_user_seconds(self, user_data: UserData) -> Optional[float]:
+        """
+        只按课程目录中已记录的视频时长估算剩余学习时间, 可用于设置时间预算
+        有未完成课程没有时长数据时返回 None, 默认时长只是排序用的猜测, 不能作为硬性期限
+        """
+        return self._remaining_seconds(user_data, None)
+
+    def _remaining_seconds(self, user_data: UserData, unknown_course_s: Optional[float]) -> Optional[float]:
+        remaining = self.USER_OVERHEAD_S
+        for search_key in user_data.must_learn_course:
+            if not search_key:
+                continue
+            percent = self.catalog.user_progress(user_data.username, search_key)
+            if percent >= 100:
+                continue
+            video_seconds = self.catalog.course_video_seconds(self.catalog.course_name(search_key))
+            if video_seconds is None:
+                if unknown_course_s is None:
+                    return None
+                video_seconds = unknown_course_s
+            remaining += video_seconds * (100 - percent) / 100 + self.COURSE_OVERHEAD_S
+        return remaining
+
+    def plan(self, users_data: list[UserData], batch_size: int) -> RunPlan:
+        """
+        生成运行计划并按批次模型预测每个用户的完成时刻
+        批次按顺序执行, 每批耗时取决于串行登录、错峰启动和本批最慢的用户
+        """
+        cohorts: dict[str, _CohortQueue] = {}
+        for user_data in users_data:
+            plan = UserPlan(user_data, self.estimate_user_seconds(user_data))
+            queue = cohorts.setdefault(user_data.cohort, _CohortQueue(user_data.cohort, 1, []))
+            queue.weight = max(queue.weight, user_data.priority)
+            queue.users.append(plan)
+        for queue in cohorts.values():
+            queue.users.sort(key=lambda p: (p.deadline_s, -p.estimated_seconds))
+
+        ordered: list[UserPlan] = []
+        batch_start = 0.0
+        batch: list[UserPlan] = []
+        while any(queue.users for queue in cohorts.values()):
+            active = [queue for queue in cohorts.values() if queue.users]
+            # 队首用户若再推迟一个同等时长便会错过截止时间, 则该分组为紧急分组
+            urgent = [
+                queue for queue in active
+                if batch_start + self._start_offset(len(batch)) + 2 * queue.users[0].estimated_seconds
+                >= queue.users[0].deadline_s
+            ]
+            if urgent:
+                queue = min(urgent, key=lambda q: q.users[0].deadline_s)
+            else:
+                queue = min(active, key=lambda q: (q.pass_value, q.users[0].deadline_s))
+
+            plan = queue.users.pop(0)
+            queue.pass_value += plan.estimated_seconds / queue.weight
+            plan.predicted_finish_s = batch_start + self._start_offset(len(batch)) + plan.estimated_seconds
+            ordered.append(plan)
+            batch.append(plan)
+
+            if len(batch) == batch_size:
+                batch_start = max(p.predicted_finish_s for p in batch) + self.BATCH_DELAY_S
+                batch = []
+
+        predicted = max((p.predicted_finish_s for p in ordered), default=0.0)
+        return RunPlan(users=ordered, batch_size=batch_size, predicted_seconds=predicted)
+
+    def _start_offset(self, index_in_batch: int) -> float:
+        """批内第 index 个用户相对批次开始的启动延迟"""
+        login_rounds = index_in_batch // max(self.config.login.concurrency, 1) + 1
+        return login_rounds * self.LOGIN_INTERVAL_S + (index_in_batch + 1) * self.START_INTERVAL_S
+
+    def report(self, run_plan: RunPlan):
+        """输出运行计划"""
+        self.module_logger.info(
+            f"运行计划: {len(run_plan.users)} 个用户, 每批 {run_plan.batch_size} 个, "
+            f"预计总运行时间 {seconds_to_time_str(run_plan.predicted_seconds)}"
+        )
+        for plan in run_plan.users[:run_plan.batch_size]:
+            self.module_logger.info(
+                f"  首批用户 {plan.user_data.user_name}_{plan.user_data.username}: "
+                f"预计 {seconds_to_time_str(plan.estimated_seconds)}"
+            )
+        for plan in run_plan.at_risk_users:
+            self.module_logger.warning(
+                f"  用户 {plan.user_data.user_name}_{plan.user_data.username} 可能错过截止时间: "
+                f"预计 {seconds_to_time_str(plan.predicted_finish_s)} 后完成, "
+                f"截止时间 {plan.user_data.deadline:%Y-%m-%d %H:%M} 距今 {seconds_to_time_str(max(plan.deadline_s, 0))}"
+            )
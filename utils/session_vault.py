@@ -0,0 +1,140 @@
+# file: utils/session_vault.py
+import asyncio
+import glob
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from utils.logger_manager import get_module_logger
+
+
+class SessionVault:
+    """
+    所有用户登录状态(storage_state)的统一存储
+
+    使用单个 SQLite 数据库(WAL模式)代替每个用户一个json文件:
+    启动时批量加载到内存, 读取直接走内存, 写入在线程中以事务方式原子落盘
+    """
+
+    def __init__(self, db_path: str = "save_data/sessions.db"):
+        self.db_path = db_path
+        self.module_logger = get_module_logger("SessionVault")
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._states: dict[str, dict] = {}       # 用户名 -> storage_state
+        self._expires: dict[str, float] = {}     # 用户名 -> 最早的cookie过期时间戳
+
+    async def load(self, legacy_prefix: Optional[str] = None):
+        """
+        打开数据库并批量加载所有登录状态
+        :param legacy_prefix: 旧版cookie文件前缀(如 save_data/cookies), 存在时导入旧文件
+        """
+        await asyncio.to_thread(self._open, legacy_prefix)
+        self.module_logger.info(f"已加载 {len(self._states)} 个用户的登录状态")
+
+    def _open(self, legacy_prefix: Optional[str]):
+        folder_path = os.path.dirname(self.db_path)
+        if folder_path:
+            os.makedirs(folder_path, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "username TEXT PRIMARY KEY, state TEXT NOT NULL, "
+                "expires REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            for username, state, expires in self._conn.execute("SELECT username, state, expires FROM sessions"):
+                self._states[username] = json.loads(state)
+                self._expires[username] = expires
+
+        if legacy_prefix:
+            self._import_legacy_files(legacy_prefix)
+
+    def _import_legacy_files(self, legacy_prefix: str):
+        """导入旧版 {save_path}_{username}.json 文件, 已存在于库中的用户不会被覆盖"""
+        rows = []
+        for file_path in glob.glob(f"{glob.escape(legacy_prefix)}_*.json"):
+            username = os.path.basename(file_path)[len(os.path.basename(legacy_prefix)) + 1:-len(".json")]
+            if not username or username in self._states:
+                continue
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except Exception as e:
+                self.module_logger.error(f"读取旧登录文件 {file_path} 失败: {e}")
+                continue
+            self._states[username] = state
+            self._expires[username] = self.compute_expires(state)
+            rows.append((username, json.dumps(state), self._storable_expires(self._expires[username]), time.time()))
+
+        if rows:
+            with self._lock, self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", rows)
+            self.module_logger.info(f"已从旧版文件导入 {len(rows)} 个用户的登录状态")
+
+    def get(self, username: str, min_ttl_s: float = 0) -> Optional[dict]:
+        """
+        获取用户的登录状态, 可直接传给 browser.new_context(storage_state=...)
+        :param username: 用户账号
+        :param min_ttl_s: cookie 至少还需有效的秒数, 不满足时视为过期并返回 None
+        """
+        if not self.is_fresh(username, min_ttl_s):
+            return None
+        return self._states[username]
+
+    def is_fresh(self, username: str, min_ttl_s: float = 0) -> bool:
+        """仅根据存储的过期时间判断登录状态是否仍可能有效, 不发起网络请求"""
+        if username not in self._states:
+            return False
+        return self._expires[username] > time.time() + min_ttl_s
+
+    async def save(self, username: str, state: dict):
+        """保存用户的登录状态, 内存立即生效, 落盘在线程中完成"""
+        expires = self.compute_expires(state)
+        self._states[username] = state
+        self._expires[username] = expires
+        await asyncio.to_thread(self._write, username, json.dumps(state), expires)
+
+    def _write(self, username: str, state: str, expires: float):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                (username, state, self._storable_expires(expires), time.time())
+            )
+
+    async def delete(self, username: str):
+        """删除用户的登录状态"""
+        self._states.pop(username, None)
+        self._expires.pop(username, None)
+        await asyncio.to_thread(self._delete, username)
+
+    def _delete(self, username: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+
+    def close(self):
+        if self._conn:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def compute_expires(state: dict) -> float:
+        """
+        计算登录状态的过期时间: 取所有持久化cookie中最早的过期时间
+        只有会话cookie(expires=-1)时无法判断, 视为不过期, 由登录验证兜底
+        """
+        expires = [cookie["expires"] for cookie in state.get("cookies", []) if cookie.get("expires", -1) > 0]
+        return min(expires) if expires else math.inf
+
+    @staticmethod
+    def _storable_expires(expires: float) -> float:
+        # SQLite 的 REAL 不支持 inf, 使用一个足够大的时间戳代替
+        return expires if math.isfinite(expires) else 1e12
@@ -0,0 +1,238 @@
+# file: utils/stand_in_lms.py
+"""
+本地替身学习平台: 用 aiohttp 模拟登录、课程查询、选课接口和学习空间页面(含加速播放的视频),
+供主机校准(--mode calibrate)和长时间压力测试在不访问真实平台的情况下跑完完整学习流程
+"""
+import base64
+import json
+from html import escape
+
+from aiohttp import web
+
+# 1x1 png, 作为验证码图片
+CAPTCHA_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
+PLAYER_HTML = """<html><body>
+<span class="jwmute"><button></button></span>
+<div id="container_display_button" style="width:80px;height:40px">播放</div>
+<span id="container_state"></span>
+<span id="container_controlbar_elapsed">00:00</span>/<span id="container_controlbar_duration">{duration}</span>
+<script>
+var elapsed = 0, timer = null, total = {total};
+function fmt(s) {{ var m = Math.floor(s / 60), r = s % 60; return (m < 10 ? "0" : "") + m + ":" + (r < 10 ? "0" : "") + r; }}
+document.getElementById("container_display_button").onclick = function () {{
+    if (timer) return;
+    document.getElementById("container_state").className = "jwtoggle";
+    timer = setInterval(function () {{
+        elapsed += 1;
+        document.getElementById("container_controlbar_elapsed").textContent = fmt(elapsed);
+        if (elapsed >= total) {{
+            clearInterval(timer);
+            document.getElementById("container_state").className = "";
+            fetch("/learnspace/learningTime_endVideoLearning.action?{query}").then(function () {{
+                var node = parent.document.querySelector('div[data-item="{item_id}"]');
+                if (node) {{ var flag = parent.document.createElement("span"); flag.className = "flagover-icon"; node.appendChild(flag); }}
+            }});
+        }}
+    }}, {tick_ms});
+}};
+</script></body></html>"""
+
+
+class StandInLMS:
+    """
+    替身平台, 每个用户有 course_count 门课程, 每门课程有 videos_per_course 个视频和一个文档
+
+    :param video_s: 每个视频的时长(秒)
+    :param speed: 播放加速倍数
+    """
+
+    def __init__(self, course_count: int = 2, videos_per_course: int = 2, video_s: int = 30, speed: float = 10.0):
+        self.course_count = course_count
+        self.videos_per_course = videos_per_course
+        self.video_s = video_s
+        self.speed = speed
+        self.base_url = ""
+        self.completed: dict[str, set[str]] = {}    # 用户 -> 已完成的内容项id
+        self.request_count = 0
+        self._runner: web.AppRunner | None = None
+
+    def course_names(self) -> list[str]:
+        return [f"替身课程{i + 1}" for i in range(self.course_count)]
+
+    def reset(self):
+        """清空学习进度, 使下一轮重新学习全部课程"""
+        self.completed.clear()
+
+    async def start(self, host: str = "localhost", port: int = 0) -> str:
+        app = web.Application(middlewares=[self._count_requests])
+        app.add_routes([
+            web.get("/login", self.login_page),
+            web.get("/captcha", self.captcha),
+            web.post("/captcha-api", self.captcha_api),
+            web.post("/sso/login", self.sso_login),
+            web.get("/sso/redirect", self.sso_redirect),
+            web.get("/check_login", self.check_login),
+            web.post("/need_setting", self.need_setting),
+            web.get("/project", self.project),
+            web.get("/course_status", self.course_status),
+            web.get("/select_elective", self.select_elective),
+            web.get("/learnspace/sign/signLearn.action", self.learnspace),
+            web.get("/learnspace/menu", self.menu),
+            web.get("/learnspace/player", self.player),
+            web.get("/learnspace/learningTime_endVideoLearning.action", self.end_video),
+        ])
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _count_requests(self, request: web.Request, handler):
+        self.request_count += 1
+        return await handler(request)
+
+    @staticmethod
+    def _user(request: web.Request) -> str:
+        return request.cookies.get("lms_user") or request.query.get("user", "")
+
+    @staticmethod
+    def _page(items: list) -> web.Response:
+        return web.json_response({"errorCode": "0", "errorMessage": "成功", "page": {"items": items}})
+
+    def _items(self, course_index: int) -> list[tuple[str, str]]:
+        """课程的内容项 (id, 类型)"""
+        items = [(f"c{course_index}v{i}", "video") for i in range(self.videos_per_course)]
+        items.append((f"c{course_index}d0", "doc"))
+        return items
+
+    def _percent(self, username: str, course_index: int) -> int:
+        done = self.completed.get(username, set())
+        videos = [item_id for item_id, item_type in self._items(course_index) if item_type == "video"]
+        return int(sum(1 for item_id in videos if item_id in done) * 100 / len(videos))
+
+    async def login_page(self, request):
+        return web.Response(text="<html><body>login</body></html>", content_type="text/html")
+
+    async def captcha(self, request):
+        return web.Response(body=CAPTCHA_PNG, content_type="image/png")
+
+    async def captcha_api(self, request):
+        return web.json_response({"code": 10000, "data": {"data": "1234"}})
+
+    async def sso_login(self, request):
+        form = await request.post()
+        data = json.loads(base64.b64decode(form["data"]))
+        redirect_url = f"{self.base_url}/sso/redirect?user={data['LoginID']}"
+        return web.json_response({"success": True, "redirectURL": redirect_url})
+
+    async def sso_redirect(self, request):
+        response = web.Response(text="ok")
+        response.set_cookie("lms_user", request.query["user"], path="/")
+        return response
+
+    async def check_login(self, request):
+        return self._page([{"info": {"loginId": self._user(request)}}])
+
+    async def need_setting(self, request):
+        return self._page([{"success": "0"}])
+
+    async def project(self, request):
+        return self._page([{"id": "soak-project"}])
+
+    async def course_status(self, request):
+        username = self._user(request)
+        search_key = request.query.get("page.searchItem.searchKey", "")
+        items = [
+            {
+                "id": f"course{i}",
+                "openCourseId": f"open{i}",
+                "name": name,
+                "credit": "1",
+                "percent": str(self._percent(username, i)),
+                "learnspaceUrl": self.base_url,
+            }
+            for i, name in enumerate(self.course_names())
+            if search_key in name
+        ]
+        return self._page(items)
+
+    async def select_elective(self, request):
+        return self._page([{"message": {"success": "1"}}])
+
+    async def learnspace(self, request):
+        course_id = request.query["courseId"]
+        username = request.query.get("loginId", "")
+        helper = ("<script>function closeLearnHelper(){parent.document.getElementById('learnHelperIframe')"
+                  ".style.display='none'}</script><a href='javascript:void(0)' onclick='closeLearnHelper()'>关闭</a>")
+        html = (
+            "<html><head><title>学习空间</title></head><body>"
+            f'<iframe id="learnHelperIframe" style="width:200px;height:60px" srcdoc="{escape(helper, quote=True)}"></iframe>'
+            f'<iframe id="mainCont" style="width:800px;height:600px" '
+            f'src="/learnspace/menu?courseId={course_id}&user={username}"></iframe>'
+            "</body></html>"
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def menu(self, request):
+        course_index = int(request.query["courseId"].removeprefix("course"))
+        username = request.query.get("user", "")
+        done = self.completed.get(username, set())
+        contents = []
+        for item_id, item_type in self._items(course_index):
+            completed = item_id in done
+            player_url = f"/learnspace/player?courseId=course{course_index}&itemId={item_id}&user={username}"
+            contents.append(
+                f'<div title="{item_id}" itemtype="{item_type}" completestate="{1 if completed else 0}" '
+                f'data-item="{item_id}" onclick="document.getElementById(\'mainFrame\').src=\'{player_url}\'">'
+                f'<a href="javascript:void(0)">{item_id}</a>'
+                f'{"<span class=flagover-icon></span>" if completed else ""}</div>'
+            )
+        html = (
+            "<html><body><div id=\"learnMenu\">"
+            '<div class="s_chapter" title="第1章"></div><div style="display:none">'
+            '<div class="s_section" title="第1.1节"></div><div style="display:none">'
+            f'{"".join(contents)}</div></div></div>'
+            '<iframe id="mainFrame" style="width:600px;height:200px"></iframe>'
+            "</body></html>"
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def player(self, request):
+        total = self.video_s
+        html = PLAYER_HTML.format(
+            duration=f"{total // 60:02d}:{total % 60:02d}",
+            total=total,
+            query=request.query_string,
+            item_id=request.query["itemId"],
+            tick_ms=max(int(1000 / self.speed), 1),
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def end_video(self, request):
+        self.completed.setdefault(request.query["user"], set()).add(request.query["itemId"])
+        return web.json_response({"success": True})
+
+
+async def open_user(browser, profile, base_url: str, index: int):
+    """
+    为一个模拟用户创建 context 并在替身平台上开始播放第一个视频
+    :param profile: 浏览器配置预设(BrowserProfile)
+    """
+    context = await browser.new_context(**profile.context_options())
+    page = await context.new_page()
+    await page.goto(f"{base_url}/learnspace/sign/signLearn.action?courseId=course0&loginId=bench{index}")
+    menu_frame = page.frame_locator("#mainCont")
+    await menu_frame.locator('div[data-item="c0v0"]').click()
+    await menu_frame.frame_locator("#mainFrame").locator("#container_display_button").click()
+    return context
@@ -0,0 +1,31 @@
+def time_str_to_seconds(time_str: str) -> int:
+    """将时间字符串转换为秒，支持XX、XX:XX、XX:XX:XX格式"""
+    # 统一中文冒号为英文冒号
+    time_str = time_str.replace("：", ":").strip()
+
+    # 按冒号分割时间部分
+    time_parts = time_str.split(":")
+
+    # 根据不同格式处理
+    if len(time_parts) == 1:  # XX格式(秒)
+        return int(time_parts[0])
+    elif len(time_parts) == 2:  # XX:XX格式(分钟:秒)
+        minutes, seconds = map(int, time_parts)
+        return minutes * 60 + seconds
+    elif len(time_parts) == 3:  # XX:XX:XX格式(小时:分钟:秒)
+        hours, minutes, seconds = map(int, time_parts)
+        return hours * 3600 + minutes * 60 + seconds
+    else:
+        raise ValueError(f"不支持的时间格式: {time_str}")
+
+
+def seconds_to_time_str(seconds) -> str:
+    """将秒数转换为时间字符串格式 (XX:XX:XX)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    else:
+        return f"{minutes:02d}:{secs:02d}"
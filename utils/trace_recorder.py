@@ -0,0 +1,128 @@
+# file: utils/trace_recorder.py
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+
+from playwright.async_api import BrowserContext
+
+from config.config_loader import get_config
+from utils.logger_manager import get_module_logger
+
+
+class TraceRecorder:
+    """
+    单个用户的滚动 Playwright trace: 按固定时长切分 trace 分片, 只在临时目录保留最近几个分片,
+    视频进入恢复或重试失败时调用 dump() 才把保留的分片保存到日志目录
+    """
+
+    def __init__(self, username: str):
+        self.config = get_config()
+        self.username = username
+        self.enabled = self.config.trace.enabled
+        self.module_logger = get_module_logger("Trace")
+        self.context: BrowserContext | None = None
+        self.chunks: deque[str] = deque()
+        self._tmp_dir: str | None = None
+        self._chunk_index = 0
+        self._rotate_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    async def attach(self, context: BrowserContext):
+        """在新创建的 context 上开始滚动记录"""
+        if not self.enabled:
+            return
+        await self.detach()
+        self.context = context
+        self._tmp_dir = tempfile.mkdtemp(prefix=f"trace_{self.username}_")
+        try:
+            await context.tracing.start(screenshots=self.config.trace.screenshots, snapshots=True)
+            await context.tracing.start_chunk()
+        except Exception as e:
+            self.module_logger.error(f"用户 {self.username} 启动trace失败: {e}")
+            self.context = None
+            return
+        self._rotate_task = asyncio.create_task(self._rotate_loop())
+
+    async def _rotate_loop(self):
+        while True:
+            await asyncio.sleep(self.config.trace.chunk_s)
+            async with self._lock:
+                try:
+                    await self._rotate()
+                except Exception as e:
+                    # context 已关闭时停止滚动, 由监督器重建后重新 attach
+                    self.module_logger.debug(f"用户 {self.username} 切分trace失败: {e}")
+                    return
+
+    async def _rotate(self):
+        """结束当前分片并开始新分片, 超出保留数量的旧分片直接删除"""
+        self._chunk_index += 1
+        chunk_path = os.path.join(self._tmp_dir, f"chunk_{self._chunk_index}.zip")
+        await self.context.tracing.stop_chunk(path=chunk_path)
+        await self.context.tracing.start_chunk()
+        self.chunks.append(chunk_path)
+        while len(self.chunks) > self.config.trace.keep_chunks:
+            old_chunk = self.chunks.popleft()
+            if os.path.exists(old_chunk):
+                os.remove(old_chunk)
+
+    async def dump(self, reason: str):
+        """
+        把最近的 trace 分片保存到日志目录
+        :param reason: 触发原因, 用于文件名
+        """
+        if not self.enabled or not self.context:
+            return
+        async with self._lock:
+            try:
+                await self._rotate()
+            except Exception as e:
+                self.module_logger.error(f"用户 {self.username} 保存trace失败: {e}")
+                return
+            folder_path = os.path.join(self.config.trace.dir, self.username)
+            os.makedirs(folder_path, exist_ok=True)
+            prefix = f"{time.strftime('%Y%m%d_%H%M%S')}_{reason}"
+            for i, chunk_path in enumerate(self.chunks):
+                if os.path.exists(chunk_path):
+                    shutil.copyfile(chunk_path, os.path.join(folder_path, f"{prefix}_{i}.zip"))
+            self.module_logger.info(f"用户 {self.username} 已保存 {len(self.chunks)} 个trace分片到 {folder_path}")
+
+    async def detach(self):
+        """停止记录并删除临时分片, 需在关闭 context 之前调用"""
+        if self._rotate_task:
+            self._rotate_task.cancel()
+            try:
+                await self._rotate_task
+            except asyncio.CancelledError:
+                pass
+            self._rotate_task = None
+        if self.context:
+            try:
+                await self.context.tracing.stop()
+            except Exception as e:
+                self.module_logger.debug(f"用户 {self.username} 停止trace出错: {e}")
+            self.context = None
+        self.chunks.clear()
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+
+# 按用户缓存的 trace 记录器
+_recorders: dict[str, TraceRecorder] = {}
+
+
+def get_trace_recorder(username: str) -> TraceRecorder:
+    if username not in _recorders:
+        _recorders[username] = TraceRecorder(username)
+    return _recorders[username]
+
+
+async def release_trace_recorder(username: str):
+    """用户结束时停止记录并释放实例"""
+    recorder = _recorders.pop(username, None)
+    if recorder:
+        await recorder.detach()